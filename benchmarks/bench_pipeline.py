@@ -0,0 +1,321 @@
+"""
+Throughput, latency and memory benchmark of the evaluation pipeline.
+
+Covers trace conversion, evaluation with deterministic metrics, the token and
+cost utilities, and trajectory serialization on synthetic Strands and CrewAI
+workloads: many small traces, and single large ones. Every (framework, size,
+trace size, stage) case runs in a fresh process, so the peak RSS reported for it
+is its own. Results are written as JSON and can be
+compared with those of a previous run to catch regressions.
+
+Usage:
+    python -m benchmarks.bench_pipeline --output baseline.json
+    python -m benchmarks.bench_pipeline --output new.json --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.workloads import FRAMEWORKS, build_workload
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+STAGES = ("convert", "evaluate", "cost", "serialize")
+AWS_REGION = "us-east-1"
+
+# Measurements compared with the baseline, and whether higher is better
+COMPARED = {"spans_per_sec": True, "p50_ms": False, "peak_rss_mb": False}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of the current process in MiB, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB elsewhere
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _deterministic_evaluator(reference_trajectory: Any) -> Any:
+    """
+    Evaluator running the metrics that need no judge model.
+
+    ``ToolAccuracyMetric`` is left out: it reads ``ToolCall.success``, which the
+    schema does not define, so it only fails.
+    """
+    from flotorch_eval.agent_eval.core.evaluator import Evaluator
+    from flotorch_eval.agent_eval.metrics.base import MetricConfig
+    from flotorch_eval.agent_eval.metrics.langchain_metrics import (
+        TrajectoryEvalWithoutLLMMetric,
+    )
+    from flotorch_eval.agent_eval.metrics.latency_metrics import LatencyMetric
+    from flotorch_eval.agent_eval.metrics.usage_metrics import UsageMetric
+
+    reference = TrajectoryEvalWithoutLLMMetric()._convert_to_standard_format(
+        reference_trajectory
+    )
+    return Evaluator(
+        [
+            LatencyMetric(),
+            UsageMetric(config=MetricConfig(metric_params={"aws_region": AWS_REGION})),
+            TrajectoryEvalWithoutLLMMetric(
+                config=MetricConfig(
+                    metric_params={
+                        "trajectory_match_mode": "unordered",
+                        "reference_outputs": reference,
+                    }
+                )
+            ),
+        ]
+    )
+
+
+def run_case(
+    framework: str, total_spans: int, stage: str, spans_per_trace: int, min_trajectories: int
+) -> Dict[str, Any]:
+    """
+    Run one benchmark case; meant to be called in a fresh process.
+
+    Args:
+        framework: Framework whose traces are generated
+        total_spans: Number of spans in the workload
+        stage: Pipeline stage to time, one of :data:`STAGES`
+        spans_per_trace: Size of each generated trace
+        min_trajectories: The workload is processed as many times as needed to
+            time at least this many trajectories
+
+    Returns:
+        The measurements of the case
+    """
+    from flotorch_eval.agent_eval.core.converter import TraceConverter
+    from flotorch_eval.agent_eval.core.schemas import Trajectory
+    from flotorch_eval.common.cost_utils import calculate_cost_from_tokens
+    from flotorch_eval.common.token_utils import extract_token_usage_from_trajectory
+
+    if stage not in STAGES:
+        raise ValueError(f"stage must be one of: {', '.join(STAGES)}. Got: {stage}")
+
+    traces = build_workload(framework, total_spans, spans_per_trace)
+    converter = TraceConverter()
+    items: List[Any] = (
+        traces if stage == "convert" else [converter.from_spans(t) for t in traces]
+    )
+    rounds = max(1, math.ceil(min_trajectories / len(traces)))
+    latencies: List[float] = []
+
+    def timed(step: Callable[[Any], Any]) -> float:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for item in items:
+                item_started = time.perf_counter()
+                step(item)
+                latencies.append(time.perf_counter() - item_started)
+        return time.perf_counter() - started
+
+    if stage == "convert":
+        elapsed = timed(converter.from_spans)
+    elif stage == "cost":
+        elapsed = timed(
+            lambda trajectory: calculate_cost_from_tokens(
+                extract_token_usage_from_trajectory(trajectory), aws_region=AWS_REGION
+            )
+        )
+    elif stage == "serialize":
+        elapsed = timed(
+            lambda trajectory: Trajectory.model_validate_json(trajectory.model_dump_json())
+        )
+    else:
+        evaluator = _deterministic_evaluator(items[0])
+        loop = asyncio.new_event_loop()
+        try:
+            elapsed = timed(
+                lambda trajectory: loop.run_until_complete(evaluator.evaluate(trajectory))
+            )
+        finally:
+            evaluator.close()
+            loop.close()
+
+    latencies.sort()
+    spans_processed = rounds * sum(len(trace) for trace in traces)
+    return {
+        "framework": framework,
+        "spans": total_spans,
+        "spans_per_trace": spans_per_trace,
+        "stage": stage,
+        "traces": len(traces),
+        "rounds": rounds,
+        "seconds": round(elapsed, 6),
+        "spans_per_sec": round(spans_processed / elapsed, 1),
+        "trajectories_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the code and machine the benchmark ran on."""
+    try:
+        package_version = version("flotorch-eval")
+    except PackageNotFoundError:
+        package_version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "flotorch_eval_version": package_version,
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.machine(),
+    }
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float
+) -> List[str]:
+    """
+    Find the measurements that got worse than the baseline by more than ``tolerance``.
+
+    Args:
+        results: Cases of the current run
+        baseline: Cases of the baseline run; cases missing from either are skipped
+        tolerance: Allowed relative change, e.g. ``0.1`` for 10%
+
+    Returns:
+        One description per regression
+    """
+    def case_key(case: Dict[str, Any]) -> tuple:
+        return case["framework"], case["spans"], case.get("spans_per_trace"), case["stage"]
+
+    previous = {case_key(case): case for case in baseline}
+    regressions = []
+    for case in results:
+        before = previous.get(case_key(case))
+        if before is None:
+            continue
+        for key, higher_is_better in COMPARED.items():
+            old, new = before.get(key), case.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    f"{case['framework']} {case['spans']} spans "
+                    f"({case['spans_per_trace']} per trace) {case['stage']}: "
+                    f"{key} {old:g} -> {new:g} ({change:+.1%})"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--frameworks", nargs="+", choices=sorted(FRAMEWORKS), default=["strands", "crewai"]
+    )
+    parser.add_argument("--spans", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--spans-per-trace", type=int, default=10)
+    parser.add_argument(
+        "--single-trace-spans",
+        type=int,
+        nargs="*",
+        default=[1_000],
+        help="sizes of additional workloads made of one trace",
+    )
+    parser.add_argument(
+        "--min-trajectories",
+        type=int,
+        default=200,
+        help="repeat small workloads until this many trajectories are timed",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="relative change tolerated before a measurement counts as a regression",
+    )
+    args = parser.parse_args()
+
+    results = []
+    sizes = [(total_spans, args.spans_per_trace) for total_spans in args.spans]
+    sizes += [(total_spans, total_spans) for total_spans in args.single_trace_spans]
+    print(
+        f"{'framework':<9} {'spans':>7} {'/trace':>7} {'stage':<9} {'spans/s':>11} "
+        f"{'traj/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'RSS MiB':>8}"
+    )
+    for framework in args.frameworks:
+        for total_spans, spans_per_trace in sizes:
+            for stage in args.stages:
+                # A fresh interpreter per case keeps peak RSS and caches independent
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                    case = pool.submit(
+                        run_case,
+                        framework,
+                        total_spans,
+                        stage,
+                        spans_per_trace,
+                        args.min_trajectories,
+                    ).result()
+                results.append(case)
+                print(
+                    f"{framework:<9} {total_spans:>7} {spans_per_trace:>7} {stage:<9} "
+                    f"{case['spans_per_sec']:>11,.0f} "
+                    f"{case['trajectories_per_sec']:>9,.0f} {case['p50_ms']:>9.3f} "
+                    f"{case['p99_ms']:>9.3f} {case['peak_rss_mb'] or 0:>8.1f}",
+                    flush=True,
+                )
+
+    report = {
+        "environment": environment(),
+        "options": {
+            "spans_per_trace": args.spans_per_trace,
+            "single_trace_spans": args.single_trace_spans,
+            "min_trajectories": args.min_trajectories,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
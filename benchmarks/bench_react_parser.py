@@ -0,0 +1,103 @@
+"""
+Micro-benchmark of the ReAct completion parser against the previous regex implementation.
+
+Usage:
+    python -m benchmarks.bench_react_parser --sizes 1000 100000 1000000
+"""
+
+import argparse
+import json
+import re
+import timeit
+from datetime import datetime
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+
+
+def legacy_parse_assistant_output(completion: str):
+    """The multi-regex parser that ``parse_react_output`` replaced (tool calls as tuples)."""
+    tool_calls = []
+
+    if "Final Answer:" in completion:
+        final_answer_match = re.search(r"Final Answer:(.*?)(?=\n|$)", completion, re.DOTALL)
+        if final_answer_match:
+            return [], final_answer_match.group(1).strip()
+
+    thought_match = re.search(
+        r"Thought:(.*?)(?=\nAction:|Final Answer:|$)", completion, re.DOTALL
+    )
+    thought = thought_match.group(1).strip() if thought_match else None
+
+    action_match = re.search(r"Action:(.*?)(?=\nAction Input:|$)", completion, re.DOTALL)
+    if action_match:
+        action = action_match.group(1).strip()
+        action_input_match = re.search(
+            r"Action Input:(.*?)(?=\nObservation:|$)", completion, re.DOTALL
+        )
+        if action_input_match:
+            action_input = action_input_match.group(1).strip()
+            try:
+                if action_input.startswith("{"):
+                    arguments = json.loads(action_input)
+                else:
+                    if action_input.startswith('"') and action_input.endswith('"'):
+                        action_input = action_input[1:-1]
+                    json_match = re.search(r"\{.*\}", action_input)
+                    if json_match:
+                        arguments = json.loads(json_match.group(0))
+                    else:
+                        arguments = {"input": action_input}
+            except json.JSONDecodeError:
+                arguments = {"input": action_input}
+            tool_calls.append((action, arguments))
+
+    return tool_calls, thought
+
+
+def make_completion(size: int) -> str:
+    """Build a ReAct completion with a thought and an action input of roughly ``size`` chars."""
+    thought = ("I need to look this up before answering. " * (size // 40 + 1))[:size]
+    query = "x" * size
+    return (
+        f"Thought: {thought}\n\nAction: search\n"
+        f'Action Input: {{"search_query": "{query}"}}\n\nObservation:'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    converter = TraceConverter()
+    now = datetime.now()
+
+    print(f"{'size':>10} {'legacy ms':>12} {'single-pass ms':>15} {'speedup':>8}")
+    for size in args.sizes:
+        completion = make_completion(size)
+        number = max(1, 100_000 // size)
+
+        legacy = min(
+            timeit.repeat(
+                lambda: legacy_parse_assistant_output(completion),
+                number=number,
+                repeat=args.repeat,
+            )
+        ) / number
+        current = min(
+            timeit.repeat(
+                lambda: converter._parse_assistant_output(completion, now),
+                number=number,
+                repeat=args.repeat,
+            )
+        ) / number
+
+        print(
+            f"{size:>10} {legacy * 1000:>12.3f} {current * 1000:>15.3f} "
+            f"{legacy / current:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
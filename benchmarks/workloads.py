@@ -0,0 +1,42 @@
+"""
+Synthetic Strands and CrewAI traces for the benchmarks.
+
+The traces come from the span factory of the test suite, which mirrors what the
+frameworks export (attribute names, events, nesting), so every handler of the
+converter is exercised. A trace of ``steps`` tool-using turns has
+``2 * steps + 2`` spans.
+"""
+
+from typing import Callable, Dict, List
+
+from opentelemetry.sdk.trace import ReadableSpan
+
+from tests.agent_eval.span_factory import crewai_trace, strands_trace
+
+FRAMEWORKS: Dict[str, Callable[[int, int], List[ReadableSpan]]] = {
+    "strands": lambda trace_id, steps: strands_trace(
+        trace_id, question=f"What is {trace_id} + 2?", tool_calls=steps
+    ),
+    "crewai": lambda trace_id, steps: crewai_trace(
+        trace_id, question=f"Summarize topic {trace_id}", searches=steps
+    ),
+}
+
+
+def build_workload(framework: str, total_spans: int, spans_per_trace: int) -> List[List[ReadableSpan]]:
+    """
+    Build traces adding up to ``total_spans`` spans.
+
+    Args:
+        framework: Key of :data:`FRAMEWORKS`
+        total_spans: Number of spans across all traces
+        spans_per_trace: Size of each trace, rounded to the ``2 * steps + 2`` shape
+            and capped at ``total_spans``
+
+    Returns:
+        One list of spans per trace
+    """
+    make_trace = FRAMEWORKS[framework]
+    steps = max(0, (min(spans_per_trace, total_spans) - 2) // 2)
+    per_trace = 2 * steps + 2
+    return [make_trace(trace_id, steps) for trace_id in range(1, max(1, total_spans // per_trace) + 1)]
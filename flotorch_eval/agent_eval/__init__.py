@@ -3,6 +3,11 @@ Agent evaluation package.
 """
 
 from flotorch_eval.agent_eval.core.evaluator import Evaluator
+from flotorch_eval.agent_eval.core.gates import Gate
+from flotorch_eval.agent_eval.core.journal import RunJournal
+from flotorch_eval.agent_eval.core.rate_limit import AIMDConcurrency, JudgeRateLimiter
+from flotorch_eval.agent_eval.core.result_cache import MetricResultCache
+from flotorch_eval.agent_eval.core.retry import RetryPolicy
 from flotorch_eval.agent_eval.core.schemas import (
     EvaluationResult,
     Message,
@@ -12,7 +17,17 @@ from flotorch_eval.agent_eval.core.schemas import (
     ToolCall,
     Trajectory,
 )
+from flotorch_eval.agent_eval.core.sampling import (
+    SampleReport,
+    SamplingPlanner,
+    framework_stratum,
+    latency_stratum,
+    tool_set_stratum,
+)
+from flotorch_eval.agent_eval.core.span_tree import SpanTree
 from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.registry import SpanHandlerRegistry
+from flotorch_eval.agent_eval.core.streaming import StreamingTraceConverter
 from flotorch_eval.agent_eval.metrics.base import BaseMetric
 from flotorch_eval.agent_eval.metrics.langchain_metrics import TrajectoryEvalWithLLMMetric
 from flotorch_eval.agent_eval.metrics.ragas_metrics import (
@@ -23,14 +38,28 @@ from flotorch_eval.agent_eval.metrics.ragas_metrics import (
 __all__ = [
     "BaseMetric",
     "Evaluator",
+    "Gate",
+    "MetricResultCache",
+    "JudgeRateLimiter",
+    "RunJournal",
+    "SamplingPlanner",
+    "SampleReport",
+    "framework_stratum",
+    "latency_stratum",
+    "tool_set_stratum",
+    "AIMDConcurrency",
+    "RetryPolicy",
     "EvaluationResult",
     "Message",
     "MetricResult",
     "Span",
     "SpanEvent",
+    "SpanTree",
     "ToolCall",
     "Trajectory",
     "TraceConverter",
+    "StreamingTraceConverter",
+    "SpanHandlerRegistry",
     "TrajectoryEvalWithLLMMetric",
     "AgentGoalAccuracyMetric",
     "ToolCallAccuracyMetric",
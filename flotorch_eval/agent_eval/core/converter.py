@@ -2,260 +2,341 @@
 Converter module for transforming OpenTelemetry traces into agent trajectories.
 """
 
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime
-import ast
 import json
 import re
-from typing import Dict, List, Optional, Union
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 from opentelemetry.trace import Span as OTelSpan
 from opentelemetry.trace import SpanKind
 
+from flotorch_eval.agent_eval.core.react import parse_react_output
+from flotorch_eval.agent_eval.core.registry import SpanDispatchIndex, SpanHandlerRegistry
 from flotorch_eval.agent_eval.core.schemas import Message, Span, SpanEvent, ToolCall, Trajectory
+from flotorch_eval.common import json_utils, telemetry
+from flotorch_eval.common.literal_utils import parse_literal
 from flotorch_eval.common.utils import convert_attributes
 
+_JSON_OBJECT = re.compile(r"\{.*\}")
+
+
+class TrajectoryBuilder:
+    """
+    Accumulates the parse state of a single trace.
+
+    Spans are fed one at a time through :meth:`add_span`; the conversation is built
+    incrementally so that a trajectory can be produced as soon as the trace is
+    complete without re-reading the spans that were already processed.
+    """
+
+    def __init__(self, converter: "TraceConverter", trace_id: str = ""):
+        """
+        Initialize the builder.
+
+        Args:
+            converter: Converter whose span parsing rules are applied
+            trace_id: Identifier of the trace being built
+        """
+        self.converter = converter
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.messages: List[Message] = []
+        self.pending_tool_messages: List[Message] = []  # Store tool messages until their assistant message
+        self.has_assistant_message = False
+
+        # Tool calls still waiting for their output, indexed for constant time matching
+        self._unmatched_by_name: Dict[str, Deque[ToolCall]] = {}
+        self._unmatched_by_id: Dict[str, ToolCall] = {}
+        self._matched: Set[int] = set()
+        self._user_seen = False
+        # Ids of flotorch-eval's own spans and of the spans nested under them
+        self._internal: Set[str] = set()
+        # Ids of every span added, and spans held back until their parent is added
+        self._added: Set[str] = set()
+        self._held: Dict[str, List[Span]] = {}
+
+    @property
+    def only_internal_spans(self) -> bool:
+        """
+        Whether every span added so far came from flotorch-eval's own instrumentation.
+
+        Spans still waiting for their parent are only counted once :meth:`build`
+        has been called.
+        """
+        return not self.spans and bool(self._internal)
+
+    def add_span(self, span: Span) -> None:
+        """
+        Add an already converted span and update the conversation.
+
+        Exporters send spans as they end, so a child usually arrives before its
+        parent. A span whose parent has not been added yet is held back until it
+        is, so that spans nested under flotorch-eval's own are recognized whatever
+        the arrival order; spans whose parent never arrives are processed by
+        :meth:`build`.
+        """
+        if not self.trace_id:
+            self.trace_id = span.trace_id
+        parent_id = span.parent_id
+        if parent_id is not None and parent_id != span.span_id and parent_id not in self._added:
+            self._held.setdefault(parent_id, []).append(span)
+            return
+        self._admit([span])
+
+    def _admit(self, spans: List[Span]) -> None:
+        released = []
+        stack = list(spans)
+        while stack:
+            span = stack.pop()
+            self._added.add(span.span_id)
+            if span.attributes.get(telemetry.INTERNAL_SPAN_ATTRIBUTE) or (
+                span.parent_id in self._internal
+            ):
+                # Self-instrumentation, and whatever it wraps (e.g. judge model
+                # calls), is not part of the agent run
+                self._internal.add(span.span_id)
+            else:
+                released.append(span)
+            stack.extend(self._held.pop(span.span_id, ()))
+
+        if len(released) > 1:
+            released.sort(key=lambda x: x.start_time_unix_nano)
+        for span in released:
+            self.spans.append(span)
+            self.converter._process_span(self, span)
+
+    def _release_held(self) -> None:
+        # Spans whose parent never arrived (e.g. a remote parent) become roots
+        while self._held:
+            held_ids = {span.span_id for spans in self._held.values() for span in spans}
+            roots = [
+                span
+                for parent_id in [p for p in self._held if p not in held_ids]
+                for span in self._held.pop(parent_id)
+            ]
+            if not roots:  # The remaining spans form parent cycles
+                roots = [span for spans in self._held.values() for span in spans]
+                self._held.clear()
+            self._admit(roots)
+
+    def has_user_message(self) -> bool:
+        """Return whether the user turn has been recorded."""
+        return self._user_seen
+
+    def add_user_message(self, content: str, timestamp: datetime) -> None:
+        """Record the user turn of the conversation."""
+        self.messages.append(
+            Message(
+                role="user",
+                content=content,
+                timestamp=timestamp,
+                tool_calls=[],
+            )
+        )
+        self._user_seen = True
+
+    def add_assistant_message(
+        self, content: str, tool_calls: List[ToolCall], timestamp: datetime
+    ) -> None:
+        """Record an assistant turn and release tool messages waiting for it."""
+        self.messages.append(
+            Message(
+                role="assistant",
+                content=content,
+                timestamp=timestamp,
+                tool_calls=tool_calls,
+            )
+        )
+        for tool_call in tool_calls:
+            self._unmatched_by_name.setdefault(tool_call.name, deque()).append(tool_call)
+            if tool_call.id:
+                self._unmatched_by_id[tool_call.id] = tool_call
+        self.has_assistant_message = True
+
+        # Add any pending tool messages now that we have an assistant message
+        if self.pending_tool_messages:
+            self.messages.extend(self.pending_tool_messages)
+            self.pending_tool_messages = []
+
+    def add_tool_message(
+        self,
+        tool_name: str,
+        content: str,
+        timestamp: datetime,
+        tool_use_id: Optional[str] = None,
+    ) -> None:
+        """
+        Record a tool output and attach it to the matching tool call.
+
+        The output is paired with the call carrying the same ``tool_use_id`` when the
+        framework provides one, otherwise with the oldest unanswered call of the tool.
+        """
+        tool_message = Message(
+            role="tool",
+            content=content,
+            timestamp=timestamp,
+            tool_calls=[],
+        )
+
+        # Update the corresponding tool call with the output
+        tool_call = self._match_tool_call(tool_name, tool_use_id)
+        if tool_call is not None:
+            tool_call.output = content
+
+        # Add message immediately if we have an assistant message, otherwise store it
+        if self.has_assistant_message:
+            self.messages.append(tool_message)
+        else:
+            self.pending_tool_messages.append(tool_message)
+
+    def _match_tool_call(self, tool_name: str, tool_use_id: Optional[str]) -> Optional[ToolCall]:
+        if tool_use_id:
+            tool_call = self._unmatched_by_id.pop(tool_use_id, None)
+            if tool_call is not None:
+                # Removed lazily from the per-name queue
+                self._matched.add(id(tool_call))
+                return tool_call
+
+        queue = self._unmatched_by_name.get(tool_name)
+        while queue:
+            tool_call = queue.popleft()
+            if id(tool_call) in self._matched:
+                self._matched.discard(id(tool_call))
+                continue
+            if tool_call.id:
+                self._unmatched_by_id.pop(tool_call.id, None)
+            return tool_call
+        return None
+
+    def build(self) -> Trajectory:
+        """Return the trajectory for everything added so far."""
+        self._release_held()
+        spans = sorted(self.spans, key=lambda x: x.start_time_unix_nano)
+        trajectory = Trajectory(trace_id=self.trace_id, messages=self.messages, spans=spans)
+        trajectory.span_tree  # built eagerly, while the spans are hot
+        return trajectory
+
 
 class TraceConverter:
     """Converts OpenTelemetry traces into agent trajectories using standardized conventions."""
 
+    def __init__(
+        self,
+        registry: Optional[SpanHandlerRegistry] = None,
+        frameworks: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the converter.
+
+        Args:
+            registry: Span handler registry; defaults to the built-in Strands and
+                CrewAI handlers in ``default_registry``
+            frameworks: Restrict parsing to these frameworks; defaults to all
+                registered frameworks
+        """
+        self.registry = registry if registry is not None else default_registry
+        self.frameworks = frameworks
+        self._index: Optional[SpanDispatchIndex] = None
+        self._index_version = -1
+
     def from_spans(self, spans: List[OTelSpan]) -> Trajectory:
-        sorted_spans = sorted(spans, key=lambda x: x.start_time)
-        internal_spans = []
-
-        # First convert all spans to our internal format
-        for span in sorted_spans:
-            internal_span = Span(
-                span_id=format(span.context.span_id, "016x"),
-                trace_id=format(span.context.trace_id, "032x"),
-                parent_id=format(span.parent.span_id, "016x") if span.parent else None,
-                name=span.name,
-                start_time=datetime.fromtimestamp(span.start_time / 1e9),
-                end_time=datetime.fromtimestamp(span.end_time / 1e9),
-                attributes=self._convert_attributes(span.attributes),
-                events=[
-                    SpanEvent(
-                        name=event.name,
-                        timestamp=datetime.fromtimestamp(event.timestamp / 1e9),
-                        attributes=self._convert_attributes(event.attributes),
-                    )
-                    for event in span.events
-                ],
+        with telemetry.traced(
+            telemetry.CONVERT_SPAN, telemetry.CONVERT_DURATION, {"span_count": len(spans)}
+        ):
+            sorted_spans = sorted(spans, key=lambda x: x.start_time)
+            builder = self.new_builder(
+                format(spans[0].context.trace_id, "032x") if spans else ""
             )
-            internal_spans.append(internal_span)
-
-        messages: List[Message] = []
-        current_tool_calls = []  # Track all tool calls for matching with outputs
-        pending_tool_messages = []  # Store tool messages until their assistant message
-        has_assistant_message = False
-
-        # Process spans to build the conversation
-        for span in internal_spans:
-            if span.name.startswith("Model invoke"):
-                # Handle Strands format
-                prompt = span.attributes.get("gen_ai.prompt")
-                completion = span.attributes.get("gen_ai.completion")
-
-                if prompt:
-                    try:
-                        prompt_data = json.loads(prompt)
-                        if isinstance(prompt_data, list) and len(prompt_data) > 0:
-                            user_msg = prompt_data[0]
-                            if user_msg.get("role") == "user" and not any(m.role == "user" for m in messages):
-                                content = user_msg.get("content", [])
-                                if isinstance(content, list) and len(content) > 0:
-                                    user_content = content[0].get("text", "")
-                                    messages.append(
-                                        Message(
-                                            role="user",
-                                            content=user_content,
-                                            timestamp=span.start_time,
-                                            tool_calls=[],
-                                        )
-                                    )
-                    except (json.JSONDecodeError, AttributeError):
-                        pass
-
-                if completion:
-                    try:
-                        completion_data = json.loads(completion)
-                        if isinstance(completion_data, list):
-                            thought = None
-                            tool_calls = []
-                            
-                            for item in completion_data:
-                                if isinstance(item, dict):
-                                    if "text" in item:
-                                        thought = item["text"]
-                                    elif "toolUse" in item:
-                                        tool_use = item["toolUse"]
-                                        tool_calls.append(
-                                            ToolCall(
-                                                name=tool_use.get("name", ""),
-                                                arguments=tool_use.get("input", {}),
-                                                timestamp=span.start_time,
-                                                output=None
-                                            )
-                                        )
-                            
-                            if thought or tool_calls:
-                                messages.append(
-                                    Message(
-                                        role="assistant",
-                                        content=thought or "",
-                                        timestamp=span.start_time,
-                                        tool_calls=tool_calls,
-                                    )
-                                )
-                                current_tool_calls.extend(tool_calls)
-                                has_assistant_message = True
-
-                                # Add any pending tool messages now that we have an assistant message
-                                if pending_tool_messages:
-                                    messages.extend(pending_tool_messages)
-                                    pending_tool_messages = []
-
-                    except (json.JSONDecodeError, AttributeError):
-                        pass
-
-            elif span.name.startswith("Tool:"):
-                # Handle Strands tool format
-                tool_name = span.name.replace("Tool: ", "")
-                tool_result = span.attributes.get("tool.result")
-                
-                if tool_result:
-                    try:
-                        result_data = json.loads(tool_result)
-                        if isinstance(result_data, list):
-                            # Combine all text parts
-                            tool_output_parts = []
-                            for item in result_data:
-                                if isinstance(item, dict) and "text" in item:
-                                    text = item.get("text", "").strip()
-                                    if text:
-                                        tool_output_parts.append(text)
-                            
-                            tool_output = "\n".join(tool_output_parts)
-                            
-                            if tool_output:
-                                tool_message = Message(
-                                    role="tool",
-                                    content=tool_output,
-                                    timestamp=span.end_time,
-                                    tool_calls=[],
-                                )
 
-                                # Update the corresponding tool call with the output
-                                for tool_call in current_tool_calls:
-                                    if tool_call.name == tool_name:
-                                        tool_call.output = tool_output
-                                        break
-
-                                # Add message immediately if we have an assistant message, otherwise store it
-                                if has_assistant_message:
-                                    messages.append(tool_message)
-                                else:
-                                    pending_tool_messages.append(tool_message)
-
-                    except (json.JSONDecodeError, AttributeError):
-                        pass
-
-            elif span.name.startswith("chat") or span.attributes.get(
-                "gen_ai.operation.name"
-            ) in ["chat", "completion"]:
-                # Handle CrewAI format
-                prompt = self._extract_prompt_from_events(span)
-                completion = self._extract_completion_from_events(span)
-
-                if prompt:
-                    user_content = self._extract_user_content_from_prompt(prompt)
-                    if user_content and not any(m.role == "user" for m in messages):
-                        messages.append(
-                            Message(
-                                role="user",
-                                content=user_content,
-                                timestamp=span.start_time,
-                                tool_calls=[],
-                            )
-                        )
+            for span in sorted_spans:
+                builder.add_span(self.convert_span(span))
+
+            return builder.build()
+
+    def new_builder(self, trace_id: str = "") -> TrajectoryBuilder:
+        """Create an empty builder that applies this converter's parsing rules."""
+        return TrajectoryBuilder(self, trace_id)
+
+    def from_spans_batch(
+        self,
+        spans: Iterable[OTelSpan],
+        max_workers: Optional[int] = None,
+        chunksize: int = 32,
+        executor: Optional[Executor] = None,
+    ) -> List[Trajectory]:
+        """
+        Convert a flat list of spans from many traces into one trajectory per trace.
+
+        Spans are grouped by trace id in a single pass and the groups are converted
+        in parallel across a process pool, ``chunksize`` traces per task.
+
+        Args:
+            spans: Finished spans, in any order and from any number of traces
+            max_workers: Number of worker processes; ``1`` converts in-process
+            chunksize: Number of traces sent to a worker per task
+            executor: Optional executor to reuse instead of creating a process pool
+
+        Returns:
+            Trajectories in order of the first appearance of their trace id
+        """
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be at least 1. Got: {chunksize}")
+
+        groups: Dict[int, List[tuple]] = {}
+        for span in spans:
+            groups.setdefault(span.context.trace_id, []).append(_span_record(span))
+
+        records = list(groups.values())
+        chunks = [records[i : i + chunksize] for i in range(0, len(records), chunksize)]
+
+        if executor is None and (max_workers == 1 or len(chunks) <= 1):
+            return _convert_record_chunk(self, records)
+
+        if executor is not None:
+            results = executor.map(_convert_record_chunk, [self] * len(chunks), chunks)
+            return [trajectory for chunk in results for trajectory in chunk]
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = pool.map(_convert_record_chunk, [self] * len(chunks), chunks)
+            return [trajectory for chunk in results for trajectory in chunk]
+
+    def convert_span(self, span: OTelSpan) -> Span:
+        """Convert an OpenTelemetry span to our internal format."""
+        return self._span_from_record(_span_record(span))
+
+    def _span_from_record(self, record: tuple) -> Span:
+        """Build an internal span from the snapshot taken by ``_span_record``."""
+        span_id, trace_id, parent_id, name, start_time, end_time, attributes, events = record
+        # The snapshot is trusted and already normalized, so validation is skipped
+        return Span.model_construct(
+            span_id=format(span_id, "016x"),
+            trace_id=format(trace_id, "032x"),
+            parent_id=format(parent_id, "016x") if parent_id is not None else None,
+            name=name,
+            start_time_unix_nano=int(start_time),
+            end_time_unix_nano=int(end_time),
+            attributes=self._convert_attributes(attributes),
+            events=[
+                SpanEvent.model_construct(
+                    name=event_name,
+                    timestamp_unix_nano=int(timestamp),
+                    attributes=self._convert_attributes(event_attributes),
+                )
+                for event_name, timestamp, event_attributes in events
+            ],
+        )
 
-                if completion:
-                    tool_calls, thought = self._parse_assistant_output(
-                        completion, span.start_time
-                    )
-                    if thought or tool_calls:
-                        messages.append(
-                            Message(
-                                role="assistant",
-                                content=thought or "",
-                                timestamp=span.start_time,
-                                tool_calls=tool_calls,
-                            )
-                        )
-                        current_tool_calls.extend(tool_calls)
-                        has_assistant_message = True
-
-                        # Add any pending tool messages now that we have an assistant message
-                        if pending_tool_messages:
-                            messages.extend(pending_tool_messages)
-                            pending_tool_messages = []
-
-            elif span.name == "Tool Usage" or span.attributes.get("gen_ai.agent.tools"):
-                # Handle CrewAI tool format
-                tool_name = None
-                tool_output = ""
-
-                # Try to get tool name from tool definition
-                if "gen_ai.agent.tools" in span.attributes:
-                    try:
-                        tools_str = span.attributes["gen_ai.agent.tools"]
-                        if isinstance(tools_str, str):
-                            tools = ast.literal_eval(tools_str)
-                            if tools and isinstance(tools, list) and len(tools) > 0:
-                                tool_name = tools[0].get("name")
-                    except (ValueError, SyntaxError, AttributeError):
-                        pass
-
-                # Get tool output from new format
-                if "gen_ai.agent.tool_results" in span.attributes:
-                    try:
-                        results_str = span.attributes["gen_ai.agent.tool_results"]
-                        if isinstance(results_str, str):
-                            results = ast.literal_eval(results_str)
-                            if (
-                                results
-                                and isinstance(results, list)
-                                and len(results) > 0
-                            ):
-                                tool_output = results[0].get("result", "")
-                    except (ValueError, SyntaxError, AttributeError):
-                        pass
-
-                if tool_output and tool_name:
-                    tool_output = tool_output.rstrip('"}')
-                    tool_message = Message(
-                        role="tool",
-                        content=tool_output,
-                        timestamp=span.end_time,
-                        tool_calls=[],
-                    )
+    def _process_span(self, builder: TrajectoryBuilder, span: Span) -> None:
+        """Update the conversation held by the builder with a single span."""
+        if self._index is None or self._index_version != self.registry.version:
+            self._index = self.registry.build_index(self.frameworks)
+            self._index_version = self.registry.version
 
-                    # Update the corresponding tool call with the output
-                    for tool_call in current_tool_calls:
-                        if tool_call.name == tool_name:
-                            tool_call.output = tool_output
-                            break
-
-                    # Add message immediately if we have an assistant message, otherwise store it
-                    if has_assistant_message:
-                        messages.append(tool_message)
-                    else:
-                        pending_tool_messages.append(tool_message)
-
-        return Trajectory(
-            trace_id=format(spans[0].context.trace_id, "032x") if spans else "",
-            messages=messages,
-            spans=internal_spans,
-        )
+        spec = self._index.resolve(span)
+        if spec is not None:
+            spec.handler(self, builder, span)
 
     def _convert_attributes(
         self, attributes: Dict[str, Union[str, int, float, bool, List[str]]]
@@ -297,62 +378,46 @@ class TraceConverter:
 
     def _parse_assistant_output(
         self, completion: str, timestamp: datetime
-    ) -> tuple[List[ToolCall], Optional[str]]:
+    ) -> Tuple[List[ToolCall], Optional[str]]:
         """Parse the assistant output to extract tool calls and thought."""
-        tool_calls = []
-
-        # Check for Final Answer first
-        if "Final Answer:" in completion:
-            final_answer_match = re.search(r"Final Answer:(.*?)(?=\n|$)", completion, re.DOTALL)
-            if final_answer_match:
-                return [], final_answer_match.group(1).strip()
-
-        # Extract thought if present
-        thought_match = re.search(
-            r"Thought:(.*?)(?=\nAction:|Final Answer:|$)", completion, re.DOTALL
-        )
-        thought = thought_match.group(1).strip() if thought_match else None
-
-        # Extract action if present
-        action_match = re.search(r"Action:(.*?)(?=\nAction Input:|$)", completion, re.DOTALL)
-        if action_match:
-            action = action_match.group(1).strip()
-            # Extract action input
-            action_input_match = re.search(
-                r"Action Input:(.*?)(?=\nObservation:|$)", completion, re.DOTALL
+        output = parse_react_output(completion)
+
+        # A final answer ends the turn
+        if output.final_answer is not None:
+            return [], output.final_answer
+
+        tool_calls = [
+            ToolCall(
+                name=action,
+                arguments=self._parse_action_input(action_input),
+                timestamp=timestamp,
+                output=None,
             )
-            if action_input_match:
-                action_input = action_input_match.group(1).strip()
-                # Try to parse action input as JSON
-                try:
-                    # If it's already a dictionary string, parse it
-                    if action_input.startswith("{"):
-                        arguments = json.loads(action_input)
-                    else:
-                        # If it's a quoted string, remove the quotes first
-                        if action_input.startswith('"') and action_input.endswith('"'):
-                            action_input = action_input[1:-1]
-                        # Try to find a JSON object within the string
-                        json_match = re.search(r"\{.*\}", action_input)
-                        if json_match:
-                            arguments = json.loads(json_match.group(0))
-                        else:
-                            # If no JSON found, create a simple dict with the input as a value
-                            arguments = {"input": action_input}
-                except json.JSONDecodeError:
-                    # If JSON parsing fails, create a simple dict with the input as a value
-                    arguments = {"input": action_input}
-
-                tool_calls.append(
-                    ToolCall(
-                        name=action,
-                        arguments=arguments,
-                        timestamp=timestamp,
-                        output=None,
-                    )
-                )
+            for action, action_input in output.actions
+            if action_input is not None
+        ]
+        return tool_calls, output.thought
+
+    def _parse_action_input(self, action_input: str) -> Dict[str, Any]:
+        """Parse the input of a ReAct action into tool call arguments."""
+        # Try to parse action input as JSON
+        try:
+            # If it's already a dictionary string, parse it
+            if action_input.startswith("{"):
+                return json.loads(action_input)
+
+            # If it's a quoted string, remove the quotes first
+            if action_input.startswith('"') and action_input.endswith('"'):
+                action_input = action_input[1:-1]
+            # Try to find a JSON object within the string
+            json_match = _JSON_OBJECT.search(action_input)
+            if json_match:
+                return json.loads(json_match.group(0))
+        except json.JSONDecodeError:
+            pass
 
-        return tool_calls, thought
+        # If no JSON found or parsing fails, create a simple dict with the input as a value
+        return {"input": action_input}
 
     def _extract_user_content_from_prompt(self, prompt: str) -> str:
         """Extracts the user's explicit task from the initial prompt structure."""
@@ -371,14 +436,11 @@ class TraceConverter:
             pass
 
         # Look for task in system prompt format
-        task_match = re.search(
-            r"Current Task:\s*(.*?)(?=\n\nThis is the expected criteria|$)",
-            user_content,
-            re.DOTALL,
-        )
-        if task_match:
-            user_content = task_match.group(1).strip()
-            return user_content
+        task_start = user_content.find("Current Task:")
+        if task_start != -1:
+            task_start += len("Current Task:")
+            task_end = user_content.find("\n\nThis is the expected criteria", task_start)
+            return user_content[task_start : task_end if task_end != -1 else None].strip()
 
         # Look for direct user message format
         if "user:" in user_content:
@@ -399,4 +461,201 @@ class TraceConverter:
 
             return user_content.strip()
 
-        return user_content.strip()
\ No newline at end of file
+        return user_content.strip()
+
+
+def _handle_strands_model_span(
+    converter: TraceConverter, builder: TrajectoryBuilder, span: Span
+) -> None:
+    """Handle Strands model invocation spans."""
+    prompt = span.attributes.get("gen_ai.prompt")
+    completion = span.attributes.get("gen_ai.completion")
+    # Built once from the nanosecond timestamp and shared by every message
+    timestamp = span.start_time
+
+    # The prompt carries the whole conversation so far; only its leading user turn
+    # is needed, and only until that turn has been recorded.
+    if prompt and isinstance(prompt, str) and not builder.has_user_message():
+        try:
+            user_msg = json_utils.loads_first_element(prompt)
+            if isinstance(user_msg, dict) and user_msg.get("role") == "user":
+                content = user_msg.get("content", [])
+                if isinstance(content, list) and len(content) > 0:
+                    user_content = content[0].get("text", "")
+                    builder.add_user_message(user_content, timestamp)
+        except (json_utils.JSONDecodeError, AttributeError):
+            pass
+
+    if completion:
+        try:
+            completion_data = json_utils.loads(completion)
+            if isinstance(completion_data, list):
+                thought = None
+                tool_calls = []
+
+                for item in completion_data:
+                    if isinstance(item, dict):
+                        if "text" in item:
+                            thought = item["text"]
+                        elif "toolUse" in item:
+                            tool_use = item["toolUse"]
+                            tool_calls.append(
+                                ToolCall(
+                                    id=tool_use.get("toolUseId"),
+                                    name=tool_use.get("name", ""),
+                                    arguments=tool_use.get("input", {}),
+                                    timestamp=timestamp,
+                                    output=None
+                                )
+                            )
+
+                if thought or tool_calls:
+                    builder.add_assistant_message(
+                        thought or "", tool_calls, timestamp
+                    )
+
+        except (json_utils.JSONDecodeError, AttributeError):
+            pass
+
+
+def _handle_strands_tool_span(
+    converter: TraceConverter, builder: TrajectoryBuilder, span: Span
+) -> None:
+    """Handle Strands tool spans."""
+    tool_name = span.name.replace("Tool: ", "")
+    tool_result = span.attributes.get("tool.result")
+
+    if tool_result:
+        try:
+            result_data = json_utils.loads(tool_result)
+            if isinstance(result_data, list):
+                # Combine all text parts
+                tool_output_parts = []
+                for item in result_data:
+                    if isinstance(item, dict) and "text" in item:
+                        text = item.get("text", "").strip()
+                        if text:
+                            tool_output_parts.append(text)
+
+                tool_output = "\n".join(tool_output_parts)
+
+                if tool_output:
+                    builder.add_tool_message(
+                        tool_name,
+                        tool_output,
+                        span.end_time,
+                        tool_use_id=span.attributes.get("gen_ai.tool.call.id")
+                        or span.attributes.get("tool.id"),
+                    )
+
+        except (json_utils.JSONDecodeError, AttributeError):
+            pass
+
+
+def _handle_crewai_chat_span(
+    converter: TraceConverter, builder: TrajectoryBuilder, span: Span
+) -> None:
+    """Handle CrewAI chat completion spans."""
+    prompt = converter._extract_prompt_from_events(span)
+    completion = converter._extract_completion_from_events(span)
+
+    if prompt:
+        user_content = converter._extract_user_content_from_prompt(prompt)
+        if user_content and not builder.has_user_message():
+            builder.add_user_message(user_content, span.start_time)
+
+    if completion:
+        timestamp = span.start_time
+        tool_calls, thought = converter._parse_assistant_output(completion, timestamp)
+        if thought or tool_calls:
+            builder.add_assistant_message(thought or "", tool_calls, timestamp)
+
+
+def _handle_crewai_tool_span(
+    converter: TraceConverter, builder: TrajectoryBuilder, span: Span
+) -> None:
+    """Handle CrewAI tool spans."""
+    tool_name = None
+    tool_output = ""
+
+    # Try to get tool name from tool definition
+    if "gen_ai.agent.tools" in span.attributes:
+        try:
+            tools_str = span.attributes["gen_ai.agent.tools"]
+            if isinstance(tools_str, str):
+                # Identical for every span of an agent, so served from the cache
+                tools = parse_literal(tools_str)
+                if tools and isinstance(tools, list) and len(tools) > 0:
+                    tool_name = tools[0].get("name")
+        except (ValueError, SyntaxError, AttributeError):
+            pass
+
+    # Get tool output from new format
+    if "gen_ai.agent.tool_results" in span.attributes:
+        try:
+            results_str = span.attributes["gen_ai.agent.tool_results"]
+            if isinstance(results_str, str):
+                results = parse_literal(results_str, cache=False)
+                if (
+                    results
+                    and isinstance(results, list)
+                    and len(results) > 0
+                ):
+                    tool_output = results[0].get("result", "")
+        except (ValueError, SyntaxError, AttributeError):
+            pass
+
+    if tool_output and tool_name:
+        tool_output = tool_output.rstrip('"}')
+        builder.add_tool_message(tool_name, tool_output, span.end_time)
+
+
+default_registry = SpanHandlerRegistry()
+default_registry.register(
+    "strands", _handle_strands_model_span, name_prefixes=["Model invoke"]
+)
+default_registry.register("strands", _handle_strands_tool_span, name_prefixes=["Tool:"])
+default_registry.register(
+    "crewai",
+    _handle_crewai_chat_span,
+    name_prefixes=["chat"],
+    operation_names=["chat", "completion"],
+)
+default_registry.register(
+    "crewai",
+    _handle_crewai_tool_span,
+    names=["Tool Usage"],
+    attribute_keys=["gen_ai.agent.tools"],
+)
+
+
+def _span_record(span: OTelSpan) -> tuple:
+    """Snapshot an OpenTelemetry span into picklable primitives."""
+    return (
+        span.context.span_id,
+        span.context.trace_id,
+        span.parent.span_id if span.parent else None,
+        span.name,
+        span.start_time,
+        span.end_time,
+        dict(span.attributes or {}),
+        [
+            (event.name, event.timestamp, dict(event.attributes or {}))
+            for event in span.events
+        ],
+    )
+
+
+def _convert_record_chunk(
+    converter: TraceConverter, groups: List[List[tuple]]
+) -> List[Trajectory]:
+    """Convert span snapshots grouped by trace; runs inside pool workers."""
+    trajectories = []
+    for records in groups:
+        builder = converter.new_builder(format(records[0][1], "032x"))
+        for record in sorted(records, key=lambda x: x[4]):
+            builder.add_span(converter._span_from_record(record))
+        trajectory = builder.build()
+        if not builder.only_internal_spans:
+            trajectories.append(trajectory)
+    return trajectories
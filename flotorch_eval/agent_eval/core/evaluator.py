@@ -2,33 +2,179 @@
 Evaluator module for computing metrics on agent trajectories.
 """
 
-from typing import List, Optional
+import asyncio
+import logging
+import pickle
+from contextlib import AsyncExitStack
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from pydantic import BaseModel, Field
 
+from flotorch_eval.agent_eval.core.gates import GateSpec, normalize_gates
+from flotorch_eval.agent_eval.core.journal import RunJournal
+from flotorch_eval.agent_eval.core.rate_limit import JudgeRateLimiter, estimate_judge_tokens
+from flotorch_eval.agent_eval.core.result_cache import MetricResultCache, trajectory_fingerprint
+from flotorch_eval.agent_eval.core.retry import NO_RETRY, RetryPolicy
+from flotorch_eval.agent_eval.core.sampling import SampleReport, SamplingPlanner
 from flotorch_eval.agent_eval.core.schemas import EvaluationResult, Trajectory
-from flotorch_eval.agent_eval.metrics.base import BaseMetric, MetricResult
+from flotorch_eval.agent_eval.core.views import view_scope
+from flotorch_eval.agent_eval.metrics.base import BaseMetric, MetricConfig, MetricResult
+from flotorch_eval.common import telemetry
+
+logger = logging.getLogger(__name__)
 
 
 class Evaluator:
-    """Orchestrates the evaluation of agent trajectories using multiple metrics."""
+    """
+    Orchestrates the evaluation of agent trajectories using multiple metrics.
+
+    The metrics of a trajectory run concurrently. ``max_concurrency`` caps the number
+    of metric computations in flight at once and ``metric_concurrency`` caps them
+    per metric name; both limits are shared by every ``evaluate`` call made on the
+    same event loop, so concurrent evaluations cannot exceed them either.
+
+    With ``cpu_workers`` set, metrics declared ``cpu_bound`` run in a reusable process
+    pool instead of on the event loop, which stays free to drive judge calls. All
+    offloaded metrics of a trajectory go to the pool as one task, so the trajectory
+    is serialized once per evaluation rather than once per metric; the pool size is
+    their concurrency limit.
+
+    Results of ``cacheable`` metrics can be kept in a persistent
+    :class:`MetricResultCache`, so re-running an unchanged suite does not call the
+    judges again.
+
+    A shared :class:`JudgeRateLimiter` can pace the metrics that call a judge
+    (``requires_llm``): it enforces request and token budgets and adapts their
+    concurrency, shrinking it when the provider throttles and growing it back as
+    calls succeed.
 
-    def __init__(self, metrics: Optional[List[BaseMetric]] = None):
+    Every metric runs under an optional deadline, and metrics that fail with a
+    transient error (throttling, timeouts, 5xx) can be retried with jittered
+    exponential backoff. When the deadline passes the computation is cancelled.
+    Results of metrics that could not be computed carry a ``timed_out`` or
+    ``failed`` status.
+
+    Metrics can be gated on the results of other metrics, e.g. an LLM judge on a
+    cheap deterministic check: a gated metric waits for its gates and is only
+    computed when they pass; otherwise its result has a ``skipped`` status.
+    Gates form a DAG, checked when the evaluator is created.
+    """
+
+    def __init__(
+        self,
+        metrics: Optional[List[BaseMetric]] = None,
+        max_concurrency: Optional[int] = None,
+        metric_concurrency: Optional[Dict[str, int]] = None,
+        cpu_workers: int = 0,
+        cpu_executor: Optional[Executor] = None,
+        timeout: Optional[float] = None,
+        metric_timeouts: Optional[Dict[str, float]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        result_cache: Optional[MetricResultCache] = None,
+        judge_cache: Optional[Any] = None,
+        rate_limiter: Optional[JudgeRateLimiter] = None,
+        gates: Optional[Mapping[str, GateSpec]] = None,
+    ):
         """
         Initialize evaluator with metrics.
 
         Args:
             metrics: List of metric instances to use for evaluation
+            max_concurrency: Maximum number of metric computations running at once;
+                ``None`` for no limit
+            metric_concurrency: Maximum number of concurrent computations per metric,
+                keyed by metric name
+            cpu_workers: Number of worker processes for CPU-bound metrics; 0 runs
+                them inline on the event loop
+            cpu_executor: Existing process pool to use for CPU-bound metrics instead
+                of creating one; it is not shut down by :meth:`close`
+            timeout: Deadline in seconds for each metric computation, retries and
+                backoff included; ``None`` for no deadline
+            metric_timeouts: Deadlines overriding ``timeout``, keyed by metric name
+            retry_policy: Policy for retrying metrics that fail with transient
+                errors; by default metrics are not retried
+            result_cache: Cache consulted before computing ``cacheable`` metrics
+                and filled with their successful results
+            judge_cache: LangChain cache (e.g. ``JudgeCache``) attached to the judge
+                model of every metric, so identical judge prompts are sent once
+            rate_limiter: Limiter shared by every metric that calls a judge; it can
+                also be shared between evaluators using the same provider account
+            gates: Conditions on cheaper metrics that must hold for a metric to be
+                computed, keyed by the name of the gated metric; a metric name
+                alone requires that metric to score 1
         """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        for name, limit in (metric_concurrency or {}).items():
+            if limit < 1:
+                raise ValueError(f"Concurrency limit for metric {name!r} must be at least 1")
+        if cpu_workers < 0:
+            raise ValueError("cpu_workers must not be negative")
+
         self.metrics = metrics or []
+        self.max_concurrency = max_concurrency
+        self.metric_concurrency = dict(metric_concurrency or {})
+        self.cpu_workers = cpu_workers
+        self.timeout = timeout
+        self.metric_timeouts = dict(metric_timeouts or {})
+        self.retry_policy = retry_policy or NO_RETRY
+        self.result_cache = result_cache
+        self.judge_cache = judge_cache
+        self.rate_limiter = rate_limiter
+        self.gates = normalize_gates(gates)
+        self._attach_judge_cache(self.metrics)
+        self._cpu_executor = cpu_executor
+        self._owns_cpu_executor = False
+
+        # Semaphores are bound to the loop they are first used on, so they are
+        # created lazily and recreated when the evaluator moves to another loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        self._metric_limits: Dict[str, asyncio.Semaphore] = {}
 
     def add_metric(self, metric: BaseMetric) -> None:
         """Add a metric to the evaluator."""
         self.metrics.append(metric)
+        self._attach_judge_cache([metric])
 
     def add_metrics(self, metrics: List[BaseMetric]) -> None:
         """Add multiple metrics to the evaluator."""
         self.metrics.extend(metrics)
+        self._attach_judge_cache(metrics)
+
+    def _attach_judge_cache(self, metrics: List[BaseMetric]) -> None:
+        if self.judge_cache is None:
+            return
+        # Imported lazily: LangChain is only needed when a judge cache is used
+        from flotorch_eval.agent_eval.integrations.judge_cache import attach_judge_cache
+
+        for metric in metrics:
+            if metric.llm is not None:
+                attach_judge_cache(metric.llm, self.judge_cache)
+
+    def close(self) -> None:
+        """Shut down the process pool created for CPU-bound metrics, if any."""
+        if self._owns_cpu_executor and self._cpu_executor is not None:
+            self._cpu_executor.shutdown()
+            self._cpu_executor = None
+            self._owns_cpu_executor = False
 
     async def evaluate(
         self, trajectory: Trajectory, metrics: Optional[List[BaseMetric]] = None
@@ -36,18 +182,535 @@ class Evaluator:
         """
         Evaluate a trajectory using the configured metrics.
 
+        Metrics run concurrently; scores are returned in the order of the metrics. A
+        metric that raises or misses its deadline does not affect the others and is
+        reported as a result with a ``failed`` or ``timed_out`` status, a score of 0
+        and the error in its details.
+
         Args:
             trajectory: The trajectory to evaluate
             metrics: Optional list of metrics to use instead of configured ones
 
         Returns:
             EvaluationResult containing scores from all metrics
+
+        Raises:
+            ValueError: If a metric is gated on a metric that is not evaluated
         """
+        if metrics:
+            self._attach_judge_cache(metrics)
         metrics_to_use = metrics or self.metrics
-        scores = []
+        return EvaluationResult(
+            trajectory_id=trajectory.trace_id,
+            scores=await self._scores(trajectory, metrics_to_use, {}),
+        )
+
+    async def _scores(
+        self,
+        trajectory: Trajectory,
+        metrics_to_use: List[BaseMetric],
+        known: Dict[str, MetricResult],
+    ) -> List[MetricResult]:
+        cached: Dict[int, MetricResult] = {}
+        fingerprint = None
+        loop = asyncio.get_running_loop()
+        if self.result_cache is not None:
+            fingerprint = trajectory_fingerprint(trajectory)
+            cacheable = [metric for metric in metrics_to_use if metric.cacheable]
+            # SQLite I/O runs in a thread, so it does not stall the metrics of
+            # other evaluations running on the loop
+            if cacheable:
+                cached = await loop.run_in_executor(
+                    None, self._cache_lookup, fingerprint, cacheable
+                )
+        pending = [metric for metric in metrics_to_use if id(metric) not in cached]
+
+        # Gated metrics are computed inline once their gates pass, so they are
+        # never part of the batch sent to the process pool
+        offloaded = [
+            metric
+            for metric in pending
+            if self._offloads(metric) and metric.name not in self.gates
+        ]
+        batch = self._submit_cpu_bound(trajectory, offloaded) if offloaded else None
+        positions = {id(metric): i for i, metric in enumerate(offloaded)}
+
+        def run(metric: BaseMetric) -> Callable[[], Awaitable[MetricResult]]:
+            if id(metric) in positions:
+                return lambda: self._await_offloaded(
+                    metric, trajectory, batch, positions[id(metric)]
+                )
+            return lambda: self._compute_metric(metric, trajectory)
+
+        # Metrics share the conversions of the trajectory they need (Ragas messages,
+        # token usage, ...) through the view cache of this evaluation
+        with view_scope():
+            if self.gates:
+                gate_results = self._gate_results(metrics_to_use, known, cached)
+                computed = await asyncio.gather(
+                    *(
+                        self._gated(metric, trajectory, run(metric), gate_results)
+                        for metric in pending
+                    )
+                )
+            else:
+                computed = await asyncio.gather(*(run(metric)() for metric in pending))
+        for metric, result in zip(pending, computed):
+            cached[id(metric)] = result
+        if fingerprint is not None:
+            to_store = [
+                (metric, result)
+                for metric, result in zip(pending, computed)
+                if metric.cacheable and result.status == "success"
+            ]
+            if to_store:
+                await loop.run_in_executor(None, self._cache_store, fingerprint, to_store)
+
+        return [cached[id(metric)] for metric in metrics_to_use]
+
+    def _cache_lookup(
+        self, fingerprint: str, metrics: List[BaseMetric]
+    ) -> Dict[int, MetricResult]:
+        found = {}
+        for metric in metrics:
+            result = self.result_cache.get(fingerprint, metric)
+            if result is not None:
+                found[id(metric)] = result
+        return found
+
+    def _cache_store(
+        self, fingerprint: str, results: List[Tuple[BaseMetric, MetricResult]]
+    ) -> None:
+        for metric, result in results:
+            self.result_cache.set(fingerprint, metric, result)
+
+    def _gate_results(
+        self,
+        metrics_to_use: List[BaseMetric],
+        known: Dict[str, MetricResult],
+        cached: Dict[int, MetricResult],
+    ) -> Dict[str, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        results: Dict[str, asyncio.Future] = {}
+        for name, result in known.items():
+            results[name] = loop.create_future()
+            results[name].set_result(result)
+        for metric in metrics_to_use:
+            future = results.setdefault(metric.name, loop.create_future())
+            if id(metric) in cached and not future.done():
+                future.set_result(cached[id(metric)])
 
         for metric in metrics_to_use:
-            result = await metric.compute(trajectory)
-            scores.append(result)
+            for gate in self.gates.get(metric.name, ()):
+                if gate.metric not in results:
+                    raise ValueError(
+                        f"Metric {metric.name!r} is gated on {gate.metric!r}, "
+                        "which is not being evaluated"
+                    )
+        return results
+
+    async def _gated(
+        self,
+        metric: BaseMetric,
+        trajectory: Trajectory,
+        compute: Callable[[], Awaitable[MetricResult]],
+        gate_results: Dict[str, asyncio.Future],
+    ) -> MetricResult:
+        future = gate_results[metric.name]
+        try:
+            result = None
+            for gate in self.gates.get(metric.name, ()):
+                # Shielded: the future is shared with the other metrics gated on it
+                gate_result = await asyncio.shield(gate_results[gate.metric])
+                if not gate.passes(gate_result):
+                    reason = gate.describe(gate_result)
+                    logger.debug(
+                        "Skipping metric %s on trajectory %s: %s",
+                        metric.name,
+                        trajectory.trace_id,
+                        reason,
+                    )
+                    result = MetricResult(
+                        name=metric.name, score=0.0, status="skipped", details={"reason": reason}
+                    )
+                    break
+            if result is None:
+                result = await compute()
+        except BaseException:
+            if not future.done():
+                future.cancel()
+            raise
+        if not future.done():
+            future.set_result(result)
+        return result
+
+    async def evaluate_many(
+        self,
+        trajectories: Union[Iterable[Trajectory], AsyncIterable[Trajectory]],
+        metrics: Optional[List[BaseMetric]] = None,
+        concurrency: int = 8,
+        ordered: bool = False,
+        journal: Optional[RunJournal] = None,
+    ) -> AsyncIterator[EvaluationResult]:
+        """
+        Evaluate a stream of trajectories with a bounded number of evaluations in flight.
+
+        Trajectories are pulled from the source only when a slot is free, so memory
+        stays constant however large the dataset is. Results are yielded as soon as
+        they are available; with ``ordered=True`` they are yielded in input order, and
+        finished results waiting behind a slower one count against ``concurrency``.
+        The concurrency limits of the evaluator apply across all evaluations.
+
+        With a ``journal``, the results of each trajectory are appended to it as soon
+        as they are computed, and metrics the journal already holds a successful
+        result for are not computed again, so a run that died can be restarted
+        with the same journal and only pays for the remaining work. Journaled
+        results are included in the yielded results.
+
+        Args:
+            trajectories: Iterable or async iterable of trajectories
+            metrics: Optional list of metrics to use instead of configured ones
+            concurrency: Maximum number of trajectories evaluated at once
+            ordered: Whether to yield results in input order
+            journal: Journal recording finished results, keyed by trajectory id and
+                metric name
+
+        Returns:
+            Async iterator of evaluation results
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        source = _TrajectorySource(trajectories)
+        in_flight: Deque[asyncio.Task] = deque()
+        try:
+            while True:
+                while len(in_flight) < concurrency:
+                    trajectory = await source.next()
+                    if trajectory is None:
+                        break
+                    evaluation = (
+                        self.evaluate(trajectory, metrics)
+                        if journal is None
+                        else self._evaluate_journaled(trajectory, metrics, journal)
+                    )
+                    task = asyncio.ensure_future(evaluation)
+                    if telemetry.instrumentation_enabled():
+                        telemetry.adjust(telemetry.EVALUATIONS_IN_FLIGHT, 1)
+                        task.add_done_callback(_evaluation_done)
+                    in_flight.append(task)
+                if not in_flight:
+                    return
+
+                if ordered:
+                    yield await in_flight.popleft()
+                    continue
+
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in [task for task in in_flight if task in done]:
+                    in_flight.remove(task)
+                    yield task.result()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def evaluate_sample(
+        self,
+        trajectories: Iterable[Trajectory],
+        planner: SamplingPlanner,
+        metrics: Optional[List[BaseMetric]] = None,
+        concurrency: int = 8,
+    ) -> SampleReport:
+        """
+        Estimate the metrics over a population by evaluating a stratified sample.
+
+        The sample grows batch by batch, as laid out by ``planner``, until the
+        bootstrap confidence interval of every metric is narrow enough, so the
+        number of judge calls depends on the precision asked for rather than on the
+        size of the population.
+
+        Args:
+            trajectories: The population to estimate the metrics over
+            planner: Sampling settings: strata, target interval width, batch size
+            metrics: Optional list of metrics to use instead of configured ones
+            concurrency: Maximum number of trajectories evaluated at once
+
+        Returns:
+            SampleReport with the estimates, the per-stratum sample sizes and the
+            results of the sampled trajectories
+        """
+        plan = planner.plan(trajectories)
+        while True:
+            batch = plan.next_batch()
+            if not batch:
+                break
+            async for result in self.evaluate_many(batch, metrics, concurrency):
+                plan.add(result)
+            report = plan.report()
+            if report.converged:
+                return report
+        return plan.report()
+
+    async def _evaluate_journaled(
+        self, trajectory: Trajectory, metrics: Optional[List[BaseMetric]], journal: RunJournal
+    ) -> EvaluationResult:
+        metrics_to_use = metrics or self.metrics
+        if metrics:
+            self._attach_judge_cache(metrics)
+        results = {
+            metric.name: journal.finished(trajectory.trace_id, metric.name)
+            for metric in metrics_to_use
+        }
+        pending = [metric for metric in metrics_to_use if results[metric.name] is None]
+        if pending:
+            # Journaled results still decide the gates of the metrics left to compute
+            known = {name: result for name, result in results.items() if result is not None}
+            computed = await self._scores(trajectory, pending, known)
+            # Written and flushed, sometimes fsynced, so kept off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, journal.record, trajectory.trace_id, computed
+            )
+            for metric, result in zip(pending, computed):
+                results[metric.name] = result
+
+        return EvaluationResult(
+            trajectory_id=trajectory.trace_id,
+            scores=[results[metric.name] for metric in metrics_to_use],
+        )
+
+    async def _compute_metric(self, metric: BaseMetric, trajectory: Trajectory) -> MetricResult:
+        return await self._with_deadline(
+            metric, trajectory, lambda attempts: self._run_with_retries(metric, trajectory, attempts)
+        )
+
+    async def _await_offloaded(
+        self, metric: BaseMetric, trajectory: Trajectory, batch: asyncio.Future, index: int
+    ) -> MetricResult:
+        async def wait_for_batch(attempts: List[int]) -> MetricResult:
+            attempts[0] = 1
+            # Shielded: the batch is shared by the other offloaded metrics
+            result, error = (await asyncio.shield(batch))[index]
+            if error is not None:
+                raise RuntimeError(error)
+            return result
+
+        return await self._with_deadline(metric, trajectory, wait_for_batch)
+
+    async def _with_deadline(
+        self,
+        metric: BaseMetric,
+        trajectory: Trajectory,
+        run: Callable[[List[int]], Awaitable[MetricResult]],
+    ) -> MetricResult:
+        with telemetry.traced(
+            telemetry.METRIC_SPAN, telemetry.METRIC_DURATION, {"metric": metric.name}
+        ) as traced:
+            result = await self._run_with_deadline(metric, trajectory, run)
+            if traced is not None:
+                traced.set("status", result.status)
+        if result.status != "success":
+            telemetry.count(
+                telemetry.METRIC_ERRORS, {"metric": metric.name, "status": result.status}
+            )
+        return result
+
+    async def _run_with_deadline(
+        self,
+        metric: BaseMetric,
+        trajectory: Trajectory,
+        run: Callable[[List[int]], Awaitable[MetricResult]],
+    ) -> MetricResult:
+        timeout = self.metric_timeouts.get(metric.name, self.timeout)
+        attempts = [0]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            if timeout is None:
+                return await run(attempts)
+            return await asyncio.wait_for(run(attempts), timeout)
+        except asyncio.TimeoutError as e:
+            if timeout is not None and loop.time() - started >= timeout:
+                return self._unfinished_result(
+                    metric, trajectory, "timed_out", f"Timed out after {timeout}s", attempts[0]
+                )
+            return self._unfinished_result(metric, trajectory, "failed", str(e), attempts[0])
+        except Exception as e:
+            return self._unfinished_result(metric, trajectory, "failed", str(e), attempts[0])
+
+    async def _run_with_retries(
+        self, metric: BaseMetric, trajectory: Trajectory, attempts: List[int]
+    ) -> MetricResult:
+        global_limit, metric_limit = self._limits_for(metric.name)
+        rate_limiter = self.rate_limiter if metric.requires_llm else None
+        estimated_tokens = estimate_judge_tokens(trajectory) if rate_limiter else 0
+        while True:
+            attempts[0] += 1
+            try:
+                # The judge budget is waited for first, then the per-metric and
+                # global slots, and the judge concurrency slot last, so that no slot
+                # is held idle while waiting for another. Slots are released while
+                # backing off.
+                if rate_limiter is not None:
+                    await rate_limiter.wait_for_budget(estimated_tokens)
+                async with AsyncExitStack() as stack:
+                    if metric_limit is not None:
+                        await stack.enter_async_context(metric_limit)
+                    if global_limit is not None:
+                        await stack.enter_async_context(global_limit)
+                    if rate_limiter is not None:
+                        await stack.enter_async_context(_JudgeSlot(rate_limiter))
+                    return await metric.compute(trajectory)
+            except Exception as e:
+                # Metrics let judge errors propagate rather than scoring them 0, so
+                # transient ones are retried here and the rest reported as failures
+                if not self.retry_policy.should_retry(e, attempts[0]):
+                    raise
+                delay = self.retry_policy.backoff(attempts[0])
+                logger.info(
+                    "Retrying metric %s on trajectory %s in %.2fs after attempt %d failed: %s",
+                    metric.name,
+                    trajectory.trace_id,
+                    delay,
+                    attempts[0],
+                    e,
+                )
+                await asyncio.sleep(delay)
+
+    def _unfinished_result(
+        self,
+        metric: BaseMetric,
+        trajectory: Trajectory,
+        status: str,
+        error: str,
+        attempts: int,
+    ) -> MetricResult:
+        logger.warning(
+            "Metric %s %s on trajectory %s after %d attempt(s): %s",
+            metric.name,
+            status.replace("_", " "),
+            trajectory.trace_id,
+            attempts,
+            error,
+        )
+        return MetricResult(
+            name=metric.name,
+            score=0.0,
+            status=status,
+            details={"error": error, "attempts": attempts},
+        )
+
+    def _offloads(self, metric: BaseMetric) -> bool:
+        return (
+            (self.cpu_workers > 0 or self._cpu_executor is not None)
+            and metric.cpu_bound
+            and not metric.requires_llm
+        )
+
+    def _submit_cpu_bound(
+        self, trajectory: Trajectory, metrics: List[BaseMetric]
+    ) -> asyncio.Future:
+        if self._cpu_executor is None:
+            self._cpu_executor = ProcessPoolExecutor(max_workers=self.cpu_workers)
+            self._owns_cpu_executor = True
+
+        payload = pickle.dumps(trajectory, protocol=pickle.HIGHEST_PROTOCOL)
+        specs = [(type(metric), metric.config) for metric in metrics]
+        return asyncio.get_running_loop().run_in_executor(
+            self._cpu_executor, _compute_in_worker, payload, specs
+        )
+
+    def _limits_for(
+        self, name: str
+    ) -> Tuple[Optional[asyncio.Semaphore], Optional[asyncio.Semaphore]]:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._global_limit = (
+                asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+            )
+            self._metric_limits = {}
+
+        metric_limit = self._metric_limits.get(name)
+        if metric_limit is None and name in self.metric_concurrency:
+            metric_limit = self._metric_limits[name] = asyncio.Semaphore(
+                self.metric_concurrency[name]
+            )
+        return self._global_limit, metric_limit
+
+
+class _JudgeSlot:
+    """Async context holding a judge concurrency slot and reporting the outcome."""
+
+    def __init__(self, limiter: JudgeRateLimiter):
+        self.limiter = limiter
+        self.ticket = 0
+
+    async def __aenter__(self) -> "_JudgeSlot":
+        self.ticket = await self.limiter.acquire_slot()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.limiter.release(self.ticket, exc)
+
+
+def _evaluation_done(task: asyncio.Future) -> None:
+    telemetry.adjust(telemetry.EVALUATIONS_IN_FLIGHT, -1)
+
+
+class _TrajectorySource:
+    """Uniform pull interface over sync and async iterables of trajectories."""
+
+    def __init__(self, trajectories: Union[Iterable[Trajectory], AsyncIterable[Trajectory]]):
+        if hasattr(trajectories, "__aiter__"):
+            self._async = trajectories.__aiter__()
+            self._sync = None
+        else:
+            self._async = None
+            self._sync = iter(trajectories)
+
+        self._exhausted = False
+
+    async def next(self) -> Optional[Trajectory]:
+        """Return the next trajectory, or ``None`` when the source is exhausted."""
+        if self._exhausted:
+            return None
+        if self._sync is not None:
+            trajectory = next(self._sync, None)
+        else:
+            try:
+                trajectory = await self._async.__anext__()
+            except StopAsyncIteration:
+                trajectory = None
+        self._exhausted = trajectory is None
+        return trajectory
+
+
+# Per-process state of the CPU-bound metric workers
+_worker_metrics: Dict[Tuple[type, bytes], BaseMetric] = {}
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _compute_in_worker(
+    payload: bytes, specs: List[Tuple[Type[BaseMetric], MetricConfig]]
+) -> List[Tuple[Optional[MetricResult], Optional[str]]]:
+    """Run CPU-bound metrics on a pickled trajectory; runs inside pool workers."""
+    global _worker_loop
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
 
-        return EvaluationResult(trajectory_id=trajectory.trace_id, scores=scores)
+    trajectory = pickle.loads(payload)
+    results: List[Tuple[Optional[MetricResult], Optional[str]]] = []
+    with view_scope():
+        for metric_cls, config in specs:
+            try:
+                # Metrics are rebuilt once per worker and configuration, not per task
+                key = (metric_cls, pickle.dumps(config))
+                metric = _worker_metrics.get(key)
+                if metric is None:
+                    metric = _worker_metrics[key] = metric_cls(config=config)
+                results.append(
+                    (_worker_loop.run_until_complete(metric.compute(trajectory)), None)
+                )
+            except Exception as e:
+                results.append((None, str(e)))
+    return results
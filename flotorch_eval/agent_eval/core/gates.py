@@ -0,0 +1,91 @@
+"""
+Gate conditions making a metric depend on the results of cheaper metrics.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from flotorch_eval.agent_eval.core.schemas import MetricResult
+
+
+@dataclass(frozen=True)
+class Gate:
+    """
+    Condition on the result of another metric.
+
+    A gate passes when the metric it refers to succeeded and either ``predicate``
+    accepts its result or, without a predicate, its score is at least ``min_score``.
+
+    Attributes:
+        metric: Name of the metric the gate looks at
+        min_score: Lowest passing score
+        predicate: Custom test of the result, replacing ``min_score``
+    """
+
+    metric: str
+    min_score: float = 1.0
+    predicate: Optional[Callable[[MetricResult], bool]] = None
+
+    def passes(self, result: MetricResult) -> bool:
+        """Return whether ``result`` satisfies the gate."""
+        if result.status != "success":
+            return False
+        if self.predicate is not None:
+            return bool(self.predicate(result))
+        return result.score >= self.min_score
+
+    def describe(self, result: MetricResult) -> str:
+        """Explain why ``result`` does not satisfy the gate."""
+        if result.status != "success":
+            return f"gate metric {self.metric} has status {result.status}"
+        if self.predicate is not None:
+            return f"gate on {self.metric} rejected its result"
+        return f"{self.metric} scored {result.score:g}, below {self.min_score:g}"
+
+
+GateSpec = Union[str, Gate, Sequence[Union[str, Gate]]]
+
+
+def normalize_gates(gates: Optional[Mapping[str, GateSpec]]) -> Dict[str, Tuple[Gate, ...]]:
+    """
+    Validate gate declarations and bring them into one form.
+
+    A metric name stands for a :class:`Gate` with the default ``min_score``.
+
+    Args:
+        gates: Gates keyed by the name of the metric they guard
+
+    Returns:
+        Tuple of gates per guarded metric name
+
+    Raises:
+        ValueError: If a metric is gated on itself or the gates form a cycle
+    """
+    normalized: Dict[str, Tuple[Gate, ...]] = {}
+    for name, spec in (gates or {}).items():
+        specs: Iterable[Union[str, Gate]] = [spec] if isinstance(spec, (str, Gate)) else spec
+        normalized[name] = tuple(
+            Gate(item) if isinstance(item, str) else item for item in specs
+        )
+
+    # Depth-first search for a cycle
+    state: Dict[str, int] = {}  # 1: on the stack, 2: done
+    for start in normalized:
+        if state.get(start):
+            continue
+        stack: List[Tuple[str, Iterable[Gate]]] = [(start, iter(normalized[start]))]
+        state[start] = 1
+        while stack:
+            name, deps = stack[-1]
+            gate = next(deps, None)
+            if gate is None:
+                state[name] = 2
+                stack.pop()
+                continue
+            if state.get(gate.metric) == 1:
+                path = [entry[0] for entry in stack] + [gate.metric]
+                raise ValueError(f"Metric gates form a cycle: {' -> '.join(path)}")
+            if not state.get(gate.metric):
+                state[gate.metric] = 1
+                stack.append((gate.metric, iter(normalized.get(gate.metric, ()))))
+    return normalized
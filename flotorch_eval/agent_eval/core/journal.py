@@ -0,0 +1,164 @@
+"""
+Append-only journal of metric results for resumable batch evaluations.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from flotorch_eval.agent_eval.core.schemas import MetricResult
+
+logger = logging.getLogger(__name__)
+
+
+class RunJournal:
+    """
+    JSONL journal of the metric results of a batch run, keyed by trajectory id and
+    metric name.
+
+    Every result is appended as one line and flushed to the operating system, so a
+    crash of the process loses nothing; the file is fsynced at most once per
+    ``sync_interval`` seconds to bound the cost of surviving a machine failure. A
+    line cut short by a crash is ignored when the journal is reopened.
+
+    Only successful results count as finished, so failed and timed out metrics are
+    computed again on the next run. Time spent writing is recorded in
+    :meth:`stats` so the overhead can be compared with the evaluation time.
+    Writes may come from several threads.
+    """
+
+    def __init__(self, path: str, sync_interval: Optional[float] = 1.0):
+        """
+        Open or create a journal.
+
+        Args:
+            path: Path of the JSONL file; parent directories are created
+            sync_interval: Minimum number of seconds between fsyncs; 0 syncs every
+                write, ``None`` leaves syncing to the operating system
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.sync_interval = sync_interval
+        self.records_written = 0
+        self.bytes_written = 0
+        self.write_seconds = 0.0
+        self.corrupt_lines = 0
+
+        self._lock = threading.Lock()
+        self._finished: Dict[Tuple[str, str], MetricResult] = {}
+        if os.path.exists(path):
+            self._load()
+        self._file = open(path, "ab")
+        if self._file.tell() and not self._ends_with_newline():
+            # Terminate a line cut short by a crash so the next record starts clean
+            self._file.write(b"\n")
+        self._last_sync = time.monotonic()
+
+    def _load(self) -> None:
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    key = (record["trajectory_id"], record["metric"])
+                    result = MetricResult.model_validate(record["result"])
+                except (ValueError, KeyError, TypeError):
+                    self.corrupt_lines += 1
+                    continue
+                if result.status == "success":
+                    self._finished[key] = result
+        if self.corrupt_lines:
+            logger.warning(
+                "Ignored %d unreadable line(s) in journal %s", self.corrupt_lines, self.path
+            )
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def finished(self, trajectory_id: str, metric_name: str) -> Optional[MetricResult]:
+        """
+        Return the journaled result of a metric on a trajectory, if it succeeded.
+
+        Args:
+            trajectory_id: Trace id of the trajectory
+            metric_name: Name of the metric
+
+        Returns:
+            The result, or ``None`` if the metric still has to be computed
+        """
+        return self._finished.get((trajectory_id, metric_name))
+
+    def record(self, trajectory_id: str, results: List[MetricResult]) -> None:
+        """
+        Append the results of a trajectory with a single write.
+
+        Args:
+            trajectory_id: Trace id of the trajectory
+            results: Newly computed metric results
+        """
+        if not results:
+            return
+        started = time.perf_counter()
+        data = b"".join(
+            json.dumps(
+                {
+                    "trajectory_id": trajectory_id,
+                    "metric": result.name,
+                    "result": result.model_dump(mode="json"),
+                }
+            ).encode("utf-8")
+            + b"\n"
+            for result in results
+        )
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            now = time.monotonic()
+            if self.sync_interval is not None and now - self._last_sync >= self.sync_interval:
+                os.fsync(self._file.fileno())
+                self._last_sync = now
+
+            for result in results:
+                if result.status == "success":
+                    self._finished[(trajectory_id, result.name)] = result
+            self.records_written += len(results)
+            self.bytes_written += len(data)
+            self.write_seconds += time.perf_counter() - started
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return counters of the journal.
+
+        Returns:
+            Dictionary with the number of finished results loaded or written, the
+            records and bytes written by this process and the time spent writing
+        """
+        return {
+            "finished": len(self._finished),
+            "records_written": self.records_written,
+            "bytes_written": self.bytes_written,
+            "write_seconds": self.write_seconds,
+            "corrupt_lines": self.corrupt_lines,
+        }
+
+    def close(self) -> None:
+        """Sync and close the journal file."""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._finished)
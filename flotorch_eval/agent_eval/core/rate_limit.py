@@ -0,0 +1,252 @@
+"""
+Rate limiting and adaptive concurrency for judge LLM calls.
+"""
+
+import asyncio
+import json
+from typing import Optional
+
+from flotorch_eval.agent_eval.core.retry import is_throttling_error
+from flotorch_eval.agent_eval.core.schemas import Trajectory
+
+
+def estimate_judge_tokens(trajectory: Trajectory, completion_tokens: int = 512) -> int:
+    """
+    Rough token count of a judge call on a trajectory, at about four characters
+    per token for the messages and tool calls, plus the expected completion.
+
+    Args:
+        trajectory: The trajectory the judge is asked about
+        completion_tokens: Allowance for the prompt template and the answer
+
+    Returns:
+        Estimated number of tokens
+    """
+    chars = 0
+    for message in trajectory.messages:
+        chars += len(message.content or "")
+        for call in message.tool_calls or []:
+            chars += len(call.name) + len(json.dumps(call.arguments, default=str))
+            chars += len(str(call.output or ""))
+    return chars // 4 + completion_tokens
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket refilled continuously at ``rate_per_minute``.
+
+    Waiters are served in arrival order. A request larger than the bucket is
+    clamped to its capacity, so it waits for a full bucket instead of forever.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Create a full bucket.
+
+        Args:
+            rate_per_minute: Refill rate
+            capacity: Maximum burst; defaults to one minute worth of tokens
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self._updated: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until ``amount`` tokens are available and take them."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._lock = loop, asyncio.Lock()
+
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill(loop.time())
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class AIMDConcurrency:
+    """
+    Concurrency limit adjusted by additive increase / multiplicative decrease.
+
+    Every successful call grows the limit by ``increase / limit`` (about
+    ``increase`` per round of calls); a throttled call multiplies it by
+    ``decrease``. Calls started before the last decrease do not decrease it again,
+    so one burst of rejections shrinks the limit only once.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+    ):
+        """
+        Create the controller.
+
+        Args:
+            initial: Starting concurrency limit
+            minimum: Lower bound of the limit
+            maximum: Upper bound of the limit
+            increase: Additive increase per round of successful calls
+            decrease: Factor applied to the limit on throttling
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("Expected 1 <= minimum <= initial <= maximum")
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self.throttled = 0
+        self._epoch = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._condition = loop, asyncio.Condition()
+        return self._condition
+
+    async def acquire(self) -> int:
+        """
+        Wait for a free slot and take it.
+
+        Returns:
+            Ticket to pass to :meth:`release`
+        """
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            return self._epoch
+
+    async def release(
+        self, ticket: int, succeeded: bool = True, throttled: bool = False
+    ) -> None:
+        """
+        Give a slot back and adjust the limit.
+
+        A call that neither succeeded nor was throttled (a cancellation or an
+        unrelated error) leaves the limit unchanged.
+
+        Args:
+            ticket: Value returned by :meth:`acquire`
+            succeeded: Whether the call succeeded
+            throttled: Whether the call was rejected for load
+        """
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            if throttled:
+                self.throttled += 1
+                if ticket == self._epoch:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._epoch += 1
+            elif succeeded:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+            condition.notify_all()
+
+
+class JudgeRateLimiter:
+    """
+    Shared limiter for judge calls: request and token budgets plus adaptive concurrency.
+
+    One instance is meant to be shared by every LLM-backed metric of an
+    ``Evaluator`` (or of several evaluators talking to the same provider account).
+    Token usage of a call is not known in advance, so callers pass an estimate.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        concurrency: Optional[AIMDConcurrency] = None,
+        burst_seconds: float = 60.0,
+    ):
+        """
+        Create the limiter.
+
+        Args:
+            requests_per_minute: Request budget; ``None`` for no limit
+            tokens_per_minute: Token budget; ``None`` for no limit
+            concurrency: Adaptive concurrency controller; a default one is created
+            burst_seconds: Size of the buckets, in seconds worth of budget
+        """
+        self.requests = (
+            TokenBucket(requests_per_minute, requests_per_minute * burst_seconds / 60)
+            if requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute, tokens_per_minute * burst_seconds / 60)
+            if tokens_per_minute
+            else None
+        )
+        self.concurrency = concurrency or AIMDConcurrency()
+
+    async def wait_for_budget(self, estimated_tokens: int = 0) -> None:
+        """
+        Wait until the request and token budgets allow a call, and spend them.
+
+        Args:
+            estimated_tokens: Expected prompt and completion tokens of the call
+        """
+        if self.requests is not None:
+            await self.requests.acquire(1)
+        if self.tokens is not None and estimated_tokens > 0:
+            await self.tokens.acquire(estimated_tokens)
+
+    async def acquire_slot(self) -> int:
+        """
+        Wait for a concurrency slot; take it only once the call is ready to start.
+
+        Returns:
+            Ticket to pass to :meth:`release`
+        """
+        return await self.concurrency.acquire()
+
+    async def acquire(self, estimated_tokens: int = 0) -> int:
+        """
+        Wait until a call may start: the budgets first, then a concurrency slot.
+
+        Args:
+            estimated_tokens: Expected prompt and completion tokens of the call
+
+        Returns:
+            Ticket to pass to :meth:`release`
+        """
+        await self.wait_for_budget(estimated_tokens)
+        return await self.acquire_slot()
+
+    async def release(self, ticket: int, error: Optional[BaseException] = None) -> None:
+        """
+        Report the outcome of a call.
+
+        Args:
+            ticket: Value returned by :meth:`acquire`
+            error: The exception raised by the call, if any
+        """
+        await self.concurrency.release(
+            ticket,
+            succeeded=error is None,
+            throttled=error is not None and is_throttling_error(error),
+        )
@@ -0,0 +1,61 @@
+"""
+Single-pass parser for ReAct-style agent completions (Thought / Action / Final Answer).
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+_MARKER = re.compile(r"(Thought|Action Input|Action|Observation|Final Answer):")
+
+
+@dataclass
+class ReActOutput:
+    """The sections of a ReAct completion."""
+
+    thought: Optional[str] = None
+    actions: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+    final_answer: Optional[str] = None
+
+
+def parse_react_output(text: str) -> ReActOutput:
+    """
+    Split a ReAct completion into its sections in one linear scan.
+
+    Every ``Thought:``, ``Action:``, ``Action Input:``, ``Observation:`` and
+    ``Final Answer:`` marker is located by a single precompiled pattern; the text of
+    a section runs until the next marker. Each ``Action`` is paired with the
+    ``Action Input`` that follows it, so completions with several actions yield
+    several entries. The final answer, like in the regex parser this replaced,
+    is the rest of the line after its marker.
+
+    Args:
+        text: The completion text
+
+    Returns:
+        ReActOutput with the first thought, all actions and the final answer
+    """
+    result = ReActOutput()
+    markers = list(_MARKER.finditer(text))
+
+    for i, match in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+        section = text[match.end() : end].strip()
+        kind = match.group(1)
+
+        if kind == "Thought":
+            if result.thought is None:
+                result.thought = section
+        elif kind == "Action":
+            result.actions.append((section, None))
+        elif kind == "Action Input":
+            if result.actions and result.actions[-1][1] is None:
+                result.actions[-1] = (result.actions[-1][0], section)
+        elif kind == "Final Answer":
+            if result.final_answer is None:
+                line_end = text.find("\n", match.end())
+                result.final_answer = text[
+                    match.end() : len(text) if line_end == -1 else line_end
+                ].strip()
+
+    return result
@@ -0,0 +1,182 @@
+"""
+Registry of framework-specific span handlers used by the trace converter.
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+
+from flotorch_eval.agent_eval.core.schemas import Span
+
+if TYPE_CHECKING:
+    from flotorch_eval.agent_eval.core.converter import TraceConverter, TrajectoryBuilder
+
+SpanHandler = Callable[["TraceConverter", "TrajectoryBuilder", Span], None]
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class SpanHandlerSpec:
+    """A handler together with the span selectors it was registered for."""
+
+    framework: str
+    handler: SpanHandler
+    order: int
+    names: Tuple[str, ...] = ()
+    name_prefixes: Tuple[str, ...] = ()
+    operation_names: Tuple[str, ...] = ()
+    attribute_keys: Tuple[str, ...] = ()
+
+
+class SpanHandlerRegistry:
+    """
+    Collection of span handlers registered per agent framework.
+
+    A handler is selected for a span by exact span name, span name prefix, the
+    ``gen_ai.operation.name`` attribute, or the presence of a (truthy) attribute.
+    When several handlers match, the one registered first wins.
+    """
+
+    def __init__(self):
+        self._specs: List[SpanHandlerSpec] = []
+        self.version = 0
+
+    @property
+    def frameworks(self) -> List[str]:
+        """Names of the registered frameworks, in registration order."""
+        return list(dict.fromkeys(spec.framework for spec in self._specs))
+
+    def register(
+        self,
+        framework: str,
+        handler: SpanHandler,
+        names: Iterable[str] = (),
+        name_prefixes: Iterable[str] = (),
+        operation_names: Iterable[str] = (),
+        attribute_keys: Iterable[str] = (),
+    ) -> SpanHandler:
+        """
+        Register a span handler.
+
+        Handlers should be module-level functions so that converters using the
+        registry remain picklable for ``TraceConverter.from_spans_batch``.
+
+        Args:
+            framework: Name of the agent framework the handler parses
+            handler: Callable receiving the converter, the trajectory builder and the span
+            names: Exact span names handled
+            name_prefixes: Span name prefixes handled
+            operation_names: Values of ``gen_ai.operation.name`` handled
+            attribute_keys: Attributes whose presence selects the handler
+
+        Returns:
+            The handler, so that ``register`` can be used to build decorators
+        """
+        spec = SpanHandlerSpec(
+            framework=framework,
+            handler=handler,
+            order=len(self._specs),
+            names=tuple(names),
+            name_prefixes=tuple(name_prefixes),
+            operation_names=tuple(operation_names),
+            attribute_keys=tuple(attribute_keys),
+        )
+        if not (spec.names or spec.name_prefixes or spec.operation_names or spec.attribute_keys):
+            raise ValueError(
+                f"Handler for framework '{framework}' must declare at least one selector"
+            )
+
+        self._specs.append(spec)
+        self.version += 1
+        return handler
+
+    def handler(self, framework: str, **selectors: Iterable[str]) -> Callable[[SpanHandler], SpanHandler]:
+        """Decorator form of :meth:`register`."""
+
+        def decorator(handler: SpanHandler) -> SpanHandler:
+            return self.register(framework, handler, **selectors)
+
+        return decorator
+
+    def unregister(self, framework: str) -> None:
+        """Remove every handler registered for a framework."""
+        self._specs = [spec for spec in self._specs if spec.framework != framework]
+        self.version += 1
+
+    def build_index(self, frameworks: Optional[Iterable[str]] = None) -> "SpanDispatchIndex":
+        """
+        Precompute the dispatch tables for the registered handlers.
+
+        Args:
+            frameworks: Restrict dispatch to these frameworks; defaults to all
+
+        Returns:
+            SpanDispatchIndex resolving spans to handlers
+        """
+        enabled = set(frameworks) if frameworks is not None else None
+        return SpanDispatchIndex(
+            [spec for spec in self._specs if enabled is None or spec.framework in enabled]
+        )
+
+
+class SpanDispatchIndex:
+    """
+    Precomputed lookup tables mapping spans to handlers.
+
+    Name matches are resolved once per distinct span name and cached, so spans that
+    no handler is interested in (HTTP, database, ...) cost a dictionary lookup.
+    """
+
+    max_cached_names = 4096
+
+    def __init__(self, specs: List[SpanHandlerSpec]):
+        self._names: Dict[str, SpanHandlerSpec] = {}
+        self._prefixes: Dict[str, SpanHandlerSpec] = {}
+        self._operations: Dict[str, SpanHandlerSpec] = {}
+        self._attribute_keys: List[Tuple[str, SpanHandlerSpec]] = []
+
+        for spec in specs:
+            for name in spec.names:
+                self._names.setdefault(name, spec)
+            for prefix in spec.name_prefixes:
+                self._prefixes.setdefault(prefix, spec)
+            for operation in spec.operation_names:
+                self._operations.setdefault(operation, spec)
+            for key in spec.attribute_keys:
+                self._attribute_keys.append((key, spec))
+
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._prefixes})
+        self._name_cache: Dict[str, Optional[SpanHandlerSpec]] = {}
+
+    def resolve(self, span: Span) -> Optional[SpanHandlerSpec]:
+        """Return the handler spec for a span, or ``None`` if no handler applies."""
+        best = self._name_cache.get(span.name, _MISSING)
+        if best is _MISSING:
+            best = self._resolve_name(span.name)
+
+        if self._operations:
+            operation = span.attributes.get("gen_ai.operation.name")
+            if operation is not None:
+                spec = self._operations.get(operation)
+                if spec is not None and (best is None or spec.order < best.order):
+                    best = spec
+
+        for key, spec in self._attribute_keys:
+            if span.attributes.get(key) and (best is None or spec.order < best.order):
+                best = spec
+
+        return best
+
+    def _resolve_name(self, name: str) -> Optional[SpanHandlerSpec]:
+        best = self._names.get(name)
+        for length in self._prefix_lengths:
+            if length > len(name):
+                break
+            spec = self._prefixes.get(name[:length])
+            if spec is not None and (best is None or spec.order < best.order):
+                best = spec
+
+        if len(self._name_cache) >= self.max_cached_names:
+            self._name_cache.clear()
+        self._name_cache[name] = best
+        return best
@@ -0,0 +1,165 @@
+"""
+Persistent cache of metric results keyed by trajectory content.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Optional
+
+from flotorch_eval.agent_eval.core.schemas import MetricResult, Trajectory
+from flotorch_eval.agent_eval.metrics.base import BaseMetric
+from flotorch_eval.common import telemetry
+from flotorch_eval.common.sqlite_cache import DEFAULT_CACHE_DIR, SQLiteCache
+
+# Bump when the key layout or the meaning of a cached result changes
+CACHE_FORMAT_VERSION = 1
+
+
+def canonical_json(value: Any) -> bytes:
+    """Serialize a value deterministically; unknown objects are represented by ``str``."""
+    return json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode("utf-8")
+
+
+def trajectory_fingerprint(trajectory: Trajectory) -> str:
+    """
+    Hash the content a judge sees: the role, content and tool calls of each message.
+
+    Timestamps, span data and tool call ids are left out, so re-running the same
+    conversation produces the same fingerprint.
+
+    Args:
+        trajectory: The trajectory to hash
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    messages = [
+        {
+            "role": message.role,
+            "content": message.content,
+            "tool_calls": [
+                {"name": call.name, "arguments": call.arguments, "output": call.output}
+                for call in message.tool_calls or []
+            ],
+        }
+        for message in trajectory.messages
+    ]
+    return hashlib.sha256(canonical_json(messages)).hexdigest()
+
+
+def judge_model_id(llm: Any) -> str:
+    """
+    Best-effort identifier of the model behind a judge client.
+
+    Looks at the attributes used by LangChain chat models, Ragas wrappers and the
+    OpenAI/Bedrock clients, and falls back to the class name.
+
+    Args:
+        llm: The judge passed to the metric, or ``None``
+
+    Returns:
+        The model identifier, or an empty string for metrics without a judge
+    """
+    if llm is None:
+        return ""
+    for holder in (llm, getattr(llm, "langchain_llm", None)):
+        if holder is None:
+            continue
+        for attr in ("model_id", "model_name", "model", "deployment_name"):
+            value = getattr(holder, attr, None)
+            if isinstance(value, str) and value:
+                return value
+    return f"{type(llm).__module__}.{type(llm).__qualname__}"
+
+
+class MetricResultCache:
+    """
+    Content-addressed cache of successful metric results, stored in SQLite.
+
+    An entry is keyed by the trajectory fingerprint, the metric class and name,
+    its ``metric_params`` and the judge model id, so changing any of them
+    computes the metric again. Only metrics declared ``cacheable`` are cached.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_size_bytes: Optional[int] = 256 * 1024 * 1024,
+        ttl: Optional[float] = 30 * 24 * 3600,
+    ):
+        """
+        Open or create the cache.
+
+        Args:
+            path: Path of the SQLite file; defaults to
+                ``~/.cache/flotorch_eval/metric_results.sqlite``
+            max_size_bytes: Maximum total size of the cached results
+            ttl: Lifetime of a cached result in seconds; ``None`` for no expiry
+        """
+        self.store = SQLiteCache(
+            path or os.path.join(DEFAULT_CACHE_DIR, "metric_results.sqlite"),
+            max_size_bytes=max_size_bytes,
+            ttl=ttl,
+        )
+
+    @property
+    def hits(self) -> int:
+        """Number of lookups answered from the cache."""
+        return self.store.hits
+
+    @property
+    def misses(self) -> int:
+        """Number of lookups not found in the cache."""
+        return self.store.misses
+
+    def key(self, fingerprint: str, metric: BaseMetric) -> str:
+        """
+        Compute the cache key of a metric on a trajectory.
+
+        Args:
+            fingerprint: Result of :func:`trajectory_fingerprint`
+            metric: The metric
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        metric_cls = type(metric)
+        return hashlib.sha256(
+            canonical_json(
+                {
+                    "version": CACHE_FORMAT_VERSION,
+                    "trajectory": fingerprint,
+                    "metric": f"{metric_cls.__module__}.{metric_cls.__qualname__}:{metric.name}",
+                    "params": metric.config.metric_params if metric.config else {},
+                    "judge": judge_model_id(metric.llm),
+                }
+            )
+        ).hexdigest()
+
+    def get(self, fingerprint: str, metric: BaseMetric) -> Optional[MetricResult]:
+        """Return the cached result of a metric, or ``None``."""
+        value = self.store.get(self.key(fingerprint, metric))
+        telemetry.count(
+            telemetry.CACHE_LOOKUPS,
+            {"cache": "metric_result", "outcome": "miss" if value is None else "hit"},
+        )
+        if value is None:
+            return None
+        return MetricResult.model_validate_json(value)
+
+    def set(self, fingerprint: str, metric: BaseMetric, result: MetricResult) -> None:
+        """Cache a result; results that did not succeed are ignored."""
+        if result.status != "success":
+            return
+        self.store.set(self.key(fingerprint, metric), result.model_dump_json().encode("utf-8"))
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        self.store.clear()
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        self.store.close()
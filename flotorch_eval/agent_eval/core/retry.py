@@ -0,0 +1,141 @@
+"""
+Retry policy for metric computations that call remote judge models.
+"""
+
+import asyncio
+import random
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Tuple
+
+# Fragments of exception class names and error codes raised by the judge clients we
+# support (botocore, openai, anthropic, httpx, aiohttp) when the provider rejects
+# calls for load
+THROTTLING_ERROR_MARKERS: Tuple[str, ...] = (
+    "throttl",
+    "ratelimit",
+    "rate_limit",
+    "toomanyrequests",
+    "overloaded",
+)
+
+# ... and for any failure worth retrying: throttling, or transient server-side errors
+TRANSIENT_ERROR_MARKERS: Tuple[str, ...] = THROTTLING_ERROR_MARKERS + (
+    "serviceunavailable",
+    "internalserver",
+    "timeout",
+    "connection",
+    "modelnotready",
+)
+
+THROTTLING_STATUS_CODES = frozenset({429, 529})
+TRANSIENT_STATUS_CODES = THROTTLING_STATUS_CODES | {408, 409, 425, 500, 502, 503, 504}
+
+
+def error_status_code(error: BaseException) -> Optional[int]:
+    """
+    Return the HTTP status carried by a judge client error, if any.
+
+    Args:
+        error: The exception raised by a metric
+
+    Returns:
+        The status code, or ``None``
+    """
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        if isinstance(response, dict):  # botocore ClientError
+            status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        elif response is not None:
+            status = getattr(response, "status_code", None)
+    return status
+
+
+def _matches(error: BaseException, markers: Tuple[str, ...]) -> bool:
+    names = [cls.__name__ for cls in type(error).__mro__]
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):  # botocore ClientError
+        names.append(str(response.get("Error", {}).get("Code", "")))
+    text = " ".join(names).lower()
+    return any(marker in text for marker in markers)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Return whether an error is worth retrying: throttling, timeouts, connection
+    failures and 5xx responses. Errors are classified by type, HTTP status and
+    provider error code, so no client library has to be imported.
+
+    Args:
+        error: The exception raised by a metric
+
+    Returns:
+        Whether the computation should be retried
+    """
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError, TimeoutError)):
+        return True
+    if error_status_code(error) in TRANSIENT_STATUS_CODES:
+        return True
+    return _matches(error, TRANSIENT_ERROR_MARKERS)
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """
+    Return whether an error means the judge provider is rejecting calls for load.
+
+    Args:
+        error: The exception raised by a metric
+
+    Returns:
+        Whether the error is a throttling error (HTTP 429/529 or a throttling code)
+    """
+    status = error_status_code(error)
+    if status in THROTTLING_STATUS_CODES:
+        return True
+    if status in TRANSIENT_STATUS_CODES:
+        return False
+    return _matches(error, THROTTLING_ERROR_MARKERS)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry with jittered exponential backoff.
+
+    The delay before retry ``n`` (starting at 1) is drawn uniformly from
+    ``[0, min(max_backoff, initial_backoff * multiplier ** (n - 1))]`` ("full
+    jitter"), so that throttled clients do not retry in lockstep.
+
+    Attributes:
+        max_attempts: Maximum number of attempts, including the first one
+        initial_backoff: Upper bound of the first delay, in seconds
+        max_backoff: Upper bound of any delay, in seconds
+        multiplier: Growth factor of the delay bound per attempt
+        jitter: Whether to randomize the delay; if not, the bound itself is used
+        retry_on: Predicate selecting the errors that are retried
+    """
+
+    max_attempts: int = 3
+    initial_backoff: float = 0.5
+    max_backoff: float = 20.0
+    multiplier: float = 2.0
+    jitter: bool = True
+    retry_on: Callable[[BaseException], bool] = field(default=is_transient_error)
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if self.initial_backoff < 0 or self.max_backoff < 0:
+            raise ValueError("Backoff delays must not be negative")
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        """Return whether to retry after ``attempt`` failed with ``error``."""
+        return attempt < self.max_attempts and self.retry_on(error)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay in seconds before the attempt following ``attempt``."""
+        bound = min(self.max_backoff, self.initial_backoff * self.multiplier ** (attempt - 1))
+        return random.uniform(0, bound) if self.jitter else bound
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
@@ -0,0 +1,392 @@
+"""
+Stratified sampling of trajectories with bootstrap confidence intervals.
+
+Requires the optional ``numpy`` package.
+"""
+
+import math
+import random
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from flotorch_eval.agent_eval.core.registry import SpanHandlerRegistry
+from flotorch_eval.agent_eval.core.schemas import EvaluationResult, Trajectory
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+StratumKey = Callable[[Trajectory], str]
+
+
+def framework_stratum(registry: Optional[SpanHandlerRegistry] = None) -> StratumKey:
+    """
+    Stratify by agent framework, detected with the span handlers of a registry.
+
+    Args:
+        registry: Registry whose handlers recognize the frameworks; defaults to the
+            converter's ``default_registry``
+
+    Returns:
+        Function mapping a trajectory to the framework of its first recognized span,
+        or ``"unknown"``
+    """
+    if registry is None:
+        from flotorch_eval.agent_eval.core.converter import default_registry
+
+        registry = default_registry
+    index = registry.build_index()
+
+    def key(trajectory: Trajectory) -> str:
+        for span in trajectory.spans:
+            spec = index.resolve(span)
+            if spec is not None:
+                return spec.framework
+        return "unknown"
+
+    return key
+
+
+def tool_set_stratum(trajectory: Trajectory) -> str:
+    """Stratify by the set of tools called in a trajectory, e.g. ``"calculator|search"``."""
+    tools = {
+        call.name for message in trajectory.messages for call in message.tool_calls or []
+    }
+    return "|".join(sorted(tools)) or "no tools"
+
+
+def latency_stratum(edges_ms: Sequence[float] = (1_000, 10_000, 60_000)) -> StratumKey:
+    """
+    Stratify by wall clock duration of the trajectory.
+
+    Args:
+        edges_ms: Increasing bucket boundaries in milliseconds
+
+    Returns:
+        Function mapping a trajectory to a bucket label such as ``"1000-10000ms"``
+    """
+    edges = sorted(edges_ms)
+    labels = [f"<{edges[0]:g}ms"]
+    labels += [f"{low:g}-{high:g}ms" for low, high in zip(edges, edges[1:])]
+    labels.append(f">={edges[-1]:g}ms")
+
+    def key(trajectory: Trajectory) -> str:
+        if not trajectory.spans:
+            return labels[0]
+        start = min(span.start_time_unix_nano for span in trajectory.spans)
+        end = max(span.end_time_unix_nano for span in trajectory.spans)
+        duration_ms = (end - start) / 1e6
+        return labels[sum(duration_ms >= edge for edge in edges)]
+
+    return key
+
+
+def combine_strata(*keys: StratumKey) -> StratumKey:
+    """Stratify by several keys at once, e.g. framework and latency bucket."""
+
+    def key(trajectory: Trajectory) -> str:
+        return "/".join(k(trajectory) for k in keys)
+
+    return key
+
+
+def stratified_bootstrap(
+    samples: Dict[str, Sequence[float]],
+    weights: Dict[str, float],
+    n_resamples: int = 2000,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+) -> Tuple[float, float, float]:
+    """
+    Estimate a population mean and its percentile bootstrap confidence interval.
+
+    Each stratum is resampled independently, all resamples at once, and the
+    stratum means are combined with the stratum weights.
+
+    Args:
+        samples: Observed scores per stratum; strata without scores are ignored
+        weights: Share of the population in each stratum; renormalized over the
+            strata that have scores, so the estimate only covers those strata
+        n_resamples: Number of bootstrap resamples
+        confidence: Confidence level of the interval
+        seed: Seed of the random generator
+
+    Returns:
+        Tuple of the estimate and the lower and upper bounds of the interval
+
+    Raises:
+        ImportError: If ``numpy`` is not installed
+        ValueError: If no stratum has scores
+    """
+    if np is None:
+        raise ImportError("Bootstrap confidence intervals require the 'numpy' package")
+
+    observed = {name: np.asarray(scores, dtype=float) for name, scores in samples.items()}
+    observed = {name: scores for name, scores in observed.items() if scores.size}
+    if not observed:
+        raise ValueError("No scores to estimate from")
+
+    total_weight = sum(weights[name] for name in observed)
+    rng = np.random.default_rng(seed)
+    estimate = 0.0
+    resampled = np.zeros(n_resamples)
+    for name, scores in observed.items():
+        weight = weights[name] / total_weight
+        estimate += weight * scores.mean()
+        picks = rng.integers(0, scores.size, size=(n_resamples, scores.size))
+        resampled += weight * scores[picks].mean(axis=1)
+
+    alpha = 1 - confidence
+    low, high = np.quantile(resampled, [alpha / 2, 1 - alpha / 2])
+    return float(estimate), float(low), float(high)
+
+
+class MetricEstimate(BaseModel):
+    """Population estimate of a metric from a sample."""
+
+    name: str
+    mean: float
+    ci_low: float
+    ci_high: float
+    confidence: float
+    sample_size: int = Field(description="Number of successful scores used")
+    unscored_weight: float = Field(
+        0.0,
+        description="Population share of the strata without a successful score, "
+        "which the estimate does not cover",
+    )
+
+    @property
+    def ci_width(self) -> float:
+        """Width of the confidence interval."""
+        return self.ci_high - self.ci_low
+
+
+class StratumSummary(BaseModel):
+    """Population and sample size of a stratum."""
+
+    population: int
+    sampled: int
+
+
+class SampleReport(BaseModel):
+    """Outcome of a sampled evaluation."""
+
+    estimates: Dict[str, MetricEstimate]
+    strata: Dict[str, StratumSummary]
+    population_size: int
+    sample_size: int
+    converged: bool = Field(
+        description="Whether every interval reached the target width with every "
+        "stratum scored"
+    )
+    results: List[EvaluationResult]
+
+
+class SamplingPlanner:
+    """
+    Settings of a sampled evaluation.
+
+    The population is split into strata and sampled in batches allocated in
+    proportion to the stratum sizes, after at least ``min_per_stratum``
+    trajectories from each stratum; when these minimums do not fit in one batch,
+    they are handed out one stratum at a time over several batches. After each
+    batch, every metric is estimated with a stratified bootstrap; sampling stops
+    once every stratum has scores and all confidence intervals are at most
+    ``target_ci_width`` wide, the sample reaches ``max_samples``, or the
+    population is exhausted.
+    """
+
+    def __init__(
+        self,
+        stratify: Optional[StratumKey] = None,
+        target_ci_width: float = 0.1,
+        confidence: float = 0.95,
+        batch_size: int = 50,
+        min_per_stratum: int = 2,
+        max_samples: Optional[int] = None,
+        n_resamples: int = 2000,
+        seed: Optional[int] = None,
+    ):
+        """
+        Create a planner.
+
+        Args:
+            stratify: Function mapping a trajectory to its stratum; ``None`` for a
+                simple random sample
+            target_ci_width: Width of the confidence intervals at which to stop
+            confidence: Confidence level of the intervals
+            batch_size: Number of trajectories added to the sample per round
+            min_per_stratum: Trajectories sampled from every stratum before the
+                proportional allocation
+            max_samples: Upper bound of the sample size
+            n_resamples: Number of bootstrap resamples
+            seed: Seed making the sample and the intervals reproducible
+        """
+        if target_ci_width <= 0:
+            raise ValueError("target_ci_width must be positive")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.stratify = stratify
+        self.target_ci_width = target_ci_width
+        self.confidence = confidence
+        self.batch_size = batch_size
+        self.min_per_stratum = min_per_stratum
+        self.max_samples = max_samples
+        self.n_resamples = n_resamples
+        self.seed = seed
+
+    def plan(self, trajectories: Iterable[Trajectory]) -> "SamplingPlan":
+        """
+        Split a population into strata and start a sample.
+
+        Args:
+            trajectories: The population
+
+        Returns:
+            SamplingPlan handing out batches and collecting their results
+        """
+        return SamplingPlan(self, trajectories)
+
+
+class SamplingPlan:
+    """State of a sampled evaluation: the remaining population and the results so far."""
+
+    def __init__(self, planner: SamplingPlanner, trajectories: Iterable[Trajectory]):
+        self.planner = planner
+        rng = random.Random(planner.seed)
+
+        self._remaining: Dict[str, List[Trajectory]] = {}
+        self._stratum_of: Dict[str, str] = {}
+        for trajectory in trajectories:
+            stratum = planner.stratify(trajectory) if planner.stratify else "all"
+            self._remaining.setdefault(stratum, []).append(trajectory)
+            self._stratum_of[trajectory.trace_id] = stratum
+        for members in self._remaining.values():
+            rng.shuffle(members)
+
+        self.population = {name: len(members) for name, members in self._remaining.items()}
+        self.population_size = sum(self.population.values())
+        self.sampled = {name: 0 for name in self._remaining}
+        self.results: List[EvaluationResult] = []
+
+    @property
+    def sample_size(self) -> int:
+        """Number of trajectories handed out so far."""
+        return sum(self.sampled.values())
+
+    def next_batch(self) -> List[Trajectory]:
+        """
+        Draw the next batch of trajectories to evaluate.
+
+        Returns:
+            The batch; empty once the sample cannot grow any further
+        """
+        planner = self.planner
+        budget = planner.batch_size
+        if planner.max_samples is not None:
+            budget = min(budget, planner.max_samples - self.sample_size)
+        if budget <= 0:
+            return []
+
+        target = self.sample_size + budget
+        floors = {
+            name: planner.min_per_stratum - self.sampled[name] for name in self.population
+        }
+        shares = {
+            name: math.ceil(target * size / self.population_size) - self.sampled[name]
+            for name, size in self.population.items()
+        }
+        batch: List[Trajectory] = []
+        # Every stratum gets its minimum first, one trajectory per stratum per
+        # round so that a budget too small for all minimums still reaches as many
+        # strata as possible; then the largest shortfalls are filled, so the
+        # budget is spent where the sample is thinnest
+        below_floor = [
+            name
+            for name in sorted(floors, key=floors.get, reverse=True)
+            if floors[name] > 0 and self._remaining[name]
+        ]
+        while below_floor and len(batch) < budget:
+            for name in below_floor[: budget - len(batch)]:
+                batch.append(self._remaining[name].pop())
+                self.sampled[name] += 1
+                floors[name] -= 1
+                shares[name] -= 1
+            below_floor = [
+                name for name in below_floor if floors[name] > 0 and self._remaining[name]
+            ]
+
+        for name in sorted(shares, key=shares.get, reverse=True):
+            take = min(shares[name], budget - len(batch), len(self._remaining[name]))
+            if take <= 0:
+                continue
+            batch.extend(self._remaining[name][-take:])
+            del self._remaining[name][-take:]
+            self.sampled[name] += take
+        return batch
+
+    def add(self, result: EvaluationResult) -> None:
+        """Record the evaluation result of a sampled trajectory."""
+        self.results.append(result)
+
+    def estimates(self) -> Dict[str, MetricEstimate]:
+        """
+        Estimate every metric from the successful scores collected so far.
+
+        Returns:
+            Estimates keyed by metric name
+        """
+        scores: Dict[str, Dict[str, List[float]]] = {}
+        for result in self.results:
+            stratum = self._stratum_of[result.trajectory_id]
+            for score in result.scores:
+                if score.status == "success":
+                    scores.setdefault(score.name, {}).setdefault(stratum, []).append(score.score)
+
+        weights = {
+            name: size / self.population_size for name, size in self.population.items()
+        }
+        estimates = {}
+        for name, by_stratum in scores.items():
+            mean, low, high = stratified_bootstrap(
+                by_stratum,
+                weights,
+                n_resamples=self.planner.n_resamples,
+                confidence=self.planner.confidence,
+                seed=self.planner.seed,
+            )
+            estimates[name] = MetricEstimate(
+                name=name,
+                mean=mean,
+                ci_low=low,
+                ci_high=high,
+                confidence=self.planner.confidence,
+                sample_size=sum(len(values) for values in by_stratum.values()),
+                unscored_weight=sum(
+                    weight for stratum, weight in weights.items() if stratum not in by_stratum
+                ),
+            )
+        return estimates
+
+    def report(self) -> SampleReport:
+        """Summarize the sample and the estimates."""
+        estimates = self.estimates()
+        return SampleReport(
+            estimates=estimates,
+            strata={
+                name: StratumSummary(population=size, sampled=self.sampled[name])
+                for name, size in self.population.items()
+            },
+            population_size=self.population_size,
+            sample_size=self.sample_size,
+            # An interval over part of the strata says nothing about the others
+            converged=bool(estimates)
+            and all(
+                e.ci_width <= self.planner.target_ci_width and not e.unscored_weight
+                for e in estimates.values()
+            ),
+            results=self.results,
+        )
@@ -2,15 +2,25 @@
 Core schemas for agent evaluation.
 """
 
-from datetime import datetime
-from typing import Dict, List, Optional, Union
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 
-from pydantic import BaseModel, Field
+from pydantic import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    TypeAdapter,
+    computed_field,
+    model_validator,
+)
+
+from flotorch_eval.agent_eval.core.span_tree import SpanTree
 
 
 class ToolCall(BaseModel):
     """A tool call made by an agent."""
 
+    id: Optional[str] = Field(None, description="Identifier assigned to the call by the framework")
     name: str = Field(description="Name of the tool called")
     arguments: Dict[str, Union[str, int, float, bool, List[str]]] = Field(
         description="Arguments passed to the tool"
@@ -28,30 +38,105 @@ class Message(BaseModel):
     timestamp: Optional[datetime] = Field(None, description="When the message was sent")
 
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Parses what the former datetime fields accepted (ISO strings, unix numbers)
+_DATETIME = TypeAdapter(datetime)
+
+
+def ns_to_datetime(unix_nano: int) -> datetime:
+    """Convert nanoseconds since the epoch to a naive local datetime without float rounding."""
+    seconds, nanos = divmod(unix_nano, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=nanos // 1000)
+
+
+def datetime_to_ns(value: datetime) -> int:
+    """Convert a datetime (naive values are taken as local time) to nanoseconds since the epoch."""
+    if value.tzinfo is None:
+        value = value.astimezone()
+    return (value - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def _timestamps_to_ns(data: Any, fields: Dict[str, str]) -> Any:
+    """
+    Accept values for the ``*_unix_nano`` fields under their legacy names.
+
+    Legacy values may be datetimes or anything the former datetime fields parsed,
+    such as the ISO strings of previously serialized spans.
+    """
+    if isinstance(data, dict):
+        for legacy, field in fields.items():
+            value = data.get(legacy)
+            if field not in data and value is not None:
+                if not isinstance(value, datetime):
+                    value = _DATETIME.validate_python(value)
+                data = {**data, field: datetime_to_ns(value)}
+    return data
+
+
 class SpanEvent(BaseModel):
     """An event in a span."""
 
     name: str = Field(description="Name of the event")
-    timestamp: datetime = Field(description="When the event occurred")
+    timestamp_unix_nano: int = Field(description="When the event occurred, in ns since the epoch")
     attributes: Dict[str, Union[str, int, float, bool, List[str]]] = Field(
         default_factory=dict, description="Attributes of the event"
     )
 
+    @model_validator(mode="before")
+    @classmethod
+    def _legacy_timestamps(cls, data: Any) -> Any:
+        return _timestamps_to_ns(data, {"timestamp": "timestamp_unix_nano"})
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def timestamp(self) -> datetime:
+        """When the event occurred."""
+        return ns_to_datetime(self.timestamp_unix_nano)
+
 
 class Span(BaseModel):
-    """A span in a trace."""
+    """
+    A span in a trace.
+
+    Times are kept as integer nanoseconds since the epoch; ``start_time`` and
+    ``end_time`` are datetime views built on access.
+    """
 
     span_id: str = Field(description="Unique identifier for the span")
     trace_id: str = Field(description="Identifier of the trace this span belongs to")
     parent_id: Optional[str] = Field(None, description="Identifier of the parent span")
     name: str = Field(description="Name of the span")
-    start_time: datetime = Field(description="When the span started")
-    end_time: datetime = Field(description="When the span ended")
+    start_time_unix_nano: int = Field(description="When the span started, in ns since the epoch")
+    end_time_unix_nano: int = Field(description="When the span ended, in ns since the epoch")
     attributes: Dict[str, Union[str, int, float, bool, List[str]]] = Field(
         default_factory=dict, description="Attributes of the span"
     )
     events: List[SpanEvent] = Field(default_factory=list, description="Events in the span")
 
+    @model_validator(mode="before")
+    @classmethod
+    def _legacy_timestamps(cls, data: Any) -> Any:
+        return _timestamps_to_ns(
+            data, {"start_time": "start_time_unix_nano", "end_time": "end_time_unix_nano"}
+        )
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def start_time(self) -> datetime:
+        """When the span started."""
+        return ns_to_datetime(self.start_time_unix_nano)
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def end_time(self) -> datetime:
+        """When the span ended."""
+        return ns_to_datetime(self.end_time_unix_nano)
+
+    @property
+    def duration_ns(self) -> int:
+        """Duration of the span in nanoseconds."""
+        return self.end_time_unix_nano - self.start_time_unix_nano
+
 
 class Trajectory(BaseModel):
     """A trajectory of agent interactions."""
@@ -60,13 +145,47 @@ class Trajectory(BaseModel):
     messages: List[Message] = Field(description="Messages in the trajectory")
     spans: List[Span] = Field(description="Spans in the trajectory")
 
+    _span_tree: Optional[SpanTree] = PrivateAttr(default=None)
+    # The spans list and its length when the cached tree was built
+    _span_tree_source: Optional[Tuple[List[Span], int]] = PrivateAttr(default=None)
+
+    @property
+    def span_tree(self) -> SpanTree:
+        """
+        Parent/child index over ``spans``.
+
+        Built on first access and rebuilt when ``spans`` is replaced or changes
+        length. Call :meth:`invalidate_span_tree` after replacing a span in place
+        or changing a span's ``span_id`` or ``parent_id``.
+        """
+        source = self._span_tree_source
+        if (
+            self._span_tree is None
+            or source is None
+            or source[0] is not self.spans
+            or source[1] != len(self.spans)
+        ):
+            self._span_tree = SpanTree(self.spans)
+            self._span_tree_source = (self.spans, len(self.spans))
+        return self._span_tree
+
+    def invalidate_span_tree(self) -> None:
+        """Drop the cached span tree so that it is rebuilt on next access."""
+        self._span_tree = None
+        self._span_tree_source = None
+
+
+MetricStatus = Literal["success", "failed", "timed_out", "skipped"]
+
 
 class MetricResult(BaseModel):
     """Result from a single metric evaluation."""
 
     name: str
     score: float
-    details: Optional[Dict[str, Union[str, int, float, bool, List[str], List[Dict[str, Union[str, int, float]]]]]]
+    status: MetricStatus = "success"
+    # JSON-like values, possibly nested (e.g. the latency breakdown tree)
+    details: Optional[Dict[str, Any]]
 
 
 class EvaluationResult(BaseModel):
@@ -118,14 +237,49 @@ class CostSummary(BaseModel):
     cost_breakdown: List[CostRecord]
 
 class LatencyBreakdownItem:
-    def __init__(self, step_name: str, latency_ms: float):
+    def __init__(
+        self,
+        step_name: str,
+        latency_ms: float,
+        children: Optional[List["LatencyBreakdownItem"]] = None,
+        self_time_ms: Optional[float] = None,
+    ):
         self.step_name = step_name
         self.latency_ms = latency_ms
+        self.children = children if children is not None else []
+        self.self_time_ms = latency_ms if self_time_ms is None else self_time_ms
 
-    def to_dict(self) -> Dict:
+    def _fields(self) -> Dict:
         return {
             "step_name": self.step_name,
             "latency_ms": self.latency_ms,
+            "self_time_ms": self.self_time_ms,
+            "children": [],
+        }
+
+    def to_dict(self) -> Dict:
+        # Iterative so that deeply nested traces cannot hit the recursion limit
+        result = self._fields()
+        stack = [(self, result)]
+        while stack:
+            item, converted = stack.pop()
+            for child in item.children:
+                child_dict = child._fields()
+                converted["children"].append(child_dict)
+                stack.append((child, child_dict))
+        return result
+
+class CriticalPathStep:
+    def __init__(self, step_name: str, span_id: str, duration_ms: float):
+        self.step_name = step_name
+        self.span_id = span_id
+        self.duration_ms = duration_ms
+
+    def to_dict(self) -> Dict:
+        return {
+            "step_name": self.step_name,
+            "span_id": self.span_id,
+            "duration_ms": self.duration_ms,
         }
 
 class LatencySummary:
@@ -133,15 +287,24 @@ class LatencySummary:
         self,
         total_latency_ms: float,
         average_step_latency_ms: float,
-        latency_breakdown: List[LatencyBreakdownItem]
+        latency_breakdown: List[LatencyBreakdownItem],
+        wall_clock_ms: Optional[float] = None,
+        critical_path: Optional[List[CriticalPathStep]] = None,
+        parallelism_factor: Optional[float] = None,
     ):
         self.total_latency_ms = total_latency_ms
         self.average_step_latency_ms = average_step_latency_ms
         self.latency_breakdown = latency_breakdown
+        self.wall_clock_ms = total_latency_ms if wall_clock_ms is None else wall_clock_ms
+        self.critical_path = critical_path if critical_path is not None else []
+        self.parallelism_factor = 1.0 if parallelism_factor is None else parallelism_factor
 
     def to_dict(self) -> Dict:
         return {
             "total_latency_ms": self.total_latency_ms,
             "average_step_latency_ms": self.average_step_latency_ms,
+            "wall_clock_ms": self.wall_clock_ms,
+            "parallelism_factor": self.parallelism_factor,
+            "critical_path": [step.to_dict() for step in self.critical_path],
             "latency_breakdown": [item.to_dict() for item in self.latency_breakdown],
         }
\ No newline at end of file
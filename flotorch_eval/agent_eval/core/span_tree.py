@@ -0,0 +1,135 @@
+"""
+Parent/child index over the spans of a trajectory.
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    from flotorch_eval.agent_eval.core.schemas import Span
+
+
+class SpanTree:
+    """
+    Parent/child index over a list of spans, built in a single O(n) pass.
+
+    Spans whose parent is missing from the list are treated as roots, so partial
+    traces still form a forest. Spans are laid out in depth-first pre-order, which
+    makes ``depth``, ``is_ancestor`` and ``subtree_size`` constant time and
+    ``subtree`` a single slice. Children keep the order of the input list, i.e.
+    start-time order for trajectory spans.
+    """
+
+    def __init__(self, spans: Sequence["Span"]):
+        """
+        Build the index.
+
+        Args:
+            spans: The spans of one trace
+        """
+        self._spans: Dict[str, "Span"] = {}
+        self._children: Dict[str, List[str]] = {}
+        self._parent: Dict[str, Optional[str]] = {}
+        for span in spans:
+            self._spans[span.span_id] = span
+            self._children[span.span_id] = []
+
+        roots = []
+        for span in spans:
+            parent_id = span.parent_id
+            if parent_id is not None and parent_id in self._children and parent_id != span.span_id:
+                self._children[parent_id].append(span.span_id)
+                self._parent[span.span_id] = parent_id
+            else:
+                self._parent[span.span_id] = None
+                roots.append(span.span_id)
+
+        self._order: List[str] = []
+        self._position: Dict[str, int] = {}
+        self._end: Dict[str, int] = {}
+        self._depth: Dict[str, int] = {}
+        for root in roots:
+            self._visit(root)
+
+        # Spans on a parent cycle are unreachable from any root; break the cycle
+        # at the earliest of them so every span is indexed exactly once
+        for span in spans:
+            if span.span_id not in self._position:
+                self._children[self._parent[span.span_id]].remove(span.span_id)
+                self._parent[span.span_id] = None
+                roots.append(span.span_id)
+                self._visit(span.span_id)
+        self._roots = roots
+
+    def _visit(self, root: str) -> None:
+        # Iterative pre-order walk, so deep traces cannot hit the recursion limit
+        stack = [(root, 0, False)]
+        while stack:
+            span_id, depth, done = stack.pop()
+            if done:
+                self._end[span_id] = len(self._order)
+                continue
+            if span_id in self._position:
+                continue
+            self._position[span_id] = len(self._order)
+            self._depth[span_id] = depth
+            self._order.append(span_id)
+            stack.append((span_id, depth, True))
+            for child in reversed(self._children[span_id]):
+                stack.append((child, depth + 1, False))
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, span_id: object) -> bool:
+        return span_id in self._spans
+
+    def __iter__(self) -> Iterator["Span"]:
+        """Iterate over the spans in depth-first pre-order."""
+        return (self._spans[span_id] for span_id in self._order)
+
+    @property
+    def roots(self) -> List["Span"]:
+        """Root spans, in input order."""
+        return [self._spans[span_id] for span_id in self._roots]
+
+    def get(self, span_id: str) -> Optional["Span"]:
+        """Return the span with the given id, or ``None``."""
+        return self._spans.get(span_id)
+
+    def parent(self, span_id: str) -> Optional["Span"]:
+        """Return the parent of a span, or ``None`` for a root."""
+        parent_id = self._parent[span_id]
+        return self._spans[parent_id] if parent_id is not None else None
+
+    def children(self, span_id: str) -> List["Span"]:
+        """Return the direct children of a span."""
+        return [self._spans[child] for child in self._children[span_id]]
+
+    def depth(self, span_id: str) -> int:
+        """Return the depth of a span; roots have depth 0."""
+        return self._depth[span_id]
+
+    def is_ancestor(self, ancestor_id: str, span_id: str) -> bool:
+        """Return whether ``ancestor_id`` is a proper ancestor of ``span_id``."""
+        start = self._position[ancestor_id]
+        return start < self._position[span_id] < self._end[ancestor_id]
+
+    def subtree_size(self, span_id: str) -> int:
+        """Return the number of spans in the subtree rooted at a span, itself included."""
+        return self._end[span_id] - self._position[span_id]
+
+    def subtree(self, span_id: str) -> List["Span"]:
+        """Return the subtree rooted at a span in pre-order, itself included."""
+        return [
+            self._spans[descendant]
+            for descendant in self._order[self._position[span_id] : self._end[span_id]]
+        ]
+
+    def ancestors(self, span_id: str) -> List["Span"]:
+        """Return the ancestors of a span, nearest first."""
+        ancestors = []
+        parent = self.parent(span_id)
+        while parent is not None:
+            ancestors.append(parent)
+            parent = self.parent(parent.span_id)
+        return ancestors
@@ -0,0 +1,177 @@
+"""
+Incremental conversion of interleaved OpenTelemetry spans into agent trajectories.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional
+
+from opentelemetry.trace import Span as OTelSpan
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter, TrajectoryBuilder
+from flotorch_eval.agent_eval.core.schemas import Span, Trajectory
+
+
+class StreamingTraceConverter:
+    """
+    Stateful converter that accepts spans from any number of traces as they arrive.
+
+    Each open trace keeps its own parse state, so memory is bounded by the number
+    of traces in flight rather than by total traffic. A trajectory is emitted as
+    soon as the root span of its trace is received, when the trace has been idle
+    for longer than ``idle_timeout`` seconds, or when ``max_open_traces`` is
+    exceeded (the least recently active trace is emitted first).
+
+    Every chunk passed to :meth:`add_spans` is sorted by start time, and a span
+    whose parent has not been received yet is held back until it has, so children
+    exported before their parent are still parsed after it. Spans still held when
+    the trajectory is built, because their parent never arrived, are parsed then:
+    when the root span arrives, or when the trace is finished by :meth:`flush`,
+    expiry or eviction.
+    """
+
+    def __init__(
+        self,
+        converter: Optional[TraceConverter] = None,
+        idle_timeout: Optional[float] = 30.0,
+        max_open_traces: Optional[int] = None,
+        completed_trace_memory: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the streaming converter.
+
+        Args:
+            converter: Converter providing the span parsing rules
+            idle_timeout: Seconds without new spans after which an open trace is
+                emitted; ``None`` disables the timeout
+            max_open_traces: Maximum number of traces kept open at once
+            completed_trace_memory: Number of recently completed trace ids
+                remembered so that late spans are dropped instead of starting
+                a new, partial trace
+            clock: Monotonic clock used for idle timeouts
+        """
+        self.converter = converter or TraceConverter()
+        self.idle_timeout = idle_timeout
+        self.max_open_traces = max_open_traces
+        self.completed_trace_memory = completed_trace_memory
+        self.clock = clock
+        self.late_spans = 0
+
+        # trace_id -> (builder, last activity); ordered by last activity
+        self._open: "OrderedDict[str, List]" = OrderedDict()
+        self._completed: "OrderedDict[str, None]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    @property
+    def open_traces(self) -> List[str]:
+        """Identifiers of the traces currently being built."""
+        return list(self._open)
+
+    def add_span(self, span: OTelSpan) -> List[Trajectory]:
+        """
+        Add a single OpenTelemetry span.
+
+        Args:
+            span: The finished span
+
+        Returns:
+            Trajectories completed by this call
+        """
+        return self.add_spans([span])
+
+    def add_spans(self, spans: Iterable[OTelSpan]) -> List[Trajectory]:
+        """
+        Add a chunk of OpenTelemetry spans, possibly from several traces.
+
+        Args:
+            spans: The finished spans
+
+        Returns:
+            Trajectories completed by this call
+        """
+        return self.add_internal_spans(self.converter.convert_span(span) for span in spans)
+
+    def add_internal_span(self, span: Span) -> List[Trajectory]:
+        """Add a single span that is already in our internal format."""
+        return self.add_internal_spans([span])
+
+    def add_internal_spans(self, spans: Iterable[Span]) -> List[Trajectory]:
+        """
+        Add a chunk of spans that are already in our internal format.
+
+        Args:
+            spans: The converted spans
+
+        Returns:
+            Trajectories completed by this call
+        """
+        now = self.clock()
+        closed = []
+
+        for span in sorted(spans, key=lambda x: x.start_time_unix_nano):
+            if span.trace_id in self._completed:
+                self.late_spans += 1
+                continue
+
+            entry = self._open.get(span.trace_id)
+            if entry is None:
+                entry = [self.converter.new_builder(span.trace_id), now]
+                self._open[span.trace_id] = entry
+            else:
+                entry[1] = now
+                self._open.move_to_end(span.trace_id)
+
+            entry[0].add_span(span)
+            if span.parent_id is None:
+                closed.append(span.trace_id)
+
+        completed = [self._finish(trace_id) for trace_id in closed if trace_id in self._open]
+
+        if self.max_open_traces is not None:
+            while len(self._open) > self.max_open_traces:
+                completed.append(self._finish(next(iter(self._open))))
+
+        completed = [trajectory for trajectory in completed if trajectory is not None]
+        completed.extend(self.expire(now))
+        return completed
+
+    def expire(self, now: Optional[float] = None) -> List[Trajectory]:
+        """
+        Emit every trace that has been idle for longer than the idle timeout.
+
+        Args:
+            now: Current clock value; defaults to ``clock()``
+
+        Returns:
+            Trajectories of the expired traces
+        """
+        if self.idle_timeout is None:
+            return []
+
+        now = self.clock() if now is None else now
+        expired = []
+        while self._open:
+            trace_id, (_, last_seen) = next(iter(self._open.items()))
+            if now - last_seen < self.idle_timeout:
+                break
+            expired.append(self._finish(trace_id))
+        return [trajectory for trajectory in expired if trajectory is not None]
+
+    def flush(self) -> List[Trajectory]:
+        """Emit every open trace regardless of its state."""
+        finished = [self._finish(trace_id) for trace_id in list(self._open)]
+        return [trajectory for trajectory in finished if trajectory is not None]
+
+    def _finish(self, trace_id: str) -> Optional[Trajectory]:
+        builder: TrajectoryBuilder = self._open.pop(trace_id)[0]
+
+        self._completed[trace_id] = None
+        while len(self._completed) > self.completed_trace_memory:
+            self._completed.popitem(last=False)
+
+        trajectory = builder.build()
+        # Traces of flotorch-eval's own instrumentation are not agent runs
+        return None if builder.only_internal_spans else trajectory
@@ -0,0 +1,156 @@
+"""
+Per-evaluation memoization of representations derived from a trajectory.
+"""
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, TypeVar
+
+from flotorch_eval.agent_eval.core.schemas import Trajectory
+
+T = TypeVar("T")
+
+
+def trajectory_signature(trajectory: Trajectory) -> Tuple[Any, ...]:
+    """
+    Cheap identity-based signature of a trajectory's contents.
+
+    Replacing or appending messages, spans or tool calls, or assigning a message's
+    content or tool calls, a tool call's arguments or output, or a span's
+    attributes changes the signature; it is built from object ids and sizes only,
+    so it costs a small fraction of any conversion it protects. Mutating a nested
+    dict in place without changing its size (e.g. overwriting
+    ``span.attributes[key]``) is not detected; call
+    :meth:`TrajectoryViews.invalidate` after doing so.
+
+    Args:
+        trajectory: The trajectory
+
+    Returns:
+        Hashable signature
+    """
+    return (
+        id(trajectory.messages),
+        tuple(
+            (
+                id(message),
+                id(message.content),
+                id(message.tool_calls),
+                tuple(
+                    (id(call), id(call.arguments), len(call.arguments), id(call.output))
+                    for call in message.tool_calls or ()
+                ),
+            )
+            for message in trajectory.messages
+        ),
+        id(trajectory.spans),
+        tuple(
+            (id(span), id(span.attributes), len(span.attributes))
+            for span in trajectory.spans
+        ),
+    )
+
+
+class TrajectoryViews:
+    """
+    Cache of derived views of the trajectories of one evaluation.
+
+    Entries are keyed by trajectory identity and view name and hold the
+    trajectory's signature when they were built; a view whose trajectory has
+    changed since is rebuilt. The cache holds references to its trajectories, so
+    it should only live as long as the evaluation, which :func:`view_scope`
+    ensures.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._signatures: Dict[int, Tuple[Trajectory, Tuple[Any, ...]]] = {}
+        self._views: Dict[Tuple[int, str], Any] = {}
+
+    def get(self, trajectory: Trajectory, name: str, build: Callable[[Trajectory], T]) -> T:
+        """
+        Return the view ``name`` of a trajectory, building it on first use.
+
+        Args:
+            trajectory: The trajectory
+            name: Name of the view
+            build: Function computing the view from the trajectory
+
+        Returns:
+            The view
+        """
+        key = id(trajectory)
+        signature = trajectory_signature(trajectory)
+        known = self._signatures.get(key)
+        if known is None or known[0] is not trajectory or known[1] != signature:
+            self.invalidate(trajectory)
+            self._signatures[key] = (trajectory, signature)
+        elif (key, name) in self._views:
+            self.hits += 1
+            return self._views[(key, name)]
+
+        self.misses += 1
+        view = self._views[(key, name)] = build(trajectory)
+        return view
+
+    def invalidate(self, trajectory: Trajectory) -> None:
+        """Drop every view of a trajectory."""
+        key = id(trajectory)
+        self._signatures.pop(key, None)
+        for view_key in [view_key for view_key in self._views if view_key[0] == key]:
+            del self._views[view_key]
+
+
+_active_views: ContextVar[Optional[TrajectoryViews]] = ContextVar(
+    "flotorch_eval_trajectory_views", default=None
+)
+
+
+@contextmanager
+def view_scope() -> Iterator[TrajectoryViews]:
+    """
+    Share derived views between everything running in the current context.
+
+    Tasks created inside the scope (e.g. the concurrent metrics of an evaluation)
+    inherit it. Nested scopes reuse the enclosing cache.
+
+    Yields:
+        The active view cache
+    """
+    views = _active_views.get()
+    if views is not None:
+        yield views
+        return
+    views = TrajectoryViews()
+    token = _active_views.set(views)
+    try:
+        yield views
+    finally:
+        _active_views.reset(token)
+
+
+def memoized_view(build: Callable[[Trajectory], T]) -> Callable[[Trajectory], T]:
+    """
+    Make a function of a trajectory use the active view cache, if any.
+
+    Outside of a :func:`view_scope` the function is called as usual. Views are
+    shared by every caller, so they must be treated as read-only.
+
+    Args:
+        build: Function computing a view from a trajectory
+
+    Returns:
+        The memoized function
+    """
+    name = f"{build.__module__}.{build.__qualname__}"
+
+    @functools.wraps(build)
+    def view(trajectory: Trajectory) -> T:
+        views = _active_views.get()
+        if views is None:
+            return build(trajectory)
+        return views.get(trajectory, name, build)
+
+    return view
@@ -0,0 +1,11 @@
+"""
+Ingestion of exported OpenTelemetry traces.
+"""
+
+from flotorch_eval.agent_eval.ingest.otlp_json import OTLPJsonReader
+from flotorch_eval.agent_eval.ingest.receiver import OTLPReceiver
+
+__all__ = [
+    "OTLPJsonReader",
+    "OTLPReceiver",
+]
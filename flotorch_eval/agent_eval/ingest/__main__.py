@@ -0,0 +1,7 @@
+"""
+Run the OTLP/HTTP receiver: ``python -m flotorch_eval.agent_eval.ingest --help``.
+"""
+
+from flotorch_eval.agent_eval.ingest.receiver import main
+
+main()
@@ -0,0 +1,222 @@
+"""
+Reader for OTLP JSON-lines files such as those written by the collector file exporter.
+"""
+
+import base64
+import binascii
+import mmap
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.schemas import Span, Trajectory
+from flotorch_eval.agent_eval.core.streaming import StreamingTraceConverter
+from flotorch_eval.common import json_utils
+
+_TRACE_ID = re.compile(rb'"traceId"\s*:\s*"([^"]*)"')
+
+
+def decode_otlp_id(value: Optional[str]) -> Optional[int]:
+    """
+    Decode an OTLP JSON trace or span id.
+
+    The OTLP JSON encoding uses hex strings; base64 (the generic protobuf JSON
+    mapping) is accepted as well.
+
+    Args:
+        value: The encoded id
+
+    Returns:
+        The id as an integer, or ``None`` for an empty or all-zero (invalid) id
+    """
+    if not value:
+        return None
+    try:
+        return int(value, 16) or None
+    except ValueError:
+        pass
+    try:
+        return int.from_bytes(base64.b64decode(value, validate=True), "big") or None
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Invalid OTLP id: {value!r}") from e
+
+
+def decode_otlp_value(value: Dict[str, Any]) -> Any:
+    """Convert an OTLP JSON ``AnyValue`` into a plain Python value."""
+    if "stringValue" in value:
+        return value["stringValue"]
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "doubleValue" in value:
+        return float(value["doubleValue"])
+    if "boolValue" in value:
+        return bool(value["boolValue"])
+    if "arrayValue" in value:
+        return [decode_otlp_value(v) for v in value["arrayValue"].get("values", [])]
+    if "kvlistValue" in value:
+        return decode_otlp_attributes(value["kvlistValue"].get("values", []))
+    if "bytesValue" in value:
+        return value["bytesValue"]
+    return None
+
+
+def decode_otlp_attributes(attributes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert a list of OTLP JSON ``KeyValue`` objects into a dictionary."""
+    return {kv["key"]: decode_otlp_value(kv.get("value", {})) for kv in attributes}
+
+
+def otlp_span_record(span: Dict[str, Any]) -> tuple:
+    """
+    Convert an OTLP JSON span into the snapshot consumed by ``TraceConverter``.
+
+    Args:
+        span: A span object from ``resourceSpans[].scopeSpans[].spans[]``
+
+    Returns:
+        Span snapshot in the format of ``converter._span_record``
+    """
+    return (
+        decode_otlp_id(span.get("spanId")),
+        decode_otlp_id(span.get("traceId")),
+        decode_otlp_id(span.get("parentSpanId")),
+        span.get("name", ""),
+        int(span.get("startTimeUnixNano", 0)),
+        int(span.get("endTimeUnixNano", 0)),
+        decode_otlp_attributes(span.get("attributes", [])),
+        [
+            (
+                event.get("name", ""),
+                int(event.get("timeUnixNano", 0)),
+                decode_otlp_attributes(event.get("attributes", [])),
+            )
+            for event in span.get("events", [])
+        ],
+    )
+
+
+def iter_otlp_spans(request: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Iterate over the spans of an OTLP JSON ``ExportTraceServiceRequest``."""
+    for resource_spans in request.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            yield from scope_spans.get("spans", [])
+
+
+class OTLPJsonReader:
+    """
+    Streams an OTLP JSON-lines file (one ``ExportTraceServiceRequest`` per line)
+    into agent trajectories.
+
+    The file is memory-mapped and read line by line, so only the traces that are
+    still open are held in memory.
+    """
+
+    def __init__(self, path: str, converter: Optional[TraceConverter] = None):
+        """
+        Initialize the reader.
+
+        Args:
+            path: Path of the JSON-lines file
+            converter: Converter providing the span parsing rules
+        """
+        self.path = path
+        self.converter = converter or TraceConverter()
+        self._index: Optional[Dict[str, List[Tuple[int, int]]]] = None
+
+    def iter_spans(self) -> Iterator[Span]:
+        """Iterate over every span in the file, converted to our internal format."""
+        for spans in self._iter_line_spans():
+            yield from spans
+
+    def iter_trajectories(self, max_open_traces: Optional[int] = None) -> Iterator[Trajectory]:
+        """
+        Iterate over the trajectories in the file.
+
+        A trajectory is produced once its root span has been read; traces without a
+        root span are produced when the end of the file is reached.
+
+        Args:
+            max_open_traces: Maximum number of traces kept open at once
+
+        Returns:
+            Iterator of trajectories in completion order
+        """
+        streaming = StreamingTraceConverter(
+            converter=self.converter, idle_timeout=None, max_open_traces=max_open_traces
+        )
+        for spans in self._iter_line_spans():
+            yield from streaming.add_internal_spans(spans)
+        yield from streaming.flush()
+
+    def build_index(self) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Index the byte ranges of the lines containing each trace.
+
+        Trace ids are located with a byte-level pattern, without decoding the JSON.
+
+        Returns:
+            Mapping of hex trace id to the ``(start, end)`` offsets of its lines
+        """
+        index: Dict[str, List[Tuple[int, int]]] = {}
+        for start, end, line in self._iter_lines():
+            for raw_id in set(_TRACE_ID.findall(line)):
+                trace_id = format(decode_otlp_id(raw_id.decode("ascii")) or 0, "032x")
+                index.setdefault(trace_id, []).append((start, end))
+        self._index = index
+        return index
+
+    def read_trace(self, trace_id: str) -> Trajectory:
+        """
+        Convert a single trace, reading only the lines that contain it.
+
+        Args:
+            trace_id: Hex trace id
+
+        Returns:
+            The trajectory of the trace
+        """
+        if self._index is None:
+            self.build_index()
+
+        builder = self.converter.new_builder(trace_id)
+        spans = []
+        with open(self.path, "rb") as f:
+            for start, end in self._index.get(trace_id, []):
+                f.seek(start)
+                spans.extend(
+                    span
+                    for span in self._line_spans(f.read(end - start))
+                    if span.trace_id == trace_id
+                )
+
+        for span in sorted(spans, key=lambda x: x.start_time_unix_nano):
+            builder.add_span(span)
+        return builder.build()
+
+    def _iter_lines(self) -> Iterator[Tuple[int, int, bytes]]:
+        with open(self.path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return
+            with mm:
+                start = 0
+                size = len(mm)
+                while start < size:
+                    end = mm.find(b"\n", start)
+                    if end == -1:
+                        end = size
+                    line = mm[start:end]
+                    if line.strip():
+                        yield start, end, line
+                    start = end + 1
+
+    def _iter_line_spans(self) -> Iterator[List[Span]]:
+        for _, _, line in self._iter_lines():
+            yield self._line_spans(line)
+
+    def _line_spans(self, line: bytes) -> List[Span]:
+        request = json_utils.loads(line)
+        return [
+            self.converter._span_from_record(otlp_span_record(span))
+            for span in iter_otlp_spans(request)
+        ]
@@ -0,0 +1,89 @@
+"""
+Decoding of OTLP protobuf export requests.
+
+Requires the optional ``opentelemetry-proto`` package.
+"""
+
+from typing import Any, Dict, Iterator, List
+
+try:
+    from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+        ExportTraceServiceRequest,
+    )
+except ImportError:  # pragma: no cover - optional dependency
+    ExportTraceServiceRequest = None
+
+
+def _id(value: bytes) -> Any:
+    return int.from_bytes(value, "big") or None
+
+
+def decode_proto_value(value: Any) -> Any:
+    """Convert a protobuf ``AnyValue`` into a plain Python value."""
+    kind = value.WhichOneof("value")
+    if kind == "array_value":
+        return [decode_proto_value(v) for v in value.array_value.values]
+    if kind == "kvlist_value":
+        return decode_proto_attributes(value.kvlist_value.values)
+    if kind is None:
+        return None
+    return getattr(value, kind)
+
+
+def decode_proto_attributes(attributes: Any) -> Dict[str, Any]:
+    """Convert repeated protobuf ``KeyValue`` messages into a dictionary."""
+    return {kv.key: decode_proto_value(kv.value) for kv in attributes}
+
+
+def proto_span_record(span: Any) -> tuple:
+    """
+    Convert a protobuf span into the snapshot consumed by ``TraceConverter``.
+
+    Args:
+        span: An ``opentelemetry.proto.trace.v1.Span`` message
+
+    Returns:
+        Span snapshot in the format of ``converter._span_record``
+    """
+    return (
+        _id(span.span_id),
+        _id(span.trace_id),
+        _id(span.parent_span_id),
+        span.name,
+        span.start_time_unix_nano,
+        span.end_time_unix_nano,
+        decode_proto_attributes(span.attributes),
+        [
+            (event.name, event.time_unix_nano, decode_proto_attributes(event.attributes))
+            for event in span.events
+        ],
+    )
+
+
+def parse_export_request(body: bytes) -> List[tuple]:
+    """
+    Decode a serialized ``ExportTraceServiceRequest`` into span snapshots.
+
+    Args:
+        body: The protobuf-encoded request
+
+    Returns:
+        Span snapshots of every span in the request
+
+    Raises:
+        ImportError: If ``opentelemetry-proto`` is not installed
+    """
+    if ExportTraceServiceRequest is None:
+        raise ImportError(
+            "Decoding OTLP protobuf requires the 'opentelemetry-proto' package"
+        )
+
+    request = ExportTraceServiceRequest()
+    request.ParseFromString(body)
+    return [proto_span_record(span) for span in _iter_spans(request)]
+
+
+def _iter_spans(request: Any) -> Iterator[Any]:
+    for resource_spans in request.resource_spans:
+        for scope_spans in resource_spans.scope_spans:
+            yield from scope_spans.spans
@@ -0,0 +1,412 @@
+"""
+Local OTLP/HTTP span receiver that converts incoming traces and evaluates them.
+
+Run as a sidecar with::
+
+    python -m flotorch_eval.agent_eval.ingest --port 4318 --output results.jsonl
+
+and point the agent's OTLP/HTTP exporter at ``http://localhost:4318/v1/traces``.
+"""
+
+import argparse
+import asyncio
+import inspect
+import logging
+import sys
+import zlib
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.evaluator import Evaluator
+from flotorch_eval.agent_eval.core.schemas import EvaluationResult, Span, Trajectory
+from flotorch_eval.agent_eval.core.streaming import StreamingTraceConverter
+from flotorch_eval.agent_eval.ingest.otlp_json import iter_otlp_spans, otlp_span_record
+from flotorch_eval.agent_eval.ingest.otlp_proto import parse_export_request
+from flotorch_eval.common import json_utils, telemetry
+
+logger = logging.getLogger(__name__)
+
+ResultCallback = Callable[[EvaluationResult], Union[None, Awaitable[None]]]
+
+TRACES_PATH = "/v1/traces"
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+    503: "Service Unavailable",
+}
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(message)
+        self.status = status
+        self.message = message or _REASONS.get(status, "")
+
+
+class OTLPReceiver:
+    """
+    Minimal asyncio OTLP/HTTP receiver feeding the streaming converter and an evaluator.
+
+    Accepts ``POST /v1/traces`` with JSON or protobuf bodies (optionally gzip or
+    deflate encoded). Completed trajectories are placed on a bounded queue drained
+    by ``workers`` evaluation tasks. When the queue is full new export requests are
+    answered with ``503`` and a ``Retry-After`` header, which OTLP exporters treat
+    as a retryable error, so pressure propagates back to the agents instead of
+    growing memory.
+    """
+
+    def __init__(
+        self,
+        evaluator: Evaluator,
+        host: str = "127.0.0.1",
+        port: int = 4318,
+        on_result: Optional[ResultCallback] = None,
+        converter: Optional[TraceConverter] = None,
+        idle_timeout: Optional[float] = 30.0,
+        max_open_traces: Optional[int] = 10_000,
+        max_pending: int = 1_000,
+        workers: int = 4,
+        max_body_size: int = 64 * 1024 * 1024,
+        retry_after: int = 1,
+    ):
+        """
+        Initialize the receiver.
+
+        Args:
+            evaluator: Evaluator applied to every completed trajectory
+            host: Interface to bind
+            port: Port to bind; ``0`` picks a free port
+            on_result: Callback (sync or async) receiving every evaluation result
+            converter: Converter providing the span parsing rules
+            idle_timeout: Seconds after which a trace without a root span is evaluated
+            max_open_traces: Maximum number of traces assembled at once
+            max_pending: Maximum number of trajectories waiting for evaluation
+            workers: Number of concurrent evaluation tasks
+            max_body_size: Largest accepted request body in bytes
+            retry_after: Seconds suggested to clients when the queue is full
+        """
+        self.evaluator = evaluator
+        self.host = host
+        self.port = port
+        self.on_result = on_result
+        self.streaming = StreamingTraceConverter(
+            converter=converter,
+            idle_timeout=idle_timeout,
+            max_open_traces=max_open_traces,
+        )
+        self.max_pending = max_pending
+        self.workers = workers
+        self.max_body_size = max_body_size
+        self.retry_after = retry_after
+
+        self.spans_received = 0
+        self.requests_rejected = 0
+        self.trajectories_evaluated = 0
+        self.evaluation_errors = 0
+
+        self._queue: Optional["asyncio.Queue[Trajectory]"] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: List[asyncio.Task] = []
+        self._queue_gauge: Optional[Tuple[str, int]] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of trajectories waiting for evaluation."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        """Bind the server and start the evaluation workers."""
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._queue_gauge = telemetry.observe(
+            telemetry.RECEIVER_QUEUE_DEPTH, self._queue.qsize, {"port": self.port}
+        )
+
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        if self.streaming.idle_timeout is not None:
+            self._tasks.append(asyncio.ensure_future(self._expire_loop()))
+        logger.info("OTLP receiver listening on http://%s:%d%s", self.host, self.port, TRACES_PATH)
+
+    async def stop(self) -> None:
+        """
+        Stop accepting spans, evaluate every trace still open or queued, then shut down.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._queue is None:
+            # Never started
+            return
+
+        for trajectory in self.streaming.flush():
+            await self._queue.put(trajectory)
+        await self._queue.join()
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queue_gauge is not None:
+            telemetry.unobserve(self._queue_gauge)
+            self._queue_gauge = None
+
+    async def serve_forever(self) -> None:
+        """Start the receiver and run until cancelled."""
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    async def __aenter__(self) -> "OTLPReceiver":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def ingest(self, records: List[tuple]) -> None:
+        """
+        Feed span snapshots into the streaming converter and queue completed traces.
+
+        Waits for queue capacity when necessary.
+
+        Args:
+            records: Span snapshots in the format of ``converter._span_record``
+        """
+        converter = self.streaming.converter
+        await self._ingest_spans([converter._span_from_record(record) for record in records])
+
+    async def _ingest_spans(self, spans: List[Span]) -> None:
+        self.spans_received += len(spans)
+        for trajectory in self.streaming.add_internal_spans(spans):
+            await self._queue.put(trajectory)
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except _HTTPError as e:
+                    await self._respond(writer, e.status, e.message.encode(), "text/plain", close=True)
+                    return
+                if request is None:
+                    return
+
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload, content_type, extra = await self._dispatch(
+                    method, path, headers, body
+                )
+                await self._respond(writer, status, payload, content_type, extra, close=not keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(
+        self, method: str, path: str, headers: Dict[str, str], body: bytes
+    ) -> Tuple[int, bytes, str, Dict[str, str]]:
+        if path.split("?", 1)[0] != TRACES_PATH:
+            return 404, b"Not Found", "text/plain", {}
+        if method != "POST":
+            return 405, b"Method Not Allowed", "text/plain", {"Allow": "POST"}
+
+        if self._queue.full():
+            self.requests_rejected += 1
+            return 503, b"Evaluation queue is full", "text/plain", {
+                "Retry-After": str(self.retry_after)
+            }
+
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        try:
+            body = self._decode_body(body, headers.get("content-encoding", ""))
+            if content_type == "application/json":
+                records = [otlp_span_record(span) for span in iter_otlp_spans(json_utils.loads(body))]
+                response, response_type = b"{}", "application/json"
+            elif content_type == "application/x-protobuf":
+                records = parse_export_request(body)
+                response, response_type = b"", "application/x-protobuf"
+            else:
+                return 415, b"Unsupported Media Type", "text/plain", {}
+            # Converted here so that spans with missing or invalid ids are rejected
+            converter = self.streaming.converter
+            spans = [converter._span_from_record(record) for record in records]
+        except _HTTPError as e:
+            return e.status, e.message.encode(), "text/plain", {}
+        except ImportError as e:
+            return 415, str(e).encode(), "text/plain", {}
+        except Exception as e:
+            return 400, f"Invalid export request: {e}".encode(), "text/plain", {}
+
+        await self._ingest_spans(spans)
+        return 200, response, response_type, {}
+
+    def _decode_body(self, body: bytes, encoding: str) -> bytes:
+        encoding = encoding.strip().lower()
+        if encoding in ("", "identity"):
+            return body
+        if encoding == "gzip":
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            decompressor = zlib.decompressobj()
+        else:
+            raise ValueError(f"unsupported content encoding '{encoding}'")
+
+        # Bounded, so that a small compressed body cannot expand without limit
+        decoded = decompressor.decompress(body, self.max_body_size)
+        if decompressor.unconsumed_tail:
+            raise _HTTPError(413, "Decompressed body too large")
+        if not decompressor.eof:
+            raise ValueError("truncated compressed body")
+        return decoded
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise _HTTPError(400)
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise _HTTPError(411)
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise _HTTPError(400, "Invalid Content-Length")
+        if length < 0:
+            raise _HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body_size:
+            raise _HTTPError(413)
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path, headers, body
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: bytes,
+        content_type: str,
+        extra_headers: Optional[Dict[str, str]] = None,
+        close: bool = False,
+    ) -> None:
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(len(body)),
+            "Connection": "close" if close else "keep-alive",
+        }
+        headers.update(extra_headers or {})
+        head = f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n" + "".join(
+            f"{k}: {v}\r\n" for k, v in headers.items()
+        )
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    async def _worker(self) -> None:
+        while True:
+            trajectory = await self._queue.get()
+            try:
+                result = await self.evaluator.evaluate(trajectory)
+                self.trajectories_evaluated += 1
+                if self.on_result is not None:
+                    outcome = self.on_result(result)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+            except Exception:
+                self.evaluation_errors += 1
+                logger.exception("Failed to evaluate trajectory %s", trajectory.trace_id)
+            finally:
+                self._queue.task_done()
+
+    async def _expire_loop(self) -> None:
+        interval = max(min(self.streaming.idle_timeout / 2, 1.0), 0.01)
+        while True:
+            await asyncio.sleep(interval)
+            for trajectory in self.streaming.expire():
+                await self._queue.put(trajectory)
+
+
+def _build_metrics(names: List[str], aws_region: Optional[str]) -> List:
+    metrics = []
+    for name in names:
+        if name == "latency":
+            from flotorch_eval.agent_eval.metrics.latency_metrics import LatencyMetric
+
+            metrics.append(LatencyMetric())
+        elif name == "usage":
+            from flotorch_eval.agent_eval.metrics.base import MetricConfig
+            from flotorch_eval.agent_eval.metrics.usage_metrics import UsageMetric
+
+            metrics.append(UsageMetric(config=MetricConfig(metric_params={"aws_region": aws_region})))
+    return metrics
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Receive OTLP/HTTP spans and evaluate the traces.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument(
+        "--metric",
+        action="append",
+        choices=["latency", "usage"],
+        help="Metric to compute (repeatable); defaults to latency",
+    )
+    parser.add_argument("--aws-region", help="AWS region used to price the usage metric")
+    parser.add_argument("--output", help="JSON-lines file for results; defaults to stdout")
+    parser.add_argument("--idle-timeout", type=float, default=30.0)
+    parser.add_argument("--max-pending", type=int, default=1_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    evaluator = Evaluator(_build_metrics(args.metric or ["latency"], args.aws_region))
+    output = open(args.output, "a") if args.output else sys.stdout
+
+    def write_result(result: EvaluationResult) -> None:
+        output.write(result.model_dump_json() + "\n")
+        output.flush()
+
+    receiver = OTLPReceiver(
+        evaluator,
+        host=args.host,
+        port=args.port,
+        on_result=write_result,
+        idle_timeout=args.idle_timeout,
+        max_pending=args.max_pending,
+        workers=args.workers,
+    )
+    try:
+        asyncio.run(receiver.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
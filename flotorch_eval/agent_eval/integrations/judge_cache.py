@@ -0,0 +1,148 @@
+"""
+Two-tier cache of judge LLM calls for LangChain models and Ragas wrappers.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.load import dumps, loads
+
+from flotorch_eval.common import telemetry
+from flotorch_eval.common.sqlite_cache import DEFAULT_CACHE_DIR, SQLiteCache
+
+DEFAULT_JUDGE_CACHE_PATH = os.path.join(DEFAULT_CACHE_DIR, "judge_calls.sqlite")
+
+
+class JudgeCache(BaseCache):
+    """
+    LangChain cache with an in-memory LRU tier in front of an on-disk SQLite tier.
+
+    Entries are keyed by the exact rendered prompt and LangChain's ``llm_string``,
+    which encodes the model and its parameters, so identical prompts from
+    different metrics or reruns reach the model only once. Disk hits are promoted
+    to the memory tier.
+    """
+
+    def __init__(
+        self,
+        disk_path: Optional[str] = DEFAULT_JUDGE_CACHE_PATH,
+        memory_size: int = 4096,
+        max_size_bytes: Optional[int] = 512 * 1024 * 1024,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Create the cache.
+
+        Args:
+            disk_path: Path of the SQLite file of the disk tier; ``None`` keeps the
+                cache in memory only
+            memory_size: Maximum number of entries of the memory tier
+            max_size_bytes: Maximum total size of the disk tier
+            ttl: Lifetime of a disk entry in seconds; ``None`` for no expiry
+        """
+        self.memory_size = memory_size
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, RETURN_VAL_TYPE]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = (
+            SQLiteCache(disk_path, max_size_bytes=max_size_bytes, ttl=ttl)
+            if disk_path is not None
+            else None
+        )
+
+    @property
+    def hits(self) -> int:
+        """Number of lookups answered by either tier."""
+        return self.memory_hits + self.disk_hits
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(
+            prompt.encode("utf-8") + b"\0" + llm_string.encode("utf-8")
+        ).hexdigest()
+
+    def _remember(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Return the cached generations for a prompt and model, or ``None``."""
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                telemetry.count(
+                    telemetry.CACHE_LOOKUPS, {"cache": "judge", "outcome": "memory_hit"}
+                )
+                return value
+
+        stored = self._disk.get(key) if self._disk is not None else None
+        if stored is None:
+            with self._lock:
+                self.misses += 1
+            telemetry.count(telemetry.CACHE_LOOKUPS, {"cache": "judge", "outcome": "miss"})
+            return None
+
+        value = [loads(generation) for generation in json.loads(stored)]
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, value)
+        telemetry.count(telemetry.CACHE_LOOKUPS, {"cache": "judge", "outcome": "disk_hit"})
+        return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store the generations returned for a prompt and model in both tiers."""
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            self._remember(key, return_val)
+        if self._disk is not None:
+            payload = json.dumps([dumps(generation) for generation in return_val])
+            self._disk.set(key, payload.encode("utf-8"))
+
+    def clear(self, **kwargs: Any) -> None:
+        """Empty both tiers and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = self.disk_hits = self.misses = 0
+        if self._disk is not None:
+            self._disk.clear()
+
+    def close(self) -> None:
+        """Close the disk tier."""
+        if self._disk is not None:
+            self._disk.close()
+
+
+def attach_judge_cache(llm: Any, cache: BaseCache) -> bool:
+    """
+    Make a judge model use ``cache`` for its calls.
+
+    Supports LangChain language models and Ragas ``LangchainLLMWrapper`` instances;
+    other judges (e.g. raw provider clients) are left untouched.
+
+    Args:
+        llm: The judge passed to a metric
+        cache: The cache to use
+
+    Returns:
+        Whether the cache was attached
+    """
+    for model in (llm, getattr(llm, "langchain_llm", None)):
+        if isinstance(model, BaseLanguageModel):
+            model.cache = cache
+            return True
+    return False
+
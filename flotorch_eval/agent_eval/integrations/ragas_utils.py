@@ -7,7 +7,9 @@ from typing import Dict, List, Optional, Tuple
 import ragas.messages as r
 
 from flotorch_eval.agent_eval.core.schemas import Message, ToolCall, Trajectory
+from flotorch_eval.agent_eval.core.views import memoized_view
 
+@memoized_view
 def convert_to_ragas_format(trajectory: Trajectory) -> List[r.Message]:
     """
     Convert a trajectory to Ragas message format.
@@ -21,9 +21,22 @@ class MetricConfig(BaseModel):
 
 
 class BaseMetric(ABC):
-    """Base class for all evaluation metrics."""
+    """
+    Base class for all evaluation metrics.
+
+    Metrics that only do local computation can set ``cpu_bound = True``; the
+    ``Evaluator`` may then run them in a worker process, where they are rebuilt
+    from their class and ``config``. Such metrics must not require an LLM and
+    their configuration must be picklable.
+
+    Metrics whose result depends only on the messages of a trajectory, their
+    ``metric_params`` and their judge model can set ``cacheable = True`` so that
+    the ``Evaluator`` reuses results from its ``MetricResultCache``.
+    """
 
     requires_llm: bool = False
+    cpu_bound: bool = False
+    cacheable: bool = False
 
     def __init__(
         self, llm: Optional[Any] = None, config: Optional[MetricConfig] = None
@@ -2,6 +2,9 @@
 LangChain-based evaluation metrics.
 """
 
+import asyncio
+import contextvars
+import functools
 import json
 from typing import Any, Dict, List, Literal, Optional, Union
 
@@ -17,41 +20,56 @@ from langchain_core.language_models.chat_models import BaseChatModel
 
 from flotorch_eval.agent_eval.metrics.base import BaseMetric, MetricConfig
 from flotorch_eval.agent_eval.core.schemas import MetricResult, Trajectory
+from flotorch_eval.agent_eval.core.views import memoized_view
+from flotorch_eval.common import telemetry
 
 # Define valid match modes
 TrajectoryMatchMode = Literal["strict", "unordered", "subset", "superset"]
 ToolArgsMatchMode = Literal["exact", "ignore", "subset", "superset"]
 
 
+@memoized_view
+def _standard_format(trajectory: Trajectory) -> List[Dict[str, Any]]:
+    outputs = []
+    for msg in trajectory.messages:
+        output = {"role": msg.role, "content": msg.content}
+
+        if hasattr(msg, "tool_calls") and msg.tool_calls:
+            output["tool_calls"] = [
+                {
+                    "function": {
+                        "name": tool_call.name,
+                        "arguments": json.dumps(tool_call.arguments),
+                    }
+                }
+                for tool_call in msg.tool_calls
+            ]
+
+        outputs.append(output)
+    return outputs
+
+
 class LangChainAgentsEvalMixin:
     """Evaluates agent responses based on custom criteria using LangChain Agent Evals."""
 
     def _convert_to_standard_format(
         self, trajectory: Trajectory
     ) -> List[Dict[str, Any]]:
-        """Convert trajectory to standard format for evaluation."""
-        outputs = []
-        for msg in trajectory.messages:
-            output = {"role": msg.role, "content": msg.content}
-
-            if hasattr(msg, "tool_calls") and msg.tool_calls:
-                output["tool_calls"] = [
-                    {
-                        "function": {
-                                                "name": tool_call.name,
-                    "arguments": json.dumps(tool_call.arguments),
-                        }
-                    }
-                    for tool_call in msg.tool_calls
-                ]
+        """
+        Convert trajectory to standard format for evaluation.
 
-            outputs.append(output)
-        return outputs
+        The conversion is shared by all metrics of an evaluation; the returned
+        list must not be modified.
+        """
+        return _standard_format(trajectory)
 
 
 class TrajectoryEvalWithoutLLMMetric(BaseMetric, LangChainAgentsEvalMixin):
     """Evaluates the agent's trajectory including tool call accuracy."""
 
+    cpu_bound = True
+    cacheable = True
+
     @property
     def name(self) -> str:
         return "trajectory_eval_without_llm"
@@ -140,6 +158,7 @@ class TrajectoryEvalWithLLMMetric(BaseMetric, LangChainAgentsEvalMixin):
     """Evaluates the agent's trajectory using LLM as judge, optionally comparing against reference outputs."""
 
     requires_llm = True
+    cacheable = True
 
     @property
     def name(self) -> str:
@@ -186,33 +205,28 @@ class TrajectoryEvalWithLLMMetric(BaseMetric, LangChainAgentsEvalMixin):
         # Convert trajectory to standard format
         outputs = self._convert_to_standard_format(trajectory)
 
-        try:
-            # Evaluate trajectory with or without reference
-            if reference_outputs:
-                result = self.evaluator(
-                    outputs=outputs, reference_outputs=reference_outputs
-                )
-            else:
-                result = self.evaluator(outputs=outputs)
-
-            # Extract score (convert boolean to float) and details from result
-            score = 1.0 if result.get("score", False) else 0.0
+        # Evaluate trajectory with or without reference. The judge client is
+        # synchronous, so it runs in a thread to keep the event loop free, in a
+        # copy of the current context so that its spans nest under the judge span.
+        kwargs = {"outputs": outputs}
+        if reference_outputs:
+            kwargs["reference_outputs"] = reference_outputs
+        with telemetry.traced(
+            telemetry.JUDGE_SPAN, telemetry.JUDGE_DURATION, {"metric": self.name}
+        ):
+            result = await asyncio.get_running_loop().run_in_executor(
+                None,
+                functools.partial(contextvars.copy_context().run, self.evaluator, **kwargs),
+            )
 
-            # Extract only simple types for details
-            details = {
-                "comment": str(result.get("comment", "")),
-                "has_reference": bool(reference_outputs is not None),
-                "raw_score": bool(result.get("score", False)),
-            }
+        # Extract score (convert boolean to float) and details from result
+        score = 1.0 if result.get("score", False) else 0.0
 
-            return MetricResult(name=self.name, score=score, details=details)
+        # Extract only simple types for details
+        details = {
+            "comment": str(result.get("comment", "")),
+            "has_reference": bool(reference_outputs is not None),
+            "raw_score": bool(result.get("score", False)),
+        }
 
-        except Exception as e:
-            return MetricResult(
-                name=self.name,
-                score=0.0,
-                details={
-                    "error": str(e),
-                    "has_reference": bool(reference_outputs is not None),
-                },
-            )
+        return MetricResult(name=self.name, score=score, details=details)
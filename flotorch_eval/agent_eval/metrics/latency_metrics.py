@@ -1,13 +1,13 @@
 from typing import Optional
 from flotorch_eval.agent_eval.metrics.base import BaseMetric, MetricConfig
 from flotorch_eval.agent_eval.core.schemas import MetricResult, Trajectory
-from flotorch_eval.agent_eval.metrics.schema import LatencySummary
-from flotorch_eval.common.latency_utils import extract_latency_from_trajectory  # assumed moved here
+from flotorch_eval.common.latency_utils import extract_latency_from_trajectory
 
 class LatencyMetric(BaseMetric):
     """Metric to compute latency per step and overall for a given trajectory."""
 
     requires_llm = False
+    cpu_bound = True
 
     @property
     def name(self) -> str:
@@ -21,7 +21,8 @@ class LatencyMetric(BaseMetric):
 
     async def compute(self, trajectory: Trajectory) -> MetricResult:
         """
-        Compute latency summary across the trajectory steps.
+        Compute latency summary across the trajectory steps, nested along the
+        span tree of the trajectory.
 
         Args:
             trajectory: The trajectory to evaluate.
@@ -34,5 +35,5 @@ class LatencyMetric(BaseMetric):
         return MetricResult(
             name=self.name,
             score=0.0, 
-            details=latency_summary
+            details=latency_summary.to_dict()
         )
@@ -15,8 +15,42 @@ from ragas.metrics import (
 )
 
 from flotorch_eval.agent_eval.core.schemas import MetricResult, Trajectory
+from flotorch_eval.agent_eval.core.views import memoized_view
 from flotorch_eval.agent_eval.metrics.base import BaseMetric, MetricConfig
 from flotorch_eval.agent_eval.integrations.ragas_utils import convert_to_ragas_format
+from flotorch_eval.common import telemetry
+
+
+@memoized_view
+def _ragas_messages_and_tool_calls(
+    trajectory: Trajectory,
+) -> Tuple[List[r.Message], List[r.ToolCall]]:
+    ragas_messages = []
+    reference_tool_calls = []
+
+    for msg in trajectory.messages:
+        if msg.role == "user":
+            ragas_messages.append(r.HumanMessage(content=msg.content))
+
+        elif msg.role == "assistant":
+            # Convert tool calls to Ragas format
+            tool_calls = []
+            for tc in msg.tool_calls:
+                ragas_tool_call = r.ToolCall(name=tc.name, args=tc.arguments)
+                tool_calls.append(ragas_tool_call)
+                reference_tool_calls.append(ragas_tool_call)
+
+            ragas_messages.append(
+                r.AIMessage(
+                    content=msg.content,
+                    tool_calls=tool_calls if tool_calls else None,
+                )
+            )
+
+        elif msg.role == "tool":
+            ragas_messages.append(r.ToolMessage(content=msg.content))
+
+    return ragas_messages, reference_tool_calls
 
 
 class RagasMetricMixin:
@@ -28,44 +62,23 @@ class RagasMetricMixin:
         """
         Convert a trajectory to Ragas message format.
 
+        The conversion is shared by all metrics of an evaluation; the returned lists
+        must not be modified.
+
         Args:
             trajectory: The trajectory to convert
 
         Returns:
             Tuple of (ragas_messages, reference_tool_calls)
         """
-        ragas_messages = []
-        reference_tool_calls = []
-
-        for msg in trajectory.messages:
-            if msg.role == "user":
-                ragas_messages.append(r.HumanMessage(content=msg.content))
-
-            elif msg.role == "assistant":
-                # Convert tool calls to Ragas format
-                tool_calls = []
-                for tc in msg.tool_calls:
-                    ragas_tool_call = r.ToolCall(name=tc.name, args=tc.arguments)
-                    tool_calls.append(ragas_tool_call)
-                    reference_tool_calls.append(ragas_tool_call)
-
-                ragas_messages.append(
-                    r.AIMessage(
-                        content=msg.content,
-                        tool_calls=tool_calls if tool_calls else None,
-                    )
-                )
-
-            elif msg.role == "tool":
-                ragas_messages.append(r.ToolMessage(content=msg.content))
-
-        return ragas_messages, reference_tool_calls
+        return _ragas_messages_and_tool_calls(trajectory)
 
 
 class ToolCallAccuracyMetric(BaseMetric, RagasMetricMixin):
     """Evaluates the agent's tool call accuracy."""
 
     requires_llm = False
+    cacheable = True
 
     @property
     def name(self) -> str:
@@ -103,10 +116,11 @@ class ToolCallAccuracyMetric(BaseMetric, RagasMetricMixin):
             messages=ragas_messages, reference_tool_calls=reference_tool_calls
         )
 
-        if not score:
+        if score is None:
             return MetricResult(
                 name=self.name,
                 score=0.0,
+                status="failed",
                 details={"error": "Failed to evaluate interaction"},
             )
 
@@ -135,19 +149,15 @@ class ToolCallAccuracyMetric(BaseMetric, RagasMetricMixin):
         if reference_answer:
             sample_params["reference"] = reference_answer
 
-        try:
-            sample = MultiTurnSample(**sample_params)
-            score = await self.evaluator.multi_turn_ascore(sample)
-            return score
-        except Exception as e:
-            print(f"Error evaluating interaction: {e}")
-            return None
+        sample = MultiTurnSample(**sample_params)
+        return await self.evaluator.multi_turn_ascore(sample)
 
 
 class AgentGoalAccuracyMetric(BaseMetric, RagasMetricMixin):
     """Evaluates the agent's goal accuracy."""
 
     requires_llm = True
+    cacheable = True
 
     @property
     def name(self) -> str:
@@ -194,8 +204,13 @@ class AgentGoalAccuracyMetric(BaseMetric, RagasMetricMixin):
             reference_answer=reference_answer if self.has_reference else None,
         )
 
-        if not score:
-            return MetricResult(name=self.name, score=0.0, details={})
+        if score is None:
+            return MetricResult(
+                name=self.name,
+                score=0.0,
+                status="failed",
+                details={"error": "No messages to evaluate"},
+            )
 
         return MetricResult(
             name=self.name,
@@ -221,10 +236,8 @@ class AgentGoalAccuracyMetric(BaseMetric, RagasMetricMixin):
         if reference_answer:
             sample_params["reference"] = reference_answer
 
-        try:
-            sample = MultiTurnSample(**sample_params)
-            score = await self.evaluator.multi_turn_ascore(sample)
-            return score
-        except Exception as e:
-            print(f"Error evaluating interaction: {e}")
-            return None
+        sample = MultiTurnSample(**sample_params)
+        with telemetry.traced(
+            telemetry.JUDGE_SPAN, telemetry.JUDGE_DURATION, {"metric": self.name}
+        ):
+            return await self.evaluator.multi_turn_ascore(sample)
@@ -11,6 +11,8 @@ from flotorch_eval.agent_eval.metrics.base import BaseMetric, MetricResult
 class ToolAccuracyMetric(BaseMetric):
     """Measures the accuracy of tool calls in a trajectory."""
 
+    cpu_bound = True
+
     @property
     def name(self) -> str:
         return "tool_accuracy"
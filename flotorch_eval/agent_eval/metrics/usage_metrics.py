@@ -8,6 +8,7 @@ class UsageMetric(BaseMetric):
     """Metric to compute cost/token of LLM usage per span and overall."""
 
     requires_llm = False
+    cpu_bound = True
 
     @property
     def name(self) -> str:
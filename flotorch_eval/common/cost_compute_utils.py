@@ -1,8 +1,11 @@
 import os
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from decimal import Decimal
 from dataclasses import dataclass
+from functools import lru_cache
+
+from flotorch_eval.common import telemetry
 
 MILLION = 1_000_000
 THOUSAND = 1_000
@@ -37,18 +40,38 @@ def extract_metadata_metrics(metadata: Dict[str, Any]) -> MetricsData:
         cost=Decimal('0.0000')
     )
 
-def calculate_bedrock_inference_cost(input_tokens,output_tokens, inference_model, aws_region):
+@lru_cache(maxsize=None)
+def _bedrock_prices(inference_model: str, aws_region: str) -> Tuple[float, float]:
+    rows = df[(df["model"] == inference_model) & (df["Region"] == aws_region)]
+    return float(rows["input_price"].values[0]), float(rows["output_price"].values[0])
 
-    input_price = df[
-        (df["model"] == inference_model) & (df["Region"] == aws_region)
-        ]["input_price"]
 
-    output_price = df[
-        (df["model"] == inference_model) & (df["Region"] == aws_region)
-        ]["output_price"]
+def get_bedrock_prices(inference_model: str, aws_region: str) -> Tuple[float, float]:
+    """
+    Look up the input and output price per million tokens of a model in a region.
+
+    The table lookup is done once per (model, region); every later call for the
+    same pair is a dictionary hit. The span wraps the cached lookup, so it is
+    recorded on hits as well.
 
-    input_price_per_million_tokens = float(input_price.values[0])  # Price per million tokens
-    output_price_per_million_tokens = float(output_price.values[0])  # Price per million tokens
+    Args:
+        inference_model: Bedrock model id
+        aws_region: AWS region
+
+    Returns:
+        Tuple of (input price, output price) per million tokens
+    """
+    with telemetry.traced(
+        telemetry.COST_LOOKUP_SPAN, attributes={"model": inference_model, "region": aws_region}
+    ):
+        return _bedrock_prices(inference_model, aws_region)
+
+
+def calculate_bedrock_inference_cost(input_tokens,output_tokens, inference_model, aws_region):
+
+    input_price_per_million_tokens, output_price_per_million_tokens = get_bedrock_prices(
+        inference_model, aws_region
+    )
 
     input_actual_cost = (input_price_per_million_tokens * float(input_tokens)) / MILLION
     output_actual_cost = (output_price_per_million_tokens * float(output_tokens)) / MILLION
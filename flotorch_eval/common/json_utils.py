@@ -0,0 +1,62 @@
+"""
+JSON decoding helpers with an optional fast backend.
+"""
+
+import json
+import re
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only need this one
+JSONDecodeError = json.JSONDecodeError
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Decode a JSON document, using orjson when it is installed.
+
+    Args:
+        data: The JSON document
+
+    Returns:
+        The decoded value
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def loads_first_element(data: str) -> Any:
+    """
+    Decode only the first element of a JSON array.
+
+    The rest of the document is not parsed, so the cost is proportional to the size
+    of the first element rather than of the whole array.
+
+    Args:
+        data: A JSON document whose top-level value is an array
+
+    Returns:
+        The first element, or ``None`` if the array is empty
+
+    Raises:
+        JSONDecodeError: If the document does not start with an array or its first
+            element is malformed
+    """
+    index = _whitespace.match(data, 0).end()
+    if data[index : index + 1] != "[":
+        raise JSONDecodeError("Expecting '['", data, index)
+
+    index = _whitespace.match(data, index + 1).end()
+    if data[index : index + 1] == "]":
+        return None
+
+    value, _ = _decoder.raw_decode(data, index)
+    return value
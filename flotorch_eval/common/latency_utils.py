@@ -1,27 +1,174 @@
-from typing import List
-from flotorch_eval.agent_eval.core.schemas import Trajectory
-from flotorch_eval.agent_eval.core.schemas import LatencyBreakdownItem, LatencySummary
+from typing import Dict, Iterable, List, Optional, Tuple
+from flotorch_eval.agent_eval.core.schemas import Span, Trajectory
+from flotorch_eval.agent_eval.core.schemas import CriticalPathStep, LatencyBreakdownItem, LatencySummary
+from flotorch_eval.agent_eval.core.span_tree import SpanTree
+from flotorch_eval.agent_eval.core.views import memoized_view
 
+NS_PER_MS = 1_000_000
+
+
+def _ms(duration_ns: int) -> float:
+    return round(duration_ns / NS_PER_MS, 2)
+
+
+def merged_duration_ns(intervals: Iterable[Tuple[int, int]]) -> int:
+    """
+    Length of the union of ``[start, end)`` intervals, in one sweep over the sorted starts.
+
+    Args:
+        intervals: Pairs of start and end times in nanoseconds
+
+    Returns:
+        Time covered by at least one interval
+    """
+    total = 0
+    current_start: Optional[int] = None
+    current_end = 0
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if current_start is None or start > current_end:
+            if current_start is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        elif end > current_end:
+            current_end = end
+    if current_start is not None:
+        total += current_end - current_start
+    return total
+
+
+def self_time_ns(tree: SpanTree, span: Span) -> int:
+    """
+    Time a span spends outside all of its children.
+
+    Children are clipped to the span and overlapping children are counted once, so
+    the result is never negative.
+
+    Args:
+        tree: Span tree of the trajectory
+        span: The span
+
+    Returns:
+        Self time in nanoseconds
+    """
+    start, end = span.start_time_unix_nano, span.end_time_unix_nano
+    covered = merged_duration_ns(
+        (max(child.start_time_unix_nano, start), min(child.end_time_unix_nano, end))
+        for child in tree.children(span.span_id)
+    )
+    return max(end - start - covered, 0)
+
+
+def critical_path(tree: SpanTree) -> List[CriticalPathStep]:
+    """
+    Find the chain of work that bounds the end-to-end latency of a trace.
+
+    Walking back from the end of each span, the child that finishes last is on the
+    critical path; the walk then continues from that child's start. Time in which no
+    chosen child runs is attributed to the span itself. Several roots are treated as
+    children of one virtual span covering the whole trace.
+
+    Args:
+        tree: Span tree of the trajectory
+
+    Returns:
+        Steps of the critical path in chronological order; consecutive segments of
+        the same span are merged
+    """
+    roots = tree.roots
+    if not roots:
+        return []
+
+    segments: List[Tuple[int, int, Span]] = []
+    stack: List[Tuple[Optional[Span], int, int]] = [(
+        None,
+        min(span.start_time_unix_nano for span in roots),
+        max(span.end_time_unix_nano for span in roots),
+    )]
+    while stack:
+        span, start, end = stack.pop()
+        children = roots if span is None else tree.children(span.span_id)
+        cursor = end
+        for child in sorted(children, key=lambda x: x.end_time_unix_nano, reverse=True):
+            if cursor <= start:
+                break
+            if child.start_time_unix_nano >= cursor:
+                continue
+            child_end = min(child.end_time_unix_nano, cursor)
+            if span is not None and child_end < cursor:
+                segments.append((child_end, cursor, span))
+            child_start = max(child.start_time_unix_nano, start)
+            stack.append((child, child_start, child_end))
+            cursor = child_start
+        if span is not None and cursor > start:
+            segments.append((start, cursor, span))
+
+    steps: List[CriticalPathStep] = []
+    durations: List[int] = []
+    for seg_start, seg_end, span in sorted(segments, key=lambda x: x[0]):
+        if steps and steps[-1].span_id == span.span_id:
+            durations[-1] += seg_end - seg_start
+            continue
+        steps.append(CriticalPathStep(step_name=span.name, span_id=span.span_id, duration_ms=0.0))
+        durations.append(seg_end - seg_start)
+    for step, duration in zip(steps, durations):
+        step.duration_ms = _ms(duration)
+    return steps
+
+
+@memoized_view
 def extract_latency_from_trajectory(trajectory: Trajectory) -> LatencySummary:
+    """
+    Build the latency breakdown of a trajectory, nested along the span tree.
+
+    Every span appears once, under its parent; totals and averages are taken over
+    the root steps so nested spans are not counted twice. The summary also holds
+    the wall-clock time covered by the trace, the critical path and the
+    parallelism factor (total self time over wall-clock time; 1.0 for fully
+    sequential work). The analysis runs in O(n log n).
+
+    Args:
+        trajectory: The trajectory to summarize
+
+    Returns:
+        Latency summary whose breakdown holds the root steps and their children
+    """
+    tree = trajectory.span_tree
+    items: Dict[str, LatencyBreakdownItem] = {}
     breakdown: List[LatencyBreakdownItem] = []
     total_latency = 0.0
+    total_self_ns = 0
 
-    for span in trajectory.spans:
-        start = span.start_time
-        end = span.end_time
-
-        if start is not None and end is not None:
-            latency_ms = (end - start).total_seconds() * 1000
-            latency_ms = round(latency_ms, 2)
+    # Pre-order guarantees a parent's item exists before its children are attached
+    for span in tree:
+        # Work on the raw nanosecond timestamps; no datetime is built per span
+        latency_ms = _ms(span.end_time_unix_nano - span.start_time_unix_nano)
+        span_self_ns = self_time_ns(tree, span)
+        total_self_ns += span_self_ns
+        item = LatencyBreakdownItem(
+            step_name=span.name, latency_ms=latency_ms, self_time_ms=_ms(span_self_ns)
+        )
+        items[span.span_id] = item
 
-            item = LatencyBreakdownItem(step_name=span.name, latency_ms=latency_ms)
+        parent = tree.parent(span.span_id)
+        if parent is None:
             breakdown.append(item)
             total_latency += latency_ms
+        else:
+            items[parent.span_id].children.append(item)
 
     average_latency = round(total_latency / len(breakdown), 2) if breakdown else 0.0
+    wall_clock_ns = merged_duration_ns(
+        (span.start_time_unix_nano, span.end_time_unix_nano) for span in tree
+    )
+    parallelism = round(total_self_ns / wall_clock_ns, 2) if wall_clock_ns else 1.0
 
     return LatencySummary(
         total_latency_ms=round(total_latency, 2),
         average_step_latency_ms=average_latency,
-        latency_breakdown=breakdown
+        latency_breakdown=breakdown,
+        wall_clock_ms=_ms(wall_clock_ns),
+        critical_path=critical_path(tree),
+        parallelism_factor=parallelism,
     )
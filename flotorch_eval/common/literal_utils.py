@@ -0,0 +1,127 @@
+"""
+Bounded, cached parsing of Python literal reprs found in span attributes.
+"""
+
+import ast
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any
+
+DEFAULT_MAX_LENGTH = 1_048_576
+DEFAULT_MAX_DEPTH = 64
+
+# String literals are consumed whole so brackets inside them are not counted
+_BRACKET_TOKENS = re.compile(
+    r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|[\[\]{}()]", re.DOTALL
+)
+
+
+class LiteralTooLargeError(ValueError):
+    """Raised when a literal exceeds the configured size or nesting limits."""
+
+
+class _LiteralCache:
+    """Thread-safe LRU cache keyed by a digest of the literal text."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes, default: Any) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: bytes, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+literal_cache = _LiteralCache(maxsize=1024)
+
+_MISSING = object()
+
+
+def parse_literal(
+    text: str,
+    max_length: int = DEFAULT_MAX_LENGTH,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    cache: bool = True,
+) -> Any:
+    """
+    Safely evaluate a Python literal such as the repr of a list of dicts.
+
+    Values longer than ``max_length`` characters or nested deeper than ``max_depth``
+    are rejected before evaluation. Results are cached by a digest of the text, so
+    repeated values (e.g. the tool definitions sent with every span of an agent)
+    are evaluated once per process. Cached values are shared and must not be
+    mutated by callers.
+
+    Args:
+        text: The literal to evaluate
+        max_length: Maximum accepted length in characters
+        max_depth: Maximum accepted bracket nesting depth
+        cache: Whether to look up and store the result in ``literal_cache``
+
+    Returns:
+        The evaluated literal
+
+    Raises:
+        LiteralTooLargeError: If the value exceeds the size or nesting limits
+        ValueError, SyntaxError: If the value is not a valid literal
+    """
+    if len(text) > max_length:
+        raise LiteralTooLargeError(
+            f"Literal of {len(text)} characters exceeds the limit of {max_length}"
+        )
+
+    key = b""
+    if cache:
+        key = hashlib.blake2b(
+            text.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest()
+        value = literal_cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+    depth = 0
+    for token in _BRACKET_TOKENS.finditer(text):
+        bracket = token.group()
+        if bracket in ("(", "[", "{"):
+            depth += 1
+            if depth > max_depth:
+                raise LiteralTooLargeError(
+                    f"Literal nesting exceeds the limit of {max_depth}"
+                )
+        elif bracket in (")", "]", "}"):
+            depth -= 1
+
+    try:
+        value = ast.literal_eval(text)
+    except (RecursionError, MemoryError) as e:
+        raise LiteralTooLargeError(f"Literal could not be evaluated: {e}") from e
+
+    if cache:
+        literal_cache.put(key, value)
+    return value
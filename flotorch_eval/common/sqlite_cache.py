@@ -0,0 +1,184 @@
+"""
+Local key-value cache on SQLite with size-based LRU eviction and a TTL.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "flotorch_eval")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+
+class SQLiteCache:
+    """
+    Thread-safe persistent cache of byte strings.
+
+    Entries older than ``ttl`` seconds are treated as missing and removed when read.
+    When the total size of the stored values exceeds ``max_size_bytes``, the least
+    recently read entries are evicted. Several processes may share a file; each
+    process tracks the total size from its own writes and re-reads it when evicting.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size_bytes: Optional[int] = 256 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Open or create the cache.
+
+        Args:
+            path: Path of the SQLite file; parent directories are created
+            max_size_bytes: Maximum total size of the stored values; ``None`` for
+                no limit
+            ttl: Lifetime of an entry in seconds; ``None`` for no expiry
+            clock: Wall clock used for the TTL and the LRU order
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._size = self._total_size()
+
+    def _total_size(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return the value stored under ``key``, or ``None`` if missing or expired.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The stored value
+        """
+        now = self.clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, size, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._size -= size
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return bytes(value)
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Store ``value`` under ``key``, evicting old entries if the cache is full.
+
+        Args:
+            key: The cache key
+            value: The value to store
+        """
+        now = self.clock()
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._size += len(value) - (previous[0] if previous else 0)
+            if self.max_size_bytes is not None and self._size > self.max_size_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        self._size = self._total_size()
+        excess = self._size - self.max_size_bytes
+        if excess <= 0:
+            return
+
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self._size -= freed
+
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under ``key``, if any."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._size = self._total_size()
+
+    def purge_expired(self) -> int:
+        """
+        Remove every expired entry.
+
+        Returns:
+            Number of entries removed
+        """
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (self.clock() - self.ttl,)
+            ).rowcount
+            self._size = self._total_size()
+            return removed
+
+    def clear(self) -> None:
+        """Remove every entry and reset the hit and miss counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the stored values."""
+        return self._size
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
@@ -0,0 +1,235 @@
+"""
+Optional OpenTelemetry self-instrumentation of flotorch-eval.
+
+Instrumentation is off by default, and every helper then returns immediately.
+Once enabled with :func:`enable_instrumentation`, spans and metrics go to the
+configured (or given) OpenTelemetry tracer and meter providers.
+
+Spans created here carry the ``flotorch_eval.internal`` attribute; the trace
+converter drops them, and everything nested under them (e.g. the spans of an
+instrumented judge model), so evaluating an agent never alters its trajectory.
+"""
+
+import itertools
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Optional, Tuple
+
+try:
+    from opentelemetry import metrics as otel_metrics
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - optional dependency
+    otel_metrics = None
+    otel_trace = None
+
+INSTRUMENTATION_NAME = "flotorch_eval"
+INTERNAL_SPAN_ATTRIBUTE = "flotorch_eval.internal"
+
+# Span names
+CONVERT_SPAN = "flotorch_eval.convert"
+METRIC_SPAN = "flotorch_eval.metric"
+JUDGE_SPAN = "flotorch_eval.judge"
+COST_LOOKUP_SPAN = "flotorch_eval.cost_lookup"
+
+# Instrument names
+CONVERT_DURATION = "flotorch_eval.convert.duration"
+METRIC_DURATION = "flotorch_eval.metric.duration"
+JUDGE_DURATION = "flotorch_eval.judge.duration"
+METRIC_ERRORS = "flotorch_eval.metric.errors"
+CACHE_LOOKUPS = "flotorch_eval.cache.lookups"
+EVALUATIONS_IN_FLIGHT = "flotorch_eval.evaluations.in_flight"
+RECEIVER_QUEUE_DEPTH = "flotorch_eval.receiver.queue_depth"
+
+_NULL_CONTEXT = nullcontext()
+
+# Sources of the observable gauges, by gauge name; kept whether or not
+# instrumentation is on, and read each time the meter collects
+_observed: Dict[str, Dict[int, Tuple[Callable[[], float], Dict[str, Any]]]] = {
+    RECEIVER_QUEUE_DEPTH: {},
+}
+_observation_ids = itertools.count()
+
+
+def _gauge_callback(name: str) -> Callable[[Any], list]:
+    def callback(options: Any) -> list:
+        return [
+            otel_metrics.Observation(read(), attributes)
+            for read, attributes in list(_observed[name].values())
+        ]
+
+    return callback
+
+
+class _Instruments:
+    """Tracer and metric instruments created when instrumentation is enabled."""
+
+    def __init__(self, tracer_provider: Any, meter_provider: Any):
+        self.tracer = otel_trace.get_tracer(
+            INSTRUMENTATION_NAME, tracer_provider=tracer_provider
+        )
+        meter = otel_metrics.get_meter(INSTRUMENTATION_NAME, meter_provider=meter_provider)
+        self.histograms = {
+            CONVERT_DURATION: meter.create_histogram(
+                CONVERT_DURATION, unit="s", description="Duration of trace conversions"
+            ),
+            METRIC_DURATION: meter.create_histogram(
+                METRIC_DURATION, unit="s", description="Duration of metric computations"
+            ),
+            JUDGE_DURATION: meter.create_histogram(
+                JUDGE_DURATION, unit="s", description="Duration of judge model calls"
+            ),
+        }
+        self.counters = {
+            METRIC_ERRORS: meter.create_counter(
+                METRIC_ERRORS, description="Metric computations that did not succeed"
+            ),
+            CACHE_LOOKUPS: meter.create_counter(
+                CACHE_LOOKUPS, description="Cache lookups, by cache and outcome"
+            ),
+        }
+        self.up_down_counters = {
+            EVALUATIONS_IN_FLIGHT: meter.create_up_down_counter(
+                EVALUATIONS_IN_FLIGHT, description="Trajectory evaluations in progress"
+            ),
+        }
+        self.gauges = {
+            RECEIVER_QUEUE_DEPTH: meter.create_observable_gauge(
+                RECEIVER_QUEUE_DEPTH,
+                callbacks=[_gauge_callback(RECEIVER_QUEUE_DEPTH)],
+                description="Trajectories waiting for evaluation in an OTLP receiver",
+            ),
+        }
+
+
+_instruments: Optional[_Instruments] = None
+
+
+def enable_instrumentation(tracer_provider: Any = None, meter_provider: Any = None) -> None:
+    """
+    Turn self-instrumentation on.
+
+    Args:
+        tracer_provider: Tracer provider to use; defaults to the global one
+        meter_provider: Meter provider to use; defaults to the global one
+
+    Raises:
+        ImportError: If ``opentelemetry-api`` is not installed
+    """
+    global _instruments
+    if otel_trace is None:
+        raise ImportError("Self-instrumentation requires the 'opentelemetry-api' package")
+    _instruments = _Instruments(tracer_provider, meter_provider)
+
+
+def disable_instrumentation() -> None:
+    """Turn self-instrumentation off."""
+    global _instruments
+    _instruments = None
+
+
+def instrumentation_enabled() -> bool:
+    """Return whether self-instrumentation is on."""
+    return _instruments is not None
+
+
+class _Traced:
+    """Span around a block of work, with its duration recorded in a histogram."""
+
+    def __init__(
+        self,
+        instruments: _Instruments,
+        name: str,
+        histogram: Optional[str],
+        attributes: Dict[str, Any],
+    ):
+        self.instruments = instruments
+        self.name = name
+        self.histogram = histogram
+        self.attributes = attributes
+        self.metric_attributes: Dict[str, Any] = {}
+
+    def __enter__(self) -> "_Traced":
+        self._span_context = self.instruments.tracer.start_as_current_span(
+            self.name, attributes={INTERNAL_SPAN_ATTRIBUTE: True, **self.attributes}
+        )
+        self.span = self._span_context.__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def set(self, key: str, value: Any) -> None:
+        """Set an attribute on the span and on the recorded duration."""
+        self.span.set_attribute(key, value)
+        self.metric_attributes[key] = value
+
+    def __exit__(self, exc_type, exc, tb) -> Optional[bool]:
+        if self.histogram is not None:
+            attributes = {**self.attributes, **self.metric_attributes}
+            if exc_type is not None:
+                attributes["error.type"] = exc_type.__name__
+            self.instruments.histograms[self.histogram].record(
+                time.perf_counter() - self._started, attributes
+            )
+        return self._span_context.__exit__(exc_type, exc, tb)
+
+
+def traced(
+    name: str, histogram: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None
+) -> ContextManager:
+    """
+    Trace a block of work.
+
+    Args:
+        name: Span name
+        histogram: Name of the duration histogram to record into, if any
+        attributes: Attributes of the span and of the recorded duration
+
+    Returns:
+        Context manager yielding an object whose ``set(key, value)`` adds an
+        attribute, or ``None`` when instrumentation is off
+    """
+    instruments = _instruments
+    if instruments is None:
+        return _NULL_CONTEXT
+    return _Traced(instruments, name, histogram, attributes or {})
+
+
+def count(name: str, attributes: Optional[Dict[str, Any]] = None, value: int = 1) -> None:
+    """Add ``value`` to a counter; does nothing when instrumentation is off."""
+    instruments = _instruments
+    if instruments is not None:
+        instruments.counters[name].add(value, attributes)
+
+
+def adjust(name: str, delta: int, attributes: Optional[Dict[str, Any]] = None) -> None:
+    """Add ``delta`` to an up/down counter; does nothing when instrumentation is off."""
+    instruments = _instruments
+    if instruments is not None:
+        instruments.up_down_counters[name].add(delta, attributes)
+
+
+def observe(
+    name: str, read: Callable[[], float], attributes: Optional[Dict[str, Any]] = None
+) -> Tuple[str, int]:
+    """
+    Report a value in an observable gauge each time metrics are collected.
+
+    Sources may be registered while instrumentation is off; they are only read
+    once it is on.
+
+    Args:
+        name: Name of the gauge
+        read: Returns the current value; called from the collecting thread
+        attributes: Attributes of the reported value
+
+    Returns:
+        Handle to pass to :func:`unobserve`
+    """
+    key = next(_observation_ids)
+    _observed[name][key] = (read, attributes or {})
+    return name, key
+
+
+def unobserve(handle: Tuple[str, int]) -> None:
+    """Stop reporting a source registered with :func:`observe`."""
+    name, key = handle
+    _observed[name].pop(key, None)
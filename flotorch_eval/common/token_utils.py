@@ -5,7 +5,9 @@ from flotorch_eval.agent_eval.core.schemas import (
     TokenTotals,
     Trajectory,
 )
+from flotorch_eval.agent_eval.core.views import memoized_view
 
+@memoized_view
 def extract_token_usage_from_trajectory(trajectory: Trajectory) -> TokenUsageSummary:
     records = []
     total_input = 0
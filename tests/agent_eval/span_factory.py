@@ -0,0 +1,284 @@
+"""
+Helpers for building OpenTelemetry SDK spans in the shapes produced by agent frameworks.
+"""
+
+import json
+from typing import List, Optional
+
+from opentelemetry.sdk.trace import Event, ReadableSpan
+from opentelemetry.trace import SpanContext, TraceFlags
+
+BASE_TIME = 1749167494000000000
+
+
+def make_span(
+    name: str,
+    trace_id: int,
+    span_id: int,
+    start: int,
+    end: int,
+    parent_id: Optional[int] = None,
+    attributes: Optional[dict] = None,
+    events: Optional[List[Event]] = None,
+) -> ReadableSpan:
+    """Create a finished SDK span; ``start``/``end`` are offsets in ms from BASE_TIME."""
+
+    def context(sid: int) -> SpanContext:
+        return SpanContext(
+            trace_id=trace_id,
+            span_id=sid,
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED),
+        )
+
+    return ReadableSpan(
+        name=name,
+        context=context(span_id),
+        parent=context(parent_id) if parent_id else None,
+        attributes=attributes or {},
+        events=events or [],
+        start_time=BASE_TIME + start * 1_000_000,
+        end_time=BASE_TIME + end * 1_000_000,
+    )
+
+
+def strands_trace(
+    trace_id: int, question: str = "What is 2 + 2?", tool_calls: int = 1
+) -> List[ReadableSpan]:
+    """
+    Build the spans of a Strands agent run that calls ``calculator`` ``tool_calls``
+    times before answering: ``2 * tool_calls + 2`` spans, the root returned last as
+    exporters do.
+    """
+    root_id = trace_id * 100_000 + 1
+    spans = []
+    history = [{"role": "user", "content": [{"text": question}]}]
+    offset = 1
+    span_id = root_id
+
+    for i in range(tool_calls):
+        completion = [
+            {"text": f"Calling the calculator ({i})"},
+            {
+                "toolUse": {
+                    "toolUseId": f"tooluse_{i}",
+                    "name": "calculator",
+                    "input": {"expression": f"{i} + 2"},
+                }
+            },
+        ]
+        span_id += 1
+        spans.append(
+            make_span(
+                "Model invoke",
+                trace_id,
+                span_id,
+                offset,
+                offset + 10,
+                parent_id=root_id,
+                attributes={
+                    "gen_ai.prompt": json.dumps(history),
+                    "gen_ai.completion": json.dumps(completion),
+                    "gen_ai.request.model": "us.anthropic.claude-3-5-haiku-20241022-v1:0",
+                    "gen_ai.usage.prompt_tokens": 100,
+                    "gen_ai.usage.completion_tokens": 20,
+                },
+            )
+        )
+        history.append({"role": "assistant", "content": completion})
+        span_id += 1
+        spans.append(
+            make_span(
+                "Tool: calculator",
+                trace_id,
+                span_id,
+                offset + 11,
+                offset + 15,
+                parent_id=root_id,
+                attributes={
+                    "tool.name": "calculator",
+                    "tool.id": f"tooluse_{i}",
+                    "tool.result": json.dumps([{"text": str(i + 2)}]),
+                },
+            )
+        )
+        history.append(
+            {"role": "user", "content": [{"toolResult": {"content": [{"text": str(i + 2)}]}}]}
+        )
+        offset += 20
+
+    span_id += 1
+    spans.append(
+        make_span(
+            "Model invoke",
+            trace_id,
+            span_id,
+            offset,
+            offset + 10,
+            parent_id=root_id,
+            attributes={
+                "gen_ai.prompt": json.dumps(history),
+                "gen_ai.completion": json.dumps([{"text": "The answer is 4."}]),
+                "gen_ai.request.model": "us.anthropic.claude-3-5-haiku-20241022-v1:0",
+                "gen_ai.usage.prompt_tokens": 150,
+                "gen_ai.usage.completion_tokens": 10,
+            },
+        )
+    )
+    spans.append(
+        make_span("invoke_agent", trace_id, root_id, 0, offset + 11)
+    )
+    return spans
+
+
+def crewai_trace(
+    trace_id: int, question: str = "What is Trignometry?", searches: int = 1
+) -> List[ReadableSpan]:
+    """
+    Build the spans of a CrewAI agent that searches ``searches`` times before
+    answering: ``2 * searches + 2`` spans, the root returned last as exporters do.
+    """
+    root_id = trace_id * 100_000 + 1
+    prompt = (
+        "system: You are Writer.\nuser: \nCurrent Task: "
+        f"{question}\n\nThis is the expected criteria for your final answer: A haiku."
+    )
+    spans = []
+    span_id = root_id
+    offset = 1
+
+    def chat(completion: str, attributes: dict) -> ReadableSpan:
+        events = [
+            Event(
+                "gen_ai.content.completion",
+                {"gen_ai.completion": completion},
+                timestamp=BASE_TIME + (offset + 9) * 1_000_000,
+            )
+        ]
+        if not spans:
+            events.insert(
+                0,
+                Event(
+                    "gen_ai.content.prompt",
+                    {"gen_ai.prompt": prompt},
+                    timestamp=BASE_TIME + offset * 1_000_000,
+                ),
+            )
+        return make_span(
+            "chat bedrock/us.amazon.nova-pro-v1:0",
+            trace_id,
+            span_id,
+            offset,
+            offset + 9,
+            parent_id=root_id,
+            attributes=attributes,
+            events=events,
+        )
+
+    for i in range(searches):
+        query = "what is trigonometry" + (f" ({i + 1})" if i else "")
+        span_id += 1
+        spans.append(
+            chat(
+                "Thought: I should search.\n\n"
+                "Action: DuckDuckGoSearch\n"
+                f'Action Input: {{"search_query": "{query}"}}\n\n'
+                "Observation:",
+                {
+                    "gen_ai.operation.name": "chat",
+                    "gen_ai.request.model": "us.amazon.nova-pro-v1:0",
+                    "gen_ai.usage.input_tokens": 200,
+                    "gen_ai.usage.output_tokens": 40,
+                },
+            )
+        )
+        span_id += 1
+        spans.append(
+            make_span(
+                "Tool Usage",
+                trace_id,
+                span_id,
+                offset + 10,
+                offset + 14,
+                parent_id=root_id,
+                attributes={
+                    "gen_ai.agent.tools": "[{'name': 'DuckDuckGoSearch', 'description': 'Search'}]",
+                    "gen_ai.agent.tool_results": "[{'result': 'Trigonometry studies triangles.'}]",
+                },
+            )
+        )
+        offset += 15
+
+    span_id += 1
+    spans.append(
+        chat(
+            "Thought: I know the answer.\n\nFinal Answer: Triangles hold the key.",
+            {"gen_ai.operation.name": "chat"},
+        )
+    )
+    spans.append(
+        make_span(
+            "crewai.agent_execute_task",
+            trace_id,
+            root_id,
+            0,
+            offset + 10,
+            attributes={"gen_ai.operation.name": "agent"},
+        )
+    )
+    return spans
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes) -> list:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in (attributes or {}).items()]
+
+
+def to_otlp_json(spans: List[ReadableSpan]) -> dict:
+    """Encode spans as an OTLP JSON ExportTraceServiceRequest."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otlp_attributes({"service.name": "agent"})},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "tests"},
+                        "spans": [
+                            {
+                                "traceId": format(s.context.trace_id, "032x"),
+                                "spanId": format(s.context.span_id, "016x"),
+                                "parentSpanId": format(s.parent.span_id, "016x")
+                                if s.parent
+                                else "",
+                                "name": s.name,
+                                "kind": 1,
+                                "startTimeUnixNano": str(s.start_time),
+                                "endTimeUnixNano": str(s.end_time),
+                                "attributes": _otlp_attributes(s.attributes),
+                                "events": [
+                                    {
+                                        "timeUnixNano": str(e.timestamp),
+                                        "name": e.name,
+                                        "attributes": _otlp_attributes(e.attributes),
+                                    }
+                                    for e in s.events
+                                ],
+                            }
+                            for s in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
@@ -0,0 +1,99 @@
+"""
+Configurable stand-in metric shared by the tests.
+"""
+
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from flotorch_eval.agent_eval.core.schemas import MetricResult, Trajectory
+from flotorch_eval.agent_eval.metrics.base import BaseMetric, MetricConfig
+
+
+class StubMetric(BaseMetric):
+    """
+    Stand-in for a real metric: waits, optionally fails, then scores.
+
+    Records the trajectories it was computed on and how many computations were in
+    flight at once, per instance and across every instance in ``StubMetric.active``
+    and ``StubMetric.peak``.
+    """
+
+    active = 0
+    peak = 0
+
+    def __init__(
+        self,
+        metric_name: str = "stub",
+        score: Union[float, Callable[[Trajectory], Any]] = 1.0,
+        delay: float = 0.0,
+        error: str = "",
+        errors: Iterable[BaseException] = (),
+        fail_on: Iterable[str] = (),
+        details: Optional[Dict[str, Any]] = None,
+        llm: Any = None,
+        metric_params: Optional[Dict[str, Any]] = None,
+        requires_llm: bool = False,
+        cacheable: bool = False,
+    ):
+        """
+        Create the metric.
+
+        Args:
+            metric_name: Name of the metric
+            score: The score, or a function of the trajectory returning it or an
+                awaitable of it
+            delay: Seconds to wait before scoring
+            error: Message of a ``RuntimeError`` raised by every computation
+            errors: Exceptions raised, in order, by the first computations
+            fail_on: Trace ids of the trajectories the metric fails on
+            details: Details of every result
+            llm: Judge model of the metric
+            metric_params: Parameters of the metric's config
+            requires_llm: Whether the metric is limited as a judge-backed one
+            cacheable: Whether its results may be cached
+        """
+        self.metric_name = metric_name
+        self.score = score
+        self.delay = delay
+        self.error = error
+        self.errors: List[BaseException] = list(errors)
+        self.fail_on = set(fail_on)
+        self.details = details or {}
+        self.requires_llm = requires_llm
+        self.cacheable = cacheable
+        self.calls = 0
+        self.seen: List[str] = []
+        self.metric_active = 0
+        self.metric_peak = 0
+        super().__init__(llm=llm, config=MetricConfig(metric_params=metric_params or {}))
+
+    @property
+    def name(self) -> str:
+        return self.metric_name
+
+    def _setup(self) -> None:
+        pass
+
+    async def compute(self, trajectory: Trajectory) -> MetricResult:
+        self.calls += 1
+        self.seen.append(trajectory.trace_id)
+        StubMetric.active += 1
+        StubMetric.peak = max(StubMetric.peak, StubMetric.active)
+        self.metric_active += 1
+        self.metric_peak = max(self.metric_peak, self.metric_active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.errors:
+                raise self.errors.pop(0)
+            if self.error:
+                raise RuntimeError(self.error)
+            if trajectory.trace_id in self.fail_on:
+                raise RuntimeError("judge unavailable")
+            score = self.score(trajectory) if callable(self.score) else self.score
+            if inspect.isawaitable(score):
+                score = await score
+            return MetricResult(name=self.name, score=float(score), details=dict(self.details))
+        finally:
+            StubMetric.active -= 1
+            self.metric_active -= 1
@@ -17,6 +17,17 @@ from unittest import TestCase, main
 from opentelemetry.trace import Span as OTelSpan
 from opentelemetry.trace import Status, StatusCode
 
+from flotorch_eval.agent_eval.core.react import parse_react_output
+from flotorch_eval.agent_eval.core.registry import SpanHandlerRegistry
+from flotorch_eval.common import json_utils
+from flotorch_eval.common.literal_utils import (
+    DEFAULT_MAX_LENGTH,
+    LiteralTooLargeError,
+    literal_cache,
+    parse_literal,
+)
+from tests.agent_eval.span_factory import crewai_trace, make_span, strands_trace
+
 
 class MockSpan:
     """Mock implementation of OTelSpan for testing"""
@@ -312,5 +323,305 @@ class TestTraceConverter(TestCase):
         )
 
 
+class TestTraceConverterBatch(TestCase):
+    def setUp(self):
+        self.converter = TraceConverter()
+        self.traces = [strands_trace(trace_id, tool_calls=trace_id) for trace_id in range(1, 6)]
+        # Interleave the traces the way a collector exports them
+        self.flat = [span for group in zip(*[t[-3:] for t in self.traces]) for span in group]
+        self.flat = [s for t in self.traces for s in t[:-3]] + self.flat
+
+    def assert_matches_single_trace_conversion(self, trajectories):
+        self.assertEqual(len(trajectories), len(self.traces))
+        for trajectory, spans in zip(trajectories, self.traces):
+            expected = self.converter.from_spans(spans)
+            self.assertEqual(trajectory.trace_id, expected.trace_id)
+            self.assertEqual(
+                [(m.role, m.content) for m in trajectory.messages],
+                [(m.role, m.content) for m in expected.messages],
+            )
+            self.assertEqual(len(trajectory.spans), len(spans))
+
+    def test_batch_in_process(self):
+        trajectories = self.converter.from_spans_batch(self.flat, max_workers=1)
+        self.assert_matches_single_trace_conversion(trajectories)
+
+    def test_batch_process_pool(self):
+        trajectories = self.converter.from_spans_batch(
+            self.flat, max_workers=2, chunksize=2
+        )
+        self.assert_matches_single_trace_conversion(trajectories)
+
+    def test_invalid_chunksize(self):
+        with self.assertRaises(ValueError):
+            self.converter.from_spans_batch(self.flat, chunksize=0)
+
+
+class TestToolOutputMatching(TestCase):
+    def setUp(self):
+        self.converter = TraceConverter()
+
+    def tool_calls(self, trajectory):
+        return [tc for m in trajectory.messages for tc in m.tool_calls]
+
+    def test_repeated_tool_calls_get_their_own_outputs(self):
+        trajectory = self.converter.from_spans(strands_trace(0x1, tool_calls=3))
+        self.assertEqual(
+            [(tc.id, tc.output) for tc in self.tool_calls(trajectory)],
+            [("tooluse_0", "2"), ("tooluse_1", "3"), ("tooluse_2", "4")],
+        )
+
+    def test_fifo_matching_without_tool_use_ids(self):
+        spans = strands_trace(0x2, tool_calls=3)
+        for span in spans:
+            span._attributes.pop("tool.id", None)
+
+        trajectory = self.converter.from_spans(spans)
+        self.assertEqual([tc.output for tc in self.tool_calls(trajectory)], ["2", "3", "4"])
+
+    def test_tool_use_id_takes_precedence_over_order(self):
+        builder = self.converter.new_builder("trace")
+        now = datetime.now()
+        calls = [
+            ToolCall(id=f"call_{i}", name="search", arguments={}, timestamp=now)
+            for i in range(3)
+        ]
+        builder.add_assistant_message("", calls, now)
+        builder.add_tool_message("search", "third", now, tool_use_id="call_2")
+        builder.add_tool_message("search", "first", now)
+        builder.add_tool_message("search", "second", now)
+        builder.add_tool_message("search", "unmatched", now)
+
+        self.assertEqual([c.output for c in calls], ["first", "second", "third"])
+        self.assertEqual(len(builder.build().messages), 5)
+
+
+class TestStrandsPromptDecoding(TestCase):
+    def test_only_leading_prompt_element_is_decoded(self):
+        self.assertEqual(
+            json_utils.loads_first_element(' [ {"role": "user"}, {"trailing": '),
+            {"role": "user"},
+        )
+        self.assertIsNone(json_utils.loads_first_element("[ ]"))
+        with self.assertRaises(json_utils.JSONDecodeError):
+            json_utils.loads_first_element('{"role": "user"}')
+
+    def test_prompt_ignored_once_user_turn_is_known(self):
+        spans = strands_trace(0x1, tool_calls=2)
+        # Later prompts are never decoded, so corrupting them changes nothing
+        spans[2]._attributes["gen_ai.prompt"] = "[not json"
+        trajectory = TraceConverter().from_spans(spans)
+
+        self.assertEqual(trajectory.messages[0].role, "user")
+        self.assertEqual(trajectory.messages[0].content, "What is 2 + 2?")
+        self.assertEqual(sum(m.role == "user" for m in trajectory.messages), 1)
+
+
+class TestReActParsing(TestCase):
+    def setUp(self):
+        self.converter = TraceConverter()
+
+    def test_multiple_actions_in_one_completion(self):
+        output = parse_react_output(
+            "Thought: two lookups\n"
+            'Action: search\nAction Input: {"q": "a"}\nObservation: A\n'
+            'Action: search\nAction Input: "b"\nObservation:'
+        )
+        self.assertEqual(output.thought, "two lookups")
+        self.assertEqual(output.actions, [("search", '{"q": "a"}'), ("search", '"b"')])
+        self.assertIsNone(output.final_answer)
+
+        tool_calls, thought = self.converter._parse_assistant_output(
+            "Thought: t\nAction: search\nAction Input: {\"q\": \"a\"}\n"
+            "Action: fetch\nAction Input: plain text",
+            datetime.now(),
+        )
+        self.assertEqual(thought, "t")
+        self.assertEqual(
+            [(tc.name, tc.arguments) for tc in tool_calls],
+            [("search", {"q": "a"}), ("fetch", {"input": "plain text"})],
+        )
+
+    def test_final_answer_is_the_rest_of_its_line(self):
+        tool_calls, answer = self.converter._parse_assistant_output(
+            "Thought: done\n\nFinal Answer: Triangles. Action: none\nAngles and sides",
+            datetime.now(),
+        )
+        self.assertEqual(tool_calls, [])
+        self.assertEqual(answer, "Triangles. Action: none")
+
+        _, answer = self.converter._parse_assistant_output(
+            "Thought: done\n\nFinal Answer: \nIn triangle's grace,\nAngles and sides entwine",
+            datetime.now(),
+        )
+        self.assertEqual(answer, "")
+
+    def test_current_task_extraction(self):
+        self.assertEqual(
+            self.converter._extract_user_content_from_prompt(
+                "system: s\nuser: \nCurrent Task:   Explain sines\n\n"
+                "This is the expected criteria for your final answer: short"
+            ),
+            "Explain sines",
+        )
+
+
+class TestCrewAIToolAttributes(TestCase):
+    def setUp(self):
+        literal_cache.clear()
+
+    def test_tool_definitions_parsed_once(self):
+        converter = TraceConverter()
+        for trace_id in range(1, 4):
+            trajectory = converter.from_spans(crewai_trace(trace_id))
+            self.assertEqual(
+                trajectory.messages[1].tool_calls[0].output,
+                "Trigonometry studies triangles.",
+            )
+
+        self.assertEqual(literal_cache.misses, 1)
+        self.assertEqual(literal_cache.hits, 2)
+
+    def test_oversized_and_deep_values_rejected(self):
+        with self.assertRaises(LiteralTooLargeError):
+            parse_literal("[" + "'x', " * 100 + "]", max_length=50)
+        with self.assertRaises(LiteralTooLargeError):
+            parse_literal("[" * 100 + "]" * 100)
+        # Brackets inside strings do not count towards the nesting depth
+        self.assertEqual(parse_literal("['" + "[" * 100 + "']"), ["[" * 100])
+
+    def test_oversized_tool_results_are_skipped(self):
+        spans = crewai_trace(0x5)
+        spans[1]._attributes["gen_ai.agent.tool_results"] = "[{'result': '%s'}]" % (
+            "x" * (DEFAULT_MAX_LENGTH + 1)
+        )
+        trajectory = TraceConverter().from_spans(spans)
+        self.assertEqual([m.role for m in trajectory.messages], ["user", "assistant", "assistant"])
+
+
+def _handle_langgraph_node(converter, builder, span):
+    builder.add_assistant_message(span.attributes["output"], [], span.start_time)
+
+
+class TestNanosecondTimestamps(TestCase):
+    def test_span_keeps_nanoseconds(self):
+        span = make_span("Tool: calc", 0x5, 2, 0, 1, parent_id=1)
+        converted = TraceConverter().convert_span(span)
+
+        self.assertEqual(converted.start_time_unix_nano, span.start_time)
+        self.assertEqual(converted.end_time_unix_nano, span.end_time)
+        self.assertEqual(converted.duration_ns, 1_000_000)
+        self.assertEqual(
+            converted.start_time, datetime.fromtimestamp(span.start_time // 10**9).replace(
+                microsecond=span.start_time % 10**9 // 1000
+            )
+        )
+
+    def test_datetime_views_round_trip(self):
+        start = datetime(2025, 6, 6, 12, 0, 0, 123456)
+        span = Span(
+            span_id="1",
+            trace_id="1",
+            name="root",
+            start_time=start,
+            end_time=start,
+            events=[SpanEvent(name="e", timestamp=start)],
+        )
+
+        self.assertEqual(span.start_time, start)
+        self.assertEqual(span.events[0].timestamp, start)
+        self.assertEqual(Span(**span.model_dump()), span)
+        self.assertEqual(
+            span.start_time_unix_nano,
+            int(start.astimezone(timezone.utc).timestamp() * 10**6) * 1000,
+        )
+
+    def test_loads_previously_serialized_trajectory(self):
+        # Trajectory JSON as written before times were kept in nanoseconds
+        legacy = json.dumps(
+            {
+                "trace_id": "t1",
+                "messages": [
+                    {"role": "user", "content": "hi", "tool_calls": [],
+                     "timestamp": "2025-06-06T12:00:00.123456"}
+                ],
+                "spans": [
+                    {
+                        "span_id": "1",
+                        "trace_id": "t1",
+                        "parent_id": None,
+                        "name": "root",
+                        "start_time": "2025-06-06T12:00:00.123456",
+                        "end_time": "2025-06-06T12:00:01Z",
+                        "attributes": {"k": "v"},
+                        "events": [
+                            {"name": "e", "timestamp": "2025-06-06T12:00:00.5", "attributes": {}}
+                        ],
+                    }
+                ],
+            }
+        )
+
+        trajectory = Trajectory.model_validate_json(legacy)
+
+        span = trajectory.spans[0]
+        self.assertEqual(span.start_time, datetime(2025, 6, 6, 12, 0, 0, 123456))
+        self.assertEqual(
+            span.end_time_unix_nano,
+            int(datetime(2025, 6, 6, 12, 0, 1, tzinfo=timezone.utc).timestamp()) * 10**9,
+        )
+        self.assertEqual(span.events[0].timestamp, datetime(2025, 6, 6, 12, 0, 0, 500000))
+        self.assertEqual(Trajectory.model_validate_json(trajectory.model_dump_json()), trajectory)
+
+
+class TestSpanHandlerRegistry(TestCase):
+    def test_frameworks_filter(self):
+        crewai_only = TraceConverter(frameworks=["crewai"])
+        self.assertEqual(crewai_only.from_spans(strands_trace(0x1)).messages, [])
+        self.assertEqual(len(crewai_only.from_spans(crewai_trace(0x2)).messages), 4)
+
+    def test_custom_framework_and_unrelated_spans(self):
+        registry = SpanHandlerRegistry()
+        registry.register(
+            "langgraph", _handle_langgraph_node, operation_names=["invoke_node"]
+        )
+        converter = TraceConverter(registry=registry)
+        spans = [
+            make_span("HTTP GET", 0x3, 2, 0, 1, parent_id=1),
+            make_span(
+                "agent",
+                0x3,
+                3,
+                1,
+                2,
+                parent_id=1,
+                attributes={"gen_ai.operation.name": "invoke_node", "output": "done"},
+            ),
+        ]
+
+        trajectory = converter.from_spans(spans)
+        self.assertEqual([m.content for m in trajectory.messages], ["done"])
+        self.assertEqual(registry.frameworks, ["langgraph"])
+
+    def test_registration_order_breaks_ties(self):
+        index = TraceConverter().registry.build_index()
+        tool_span = TraceConverter().convert_span(
+            make_span(
+                "Tool Usage",
+                0x4,
+                2,
+                0,
+                1,
+                attributes={"gen_ai.operation.name": "chat"},
+            )
+        )
+        self.assertEqual(index.resolve(tool_span).framework, "crewai")
+        self.assertEqual(index.resolve(tool_span).handler.__name__, "_handle_crewai_chat_span")
+
+    def test_handler_requires_selector(self):
+        with self.assertRaises(ValueError):
+            SpanHandlerRegistry().register("empty", _handle_langgraph_node)
+
+
 if __name__ == "__main__":
     main()
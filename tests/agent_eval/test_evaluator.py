@@ -0,0 +1,401 @@
+"""
+Tests for the Evaluator.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.evaluator import Evaluator
+from flotorch_eval.agent_eval.core.gates import Gate
+from flotorch_eval.agent_eval.core.journal import RunJournal
+from flotorch_eval.agent_eval.core.result_cache import MetricResultCache, trajectory_fingerprint
+from flotorch_eval.agent_eval.core.retry import RetryPolicy, is_transient_error
+from flotorch_eval.agent_eval.core.schemas import MetricResult, Trajectory
+from flotorch_eval.agent_eval.metrics.base import BaseMetric, MetricConfig
+from flotorch_eval.agent_eval.metrics.latency_metrics import LatencyMetric
+from tests.agent_eval.span_factory import strands_trace
+from tests.agent_eval.stub_metric import StubMetric
+
+
+class PidMetric(BaseMetric):
+    """CPU-bound metric that reports the process it ran in."""
+
+    cpu_bound = True
+
+    @property
+    def name(self) -> str:
+        return "pid"
+
+    def _setup(self) -> None:
+        if self.config.metric_params.get("fail_setup"):
+            raise ValueError("bad config")
+
+    async def compute(self, trajectory: Trajectory) -> MetricResult:
+        return MetricResult(name=self.name, score=float(os.getpid()), details={})
+
+
+class TestConcurrentEvaluate(IsolatedAsyncioTestCase):
+    def setUp(self):
+        StubMetric.active = StubMetric.peak = 0
+        self.trajectory = TraceConverter().from_spans(strands_trace(0x1))
+
+    async def test_metrics_run_concurrently_in_order(self):
+        metrics = [StubMetric(f"m{i}", delay=0.1 - i * 0.02) for i in range(4)]
+        loop = asyncio.get_running_loop()
+
+        start = loop.time()
+        result = await Evaluator(metrics).evaluate(self.trajectory)
+        elapsed = loop.time() - start
+
+        self.assertEqual([score.name for score in result.scores], ["m0", "m1", "m2", "m3"])
+        self.assertEqual(StubMetric.peak, 4)
+        self.assertLess(elapsed, 0.25)
+
+    async def test_failure_is_isolated(self):
+        metrics = [StubMetric("ok", delay=0.05), StubMetric("broken", delay=0.01, error="boom")]
+
+        result = await Evaluator(metrics).evaluate(self.trajectory)
+
+        ok, broken = result.scores
+        self.assertEqual((ok.name, ok.score), ("ok", 1.0))
+        self.assertEqual((broken.name, broken.score), ("broken", 0.0))
+        self.assertEqual(broken.details["error"], "boom")
+
+    async def test_concurrency_limits(self):
+        judge = StubMetric("judge", delay=0.02)
+        local = StubMetric("local", delay=0.02)
+        evaluator = Evaluator([judge, local], max_concurrency=3, metric_concurrency={"judge": 1})
+
+        await asyncio.gather(*(evaluator.evaluate(self.trajectory) for _ in range(5)))
+
+        self.assertEqual(judge.metric_peak, 1)
+        self.assertGreater(local.metric_peak, 1)
+        self.assertEqual(StubMetric.peak, 3)
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            Evaluator(max_concurrency=0)
+        with self.assertRaises(ValueError):
+            Evaluator(metric_concurrency={"judge": 0})
+
+
+class TestEvaluateMany(IsolatedAsyncioTestCase):
+    def setUp(self):
+        StubMetric.active = StubMetric.peak = 0
+        converter = TraceConverter()
+        self.trajectories = [converter.from_spans(strands_trace(i)) for i in range(1, 9)]
+        self.pulled = 0
+
+    def source(self):
+        for trajectory in self.trajectories:
+            self.pulled += 1
+            yield trajectory
+
+    async def async_source(self):
+        for trajectory in self.source():
+            await asyncio.sleep(0)
+            yield trajectory
+
+    async def test_bounded_and_complete(self):
+        evaluator = Evaluator([StubMetric("m", delay=0.01)])
+
+        ids = []
+        async for result in evaluator.evaluate_many(self.source(), concurrency=3):
+            ids.append(result.trajectory_id)
+            # Never more than ``concurrency`` trajectories pulled ahead of the consumer
+            self.assertLessEqual(self.pulled - len(ids), 3)
+
+        self.assertEqual(sorted(ids), sorted(t.trace_id for t in self.trajectories))
+        self.assertEqual(StubMetric.peak, 3)
+
+    async def test_ordered_async_source(self):
+        class ReverseDelayMetric(StubMetric):
+            async def compute(self, trajectory):
+                self.delay = 0.04 if trajectory.trace_id.endswith("1") else 0.0
+                return await super().compute(trajectory)
+
+        evaluator = Evaluator([ReverseDelayMetric("m")])
+        results = [
+            result.trajectory_id
+            async for result in evaluator.evaluate_many(
+                self.async_source(), concurrency=4, ordered=True
+            )
+        ]
+
+        self.assertEqual(results, [t.trace_id for t in self.trajectories])
+
+    async def test_early_exit_cancels_in_flight(self):
+        evaluator = Evaluator([StubMetric("m", delay=0.05)])
+        results = evaluator.evaluate_many(self.source(), concurrency=2)
+
+        await results.__anext__()
+        await results.aclose()
+        await asyncio.sleep(0)
+
+        self.assertEqual(StubMetric.active, 0)
+        self.assertLess(self.pulled, len(self.trajectories))
+
+
+class TestCPUBoundOffload(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.trajectory = TraceConverter().from_spans(strands_trace(0x1, tool_calls=2))
+
+    async def test_offloaded_to_process_pool(self):
+        evaluator = Evaluator(
+            [PidMetric(), StubMetric("judge", delay=0.01), LatencyMetric()], cpu_workers=2
+        )
+        try:
+            results = [await evaluator.evaluate(self.trajectory) for _ in range(3)]
+        finally:
+            evaluator.close()
+
+        inline = (await Evaluator([LatencyMetric()]).evaluate(self.trajectory)).scores[0]
+        self.assertEqual(inline.status, "success")
+        root = inline.details["latency_breakdown"][0]
+        self.assertEqual(root["step_name"], "invoke_agent")
+        self.assertEqual(len(root["children"]), 5)
+        for result in results:
+            pid, judge, latency = result.scores
+            self.assertNotEqual(pid.score, float(os.getpid()))
+            self.assertEqual(judge.score, 1.0)
+            self.assertEqual(latency.status, "success")
+            self.assertEqual(latency.details, inline.details)
+
+    async def test_inline_without_workers(self):
+        result = await Evaluator([PidMetric()]).evaluate(self.trajectory)
+        self.assertEqual(result.scores[0].score, float(os.getpid()))
+
+    async def test_worker_failure_is_isolated(self):
+        broken = PidMetric()
+        broken.config = MetricConfig(metric_params={"fail_setup": True})
+        evaluator = Evaluator([broken, StubMetric("judge", delay=0.01)], cpu_workers=1)
+        try:
+            failed, judge = (await evaluator.evaluate(self.trajectory)).scores
+        finally:
+            evaluator.close()
+
+        self.assertEqual(failed.details["error"], "bad config")
+        self.assertEqual(judge.score, 1.0)
+
+
+class ThrottlingException(Exception):
+    """Mimics the error raised by a throttled judge client."""
+
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, initial_backoff=0.001, max_backoff=0.002)
+
+
+class TestTimeoutsAndRetries(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.trajectory = TraceConverter().from_spans(strands_trace(0x1))
+
+    async def test_retries_transient_errors(self):
+        metric = StubMetric(
+            "flaky", score=0.5, errors=[ThrottlingException("slow down"), ConnectionError("reset")]
+        )
+
+        result = await Evaluator([metric], retry_policy=FAST_RETRIES).evaluate(self.trajectory)
+
+        self.assertEqual((result.scores[0].status, result.scores[0].score), ("success", 0.5))
+        self.assertEqual(metric.calls, 3)
+
+    async def test_gives_up_after_max_attempts(self):
+        metric = StubMetric(
+            "flaky", score=0.5, errors=[ThrottlingException(str(i)) for i in range(5)]
+        )
+
+        result = await Evaluator([metric], retry_policy=FAST_RETRIES).evaluate(self.trajectory)
+
+        self.assertEqual(result.scores[0].status, "failed")
+        self.assertEqual(result.scores[0].details, {"error": "2", "attempts": 3})
+
+    async def test_does_not_retry_permanent_errors(self):
+        metric = StubMetric("flaky", score=0.5, errors=[ValueError("bad prompt")])
+
+        result = await Evaluator([metric], retry_policy=FAST_RETRIES).evaluate(self.trajectory)
+
+        self.assertEqual(result.scores[0].status, "failed")
+        self.assertEqual(metric.calls, 1)
+
+    async def test_deadline_cancels_slow_metric(self):
+        slow = StubMetric("slow", delay=5)
+        evaluator = Evaluator(
+            [slow, StubMetric("fast", delay=0.01)], timeout=1, metric_timeouts={"slow": 0.05}
+        )
+
+        started = asyncio.get_running_loop().time()
+        slow_result, fast_result = (await evaluator.evaluate(self.trajectory)).scores
+
+        self.assertLess(asyncio.get_running_loop().time() - started, 1)
+        self.assertEqual(slow_result.status, "timed_out")
+        self.assertEqual(fast_result.status, "success")
+        self.assertEqual(slow.metric_active, 0)
+
+
+class TestRetryPolicy(TestCase):
+    def test_backoff_is_bounded_and_jittered(self):
+        policy = RetryPolicy(initial_backoff=1, max_backoff=3, multiplier=2)
+        delays = [policy.backoff(3) for _ in range(50)]
+
+        self.assertTrue(all(0 <= delay <= 3 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+        self.assertEqual(RetryPolicy(initial_backoff=1, jitter=False).backoff(2), 2)
+
+    def test_transient_error_classification(self):
+        class APIStatusError(Exception):
+            status_code = 503
+
+        class ClientError(Exception):
+            response = {"Error": {"Code": "TooManyRequestsException"}}
+
+        self.assertTrue(is_transient_error(asyncio.TimeoutError()))
+        self.assertTrue(is_transient_error(APIStatusError()))
+        self.assertTrue(is_transient_error(ClientError()))
+        self.assertTrue(is_transient_error(ThrottlingException()))
+        self.assertFalse(is_transient_error(ValueError("bad prompt")))
+
+
+def judge_metric(metric_params=None, error: str = "") -> StubMetric:
+    """Cacheable stand-in for an LLM judge."""
+    return StubMetric("judge", error=error, metric_params=metric_params, cacheable=True)
+
+
+class TestMetricResultCache(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = MetricResultCache(os.path.join(self.tmp.name, "results.sqlite"))
+        converter = TraceConverter()
+        self.trajectory = converter.from_spans(strands_trace(0x1))
+        # Same conversation, different trace id and timestamps
+        self.rerun = converter.from_spans(strands_trace(0x2))
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    async def test_reuses_results_across_runs(self):
+        judge = judge_metric()
+        uncached = StubMetric("local", delay=0)
+
+        first = await Evaluator([judge, uncached], result_cache=self.cache).evaluate(self.trajectory)
+        second = await Evaluator([judge, uncached], result_cache=self.cache).evaluate(self.rerun)
+
+        self.assertEqual(judge.calls, 1)
+        self.assertEqual([r.name for r in second.scores], ["judge", "local"])
+        self.assertEqual(second.scores[0], first.scores[0])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    async def test_key_covers_params_and_failures_are_not_cached(self):
+        await Evaluator([judge_metric({"k": 1})], result_cache=self.cache).evaluate(
+            self.trajectory
+        )
+        other_params = judge_metric({"k": 2})
+        await Evaluator([other_params], result_cache=self.cache).evaluate(self.trajectory)
+        self.assertEqual(other_params.calls, 1)
+
+        failing = judge_metric({"k": 3}, error="boom")
+        evaluator = Evaluator([failing], result_cache=self.cache)
+        await evaluator.evaluate(self.trajectory)
+        await evaluator.evaluate(self.trajectory)
+        self.assertEqual(failing.calls, 2)
+
+    async def test_cache_io_runs_off_the_event_loop(self):
+        threads = []
+        get, set_ = self.cache.get, self.cache.set
+        self.cache.get = lambda *args: threads.append(threading.get_ident()) or get(*args)
+        self.cache.set = lambda *args: threads.append(threading.get_ident()) or set_(*args)
+        evaluator = Evaluator([judge_metric()], result_cache=self.cache)
+
+        await evaluator.evaluate(self.trajectory)
+        await evaluator.evaluate(self.trajectory)
+
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_fingerprint_ignores_timestamps_but_not_content(self):
+        other = TraceConverter().from_spans(strands_trace(0x3, question="What is 3 + 3?"))
+
+        self.assertEqual(trajectory_fingerprint(self.trajectory), trajectory_fingerprint(self.rerun))
+        self.assertNotEqual(trajectory_fingerprint(self.trajectory), trajectory_fingerprint(other))
+
+
+class TestGates(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.trajectory = TraceConverter().from_spans(strands_trace(0x1))
+
+    async def test_judge_runs_only_when_gates_pass(self):
+        strict = StubMetric("strict_match", score=0.0)
+        tools = StubMetric("tool_accuracy", score=0.8)
+        judge = judge_metric()
+        evaluator = Evaluator(
+            [judge, strict, tools],
+            gates={"judge": ["strict_match", Gate("tool_accuracy", min_score=0.5)]},
+        )
+
+        skipped = (await evaluator.evaluate(self.trajectory)).scores[0]
+        strict.score = 1.0
+        computed = (await evaluator.evaluate(self.trajectory)).scores[0]
+
+        self.assertEqual(
+            (skipped.status, skipped.details), ("skipped", {"reason": "strict_match scored 0, below 1"})
+        )
+        self.assertEqual(computed.status, "success")
+        self.assertEqual(judge.calls, 1)
+
+    async def test_chained_and_failed_gates(self):
+        check = StubMetric("check", score=1.0, error="broken")
+        middle = StubMetric("middle", score=1.0)
+        judge = judge_metric()
+        evaluator = Evaluator(
+            [check, middle, judge],
+            gates={
+                "middle": "check",
+                "judge": Gate("middle", predicate=lambda result: result.score > 0),
+            },
+        )
+
+        scores = (await evaluator.evaluate(self.trajectory)).scores
+
+        self.assertEqual([r.status for r in scores], ["failed", "skipped", "skipped"])
+        self.assertEqual(scores[1].details["reason"], "gate metric check has status failed")
+        self.assertEqual((middle.calls, judge.calls), (0, 0))
+
+    async def test_invalid_gates(self):
+        with self.assertRaisesRegex(ValueError, "cycle: a -> b -> a"):
+            Evaluator(gates={"a": "b", "b": ["a"]})
+
+        evaluator = Evaluator([judge_metric()], gates={"judge": "strict_match"})
+        with self.assertRaisesRegex(ValueError, "not being evaluated"):
+            await evaluator.evaluate(self.trajectory)
+
+    async def test_journaled_gate_results_are_reused(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "journal.jsonl")
+            strict = StubMetric("strict_match", score=1.0)
+            gates = {"judge": "strict_match"}
+            with RunJournal(path) as journal:
+                failing = judge_metric(error="judge down")
+                async for _ in Evaluator([strict, failing], gates=gates).evaluate_many(
+                    [self.trajectory], journal=journal
+                ):
+                    pass
+
+            judge = judge_metric()
+            with RunJournal(path) as journal:
+                results = [
+                    result
+                    async for result in Evaluator([strict, judge], gates=gates).evaluate_many(
+                        [self.trajectory], journal=journal
+                    )
+                ]
+
+        self.assertEqual((strict.calls, judge.calls), (1, 1))
+        self.assertEqual([r.status for r in results[0].scores], ["success", "success"])
+
+
+if __name__ == "__main__":
+    main()
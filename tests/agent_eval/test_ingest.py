@@ -0,0 +1,248 @@
+"""
+Tests for trace ingestion from exported OTLP data.
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import os
+import tempfile
+import zlib
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from google.protobuf import json_format
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+)
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.evaluator import Evaluator
+from flotorch_eval.agent_eval.ingest.otlp_json import OTLPJsonReader, decode_otlp_id
+from flotorch_eval.agent_eval.ingest.receiver import OTLPReceiver
+from flotorch_eval.common import telemetry
+
+from tests.agent_eval.span_factory import crewai_trace, strands_trace, to_otlp_json
+from tests.agent_eval.stub_metric import StubMetric
+
+
+def messages(trajectory):
+    return [(m.role, m.content) for m in trajectory.messages]
+
+
+class TestOTLPJsonReader(TestCase):
+    def setUp(self):
+        self.traces = [strands_trace(1, tool_calls=2), crewai_trace(2), strands_trace(3)]
+        fd, self.path = tempfile.mkstemp(suffix=".jsonl")
+        with os.fdopen(fd, "w") as f:
+            # Export batches interleave traces, as a BatchSpanProcessor would
+            for i in range(0, 8, 2):
+                batch = [s for trace in self.traces for s in trace[i : i + 2]]
+                if batch:
+                    f.write(json.dumps(to_otlp_json(batch)) + "\n")
+            f.write("\n")
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_iter_trajectories_matches_sdk_conversion(self):
+        converter = TraceConverter()
+        expected = {
+            t.trace_id: t for t in (converter.from_spans(spans) for spans in self.traces)
+        }
+
+        trajectories = list(OTLPJsonReader(self.path).iter_trajectories())
+
+        self.assertEqual(sorted(t.trace_id for t in trajectories), sorted(expected))
+        for trajectory in trajectories:
+            reference = expected[trajectory.trace_id]
+            self.assertEqual(messages(trajectory), messages(reference))
+            self.assertEqual(
+                [(s.span_id, s.parent_id, s.start_time) for s in trajectory.spans],
+                [(s.span_id, s.parent_id, s.start_time) for s in reference.spans],
+            )
+
+    def test_read_single_trace_through_index(self):
+        reader = OTLPJsonReader(self.path)
+        index = reader.build_index()
+        crewai_id = format(2, "032x")
+
+        self.assertEqual(len(index), 3)
+        trajectory = reader.read_trace(crewai_id)
+        self.assertEqual(
+            messages(trajectory), messages(TraceConverter().from_spans(self.traces[1]))
+        )
+
+    def test_empty_file(self):
+        open(self.path, "w").close()
+        self.assertEqual(list(OTLPJsonReader(self.path).iter_trajectories()), [])
+
+    def test_decode_ids(self):
+        self.assertEqual(decode_otlp_id("00000000000000ff"), 255)
+        self.assertEqual(decode_otlp_id(base64.b64encode(bytes([0] * 7 + [255])).decode()), 255)
+        self.assertIsNone(decode_otlp_id(""))
+        self.assertIsNone(decode_otlp_id("0" * 16))
+        self.assertIsNone(decode_otlp_id(base64.b64encode(bytes(8)).decode()))
+
+
+def message_count_metric(delay: float = 0.0) -> StubMetric:
+    return StubMetric(
+        "message_count", score=lambda trajectory: len(trajectory.messages), delay=delay
+    )
+
+
+async def post(port, body, content_type="application/json", encoding=None):
+    """Minimal OTLP/HTTP client standing in for an agent's exporter."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    headers = [
+        "POST /v1/traces HTTP/1.1",
+        "Host: localhost",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        "Connection: close",
+    ]
+    if encoding:
+        headers.append(f"Content-Encoding: {encoding}")
+    writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    status_line, _, rest = response.partition(b"\r\n")
+    return int(status_line.split()[1]), rest
+
+
+def to_protobuf(spans):
+    request = to_otlp_json(spans)
+    for resource_spans in request["resourceSpans"]:
+        for scope_spans in resource_spans["scopeSpans"]:
+            for span in scope_spans["spans"]:
+                for key in ("traceId", "spanId", "parentSpanId"):
+                    span[key] = base64.b64encode(bytes.fromhex(span[key])).decode()
+    return json_format.Parse(json.dumps(request), ExportTraceServiceRequest()).SerializeToString()
+
+
+class TestOTLPReceiver(IsolatedAsyncioTestCase):
+    async def test_load_from_stand_in_agents(self):
+        results = []
+        receiver = OTLPReceiver(
+            Evaluator([message_count_metric()]), port=0, on_result=results.append, workers=4
+        )
+        traces = [strands_trace(i, tool_calls=i % 3 + 1) for i in range(1, 41)]
+
+        async def agent(spans, i):
+            # Each agent exports its spans in two batches, like a BatchSpanProcessor
+            half = len(spans) // 2
+            for batch in (spans[:half], spans[half:]):
+                if i % 3 == 0:
+                    status, _ = await post(receiver.port, to_protobuf(batch), "application/x-protobuf")
+                else:
+                    body = json.dumps(to_otlp_json(batch)).encode()
+                    status, _ = await post(
+                        receiver.port,
+                        gzip.compress(body) if i % 2 else body,
+                        encoding="gzip" if i % 2 else None,
+                    )
+                self.assertEqual(status, 200)
+
+        async with receiver:
+            await asyncio.gather(*(agent(spans, i) for i, spans in enumerate(traces)))
+
+        self.assertEqual(len(results), len(traces))
+        self.assertEqual(receiver.spans_received, sum(len(t) for t in traces))
+        expected = {
+            format(i, "032x"): len(TraceConverter().from_spans(t).messages)
+            for i, t in enumerate(traces, start=1)
+        }
+        self.assertEqual({r.trajectory_id: r.scores[0].score for r in results}, expected)
+
+    async def test_backpressure_rejects_when_queue_full(self):
+        receiver = OTLPReceiver(
+            Evaluator([message_count_metric(delay=0.2)]), port=0, max_pending=1, workers=1
+        )
+
+        async with receiver:
+            statuses = []
+            for i in range(1, 6):
+                body = json.dumps(to_otlp_json(strands_trace(i))).encode()
+                status, response = await post(receiver.port, body)
+                statuses.append(status)
+
+        self.assertIn(503, statuses)
+        self.assertEqual(statuses[0], 200)
+        self.assertEqual(receiver.requests_rejected, statuses.count(503))
+
+    async def test_queue_depth_gauge(self):
+        reader = InMemoryMetricReader()
+        telemetry.enable_instrumentation(meter_provider=MeterProvider(metric_readers=[reader]))
+        self.addCleanup(telemetry.disable_instrumentation)
+
+
+        def depths():
+            data = reader.get_metrics_data()
+            return [
+                (point.attributes["port"], point.value)
+                for resource_metrics in (data.resource_metrics if data else [])
+                for scope_metrics in resource_metrics.scope_metrics
+                for metric in scope_metrics.metrics
+                if metric.name == telemetry.RECEIVER_QUEUE_DEPTH
+                for point in metric.data.data_points
+            ]
+
+        receiver = OTLPReceiver(
+            Evaluator([message_count_metric(delay=0.2)]), port=0, workers=1
+        )
+        async with receiver:
+            for i in (1, 2, 3):
+                await post(receiver.port, json.dumps(to_otlp_json(strands_trace(i))).encode())
+            # The worker is busy with the first trajectory
+            self.assertEqual(depths(), [(receiver.port, 2)])
+        self.assertEqual(depths(), [])
+
+    async def test_rejects_unknown_routes_and_media_types(self):
+        async with OTLPReceiver(Evaluator([message_count_metric()]), port=0) as receiver:
+            status, _ = await post(receiver.port, b"{}", "text/plain")
+            self.assertEqual(status, 415)
+            status, _ = await post(receiver.port, b"not json")
+            self.assertEqual(status, 400)
+
+    async def test_rejects_malformed_and_oversized_bodies(self):
+        receiver = OTLPReceiver(Evaluator([message_count_metric()]), port=0, max_body_size=64 * 1024)
+        async with receiver:
+            reader, writer = await asyncio.open_connection("127.0.0.1", receiver.port)
+            writer.write(
+                b"POST /v1/traces HTTP/1.1\r\nContent-Type: application/json\r\n"
+                b"Content-Length: ten\r\n\r\n"
+            )
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            self.assertTrue(response.startswith(b"HTTP/1.1 400"))
+
+            bomb = gzip.compress(b"{" + b" " * 10_000_000 + b"}")
+            self.assertLess(len(bomb), 64 * 1024)
+            status, _ = await post(receiver.port, bomb, encoding="gzip")
+            self.assertEqual(status, 413)
+
+            status, _ = await post(receiver.port, gzip.compress(b"{}")[:-4], encoding="gzip")
+            self.assertEqual(status, 400)
+
+            body = json.dumps(to_otlp_json(strands_trace(1)[:1])).encode()
+            status, _ = await post(receiver.port, zlib.compress(body), encoding="deflate")
+            self.assertEqual(status, 200)
+
+            request = to_otlp_json(strands_trace(2)[:1])
+            del request["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["spanId"]
+            status, _ = await post(receiver.port, json.dumps(request).encode())
+            self.assertEqual(status, 400)
+            self.assertEqual(receiver.spans_received, 1)
+
+    async def test_stop_without_start(self):
+        receiver = OTLPReceiver(Evaluator([message_count_metric()]), port=0)
+        await receiver.stop()
+        self.assertEqual(receiver.pending, 0)
+
+
+if __name__ == "__main__":
+    main()
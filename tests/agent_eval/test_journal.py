@@ -0,0 +1,125 @@
+"""
+Tests for resumable batch evaluation with a run journal.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.evaluator import Evaluator
+from flotorch_eval.agent_eval.core.journal import RunJournal
+from flotorch_eval.agent_eval.core.schemas import MetricResult
+from tests.agent_eval.span_factory import strands_trace
+from tests.agent_eval.stub_metric import StubMetric
+
+
+class TestResumableRuns(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "runs", "journal.jsonl")
+        converter = TraceConverter()
+        self.trajectories = [converter.from_spans(strands_trace(i)) for i in range(1, 11)]
+        self.ids = [t.trace_id for t in self.trajectories]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_restart_skips_finished_pairs(self):
+        first = StubMetric("a", details={"run": 1})
+        second = StubMetric("b", fail_on=self.ids[:1], details={"run": 1})
+
+        # First run dies after three trajectories
+        with RunJournal(self.path) as journal:
+            results = Evaluator([first, second]).evaluate_many(
+                self.trajectories, concurrency=1, ordered=True, journal=journal
+            )
+            for _ in range(3):
+                await results.__anext__()
+            await results.aclose()
+
+        resumed_a = StubMetric("a", details={"run": 2})
+        resumed_b = StubMetric("b", details={"run": 2})
+        with RunJournal(self.path) as journal:
+            self.assertEqual(len(journal), 5)  # b failed on the first trajectory
+            results = [
+                result
+                async for result in Evaluator([resumed_a, resumed_b]).evaluate_many(
+                    self.trajectories, concurrency=4, ordered=True, journal=journal
+                )
+            ]
+            self.assertEqual(journal.stats()["records_written"], 15)
+
+        self.assertEqual(resumed_a.seen, self.ids[3:])
+        self.assertEqual(sorted(resumed_b.seen), sorted(self.ids[:1] + self.ids[3:]))
+        self.assertEqual([r.trajectory_id for r in results], self.ids)
+        self.assertTrue(all(s.status == "success" for r in results for s in r.scores))
+        # Journaled results are returned as they were computed by the first run
+        self.assertEqual(results[1].scores[0].details, {"run": 1})
+        self.assertEqual(results[0].scores[1].details, {"run": 2})
+
+    async def test_writes_run_off_the_event_loop(self):
+        threads = []
+        with RunJournal(self.path) as journal:
+            record = journal.record
+            journal.record = lambda *args: threads.append(threading.get_ident()) or record(*args)
+            async for _ in Evaluator([StubMetric("a")]).evaluate_many(
+                self.trajectories[:3], journal=journal
+            ):
+                pass
+
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    async def test_ignores_line_cut_short_by_crash(self):
+        with RunJournal(self.path) as journal:
+            journal.record("t1", [MetricResult(name="a", score=1.0, details={})])
+        with open(self.path, "ab") as f:
+            f.write(b'{"trajectory_id": "t2", "metr')
+
+        with RunJournal(self.path) as journal:
+            self.assertEqual(journal.corrupt_lines, 1)
+            journal.record("t3", [MetricResult(name="a", score=0.5, details={})])
+
+        with RunJournal(self.path) as journal:
+            self.assertIsNotNone(journal.finished("t1", "a"))
+            self.assertEqual(journal.finished("t3", "a").score, 0.5)
+            self.assertIsNone(journal.finished("t2", "a"))
+
+    async def test_skips_records_missing_a_field(self):
+        result = MetricResult(name="a", score=1.0, details={}).model_dump()
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write(json.dumps({"metric": "a", "result": result}) + "\n")
+            f.write(json.dumps({"trajectory_id": "t1", "metric": "a", "result": result}) + "\n")
+            f.write(json.dumps(["t2", "a"]) + "\n")
+
+        with RunJournal(self.path) as journal:
+            self.assertEqual(journal.corrupt_lines, 2)
+            self.assertEqual(len(journal), 1)
+            self.assertIsNotNone(journal.finished("t1", "a"))
+
+
+class TestJournalOverhead(TestCase):
+    def test_write_overhead_is_measured(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with RunJournal(os.path.join(tmp, "journal.jsonl")) as journal:
+                for i in range(2000):
+                    journal.record(
+                        f"t{i}",
+                        [
+                            MetricResult(name=name, score=0.5, details={"reason": "x" * 200})
+                            for name in ("a", "b", "c")
+                        ],
+                    )
+                stats = journal.stats()
+
+        self.assertEqual(stats["records_written"], 6000)
+        self.assertGreater(stats["bytes_written"], 6000 * 200)
+        self.assertGreater(stats["write_seconds"], 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Tests for the judge LLM call cache.
+"""
+
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase, main
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from ragas.llms import LangchainLLMWrapper
+
+from flotorch_eval.agent_eval.core.evaluator import Evaluator
+from flotorch_eval.agent_eval.integrations.judge_cache import JudgeCache, attach_judge_cache
+
+
+class CountingChatModel(FakeListChatModel):
+    calls: int = 0
+
+    def _call(self, *args, **kwargs):
+        self.calls += 1
+        return super()._call(*args, **kwargs)
+
+
+class TestJudgeCache(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "judge.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_memory_and_disk_tiers(self):
+        cache = JudgeCache(disk_path=self.path)
+        model = CountingChatModel(responses=["yes", "no"])
+        attach_judge_cache(model, cache)
+
+        self.assertEqual(model.invoke("Is this correct?").content, "yes")
+        self.assertEqual(model.invoke("Is this correct?").content, "yes")
+        self.assertEqual(model.invoke("Is this different?").content, "no")
+        self.assertEqual(model.calls, 2)
+        self.assertEqual((cache.memory_hits, cache.disk_hits, cache.misses), (1, 0, 2))
+        cache.close()
+
+        # A new process starts with an empty memory tier
+        rerun_cache = JudgeCache(disk_path=self.path)
+        rerun = CountingChatModel(responses=["yes", "no"])
+        attach_judge_cache(rerun, rerun_cache)
+        self.assertEqual(rerun.invoke("Is this correct?").content, "yes")
+        self.assertEqual(rerun.invoke("Is this correct?").content, "yes")
+        self.assertEqual(rerun.calls, 0)
+        self.assertEqual((rerun_cache.memory_hits, rerun_cache.disk_hits), (1, 1))
+        rerun_cache.close()
+
+    def test_model_parameters_are_part_of_the_key(self):
+        cache = JudgeCache(disk_path=None)
+        first = CountingChatModel(responses=["a"])
+        second = CountingChatModel(responses=["b"], sleep=0.0)
+        attach_judge_cache(first, cache)
+        attach_judge_cache(second, cache)
+
+        first.invoke("prompt")
+        self.assertEqual(second.invoke("prompt").content, "b")
+
+    async def test_evaluator_attaches_to_ragas_wrappers(self):
+        cache = JudgeCache(disk_path=None)
+        model = CountingChatModel(responses=["yes"])
+        wrapper = LangchainLLMWrapper(model)
+
+        class JudgeMetric:
+            llm = wrapper
+
+        Evaluator(judge_cache=cache)._attach_judge_cache([JudgeMetric()])
+        await model.ainvoke("prompt")
+        await model.ainvoke("prompt")
+
+        self.assertIs(model.cache, cache)
+        self.assertEqual((model.calls, cache.hits), (1, 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Tests for the judge rate limiter and adaptive concurrency.
+"""
+
+import asyncio
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.evaluator import Evaluator
+from flotorch_eval.agent_eval.core.rate_limit import AIMDConcurrency, JudgeRateLimiter, TokenBucket
+from flotorch_eval.agent_eval.core.retry import RetryPolicy, is_throttling_error
+from tests.agent_eval.span_factory import strands_trace
+from tests.agent_eval.stub_metric import StubMetric
+
+
+class ThrottlingException(Exception):
+    """Mimics the error raised by a throttled judge client."""
+
+
+class FakeJudge:
+    """Local judge that rejects calls beyond ``capacity`` concurrent ones."""
+
+    def __init__(self, capacity: int, latency: float = 0.005):
+        self.capacity = capacity
+        self.latency = latency
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self.throttled = 0
+
+    async def invoke(self) -> float:
+        self.calls += 1
+        if self.active >= self.capacity:
+            self.throttled += 1
+            raise ThrottlingException("Too many requests")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            return 1.0
+        finally:
+            self.active -= 1
+
+
+def judge_metric(judge: FakeJudge) -> StubMetric:
+    """Judge-backed metric scoring with one call to ``judge``."""
+    return StubMetric(
+        "judge", score=lambda trajectory: judge.invoke(), llm=judge, requires_llm=True
+    )
+
+
+PATIENT_RETRIES = RetryPolicy(max_attempts=50, initial_backoff=0.001, max_backoff=0.005)
+
+
+class TestAdaptiveConcurrency(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.trajectories = [
+            TraceConverter().from_spans(strands_trace(trace_id)) for trace_id in range(1, 121)
+        ]
+
+    async def evaluate_all(self, judge: FakeJudge, rate_limiter=None):
+        evaluator = Evaluator(
+            [judge_metric(judge)], retry_policy=PATIENT_RETRIES, rate_limiter=rate_limiter
+        )
+        return [
+            result async for result in evaluator.evaluate_many(self.trajectories, concurrency=32)
+        ]
+
+    async def test_settles_near_provider_limit(self):
+        judge = FakeJudge(capacity=4)
+        limiter = JudgeRateLimiter(concurrency=AIMDConcurrency(initial=16, maximum=32))
+
+        results = await self.evaluate_all(judge, limiter)
+
+        self.assertTrue(all(r.scores[0].status == "success" for r in results))
+        self.assertEqual(judge.peak, 4)
+        self.assertGreaterEqual(limiter.concurrency.limit, 2)
+        self.assertLessEqual(limiter.concurrency.limit, 8)
+        self.assertEqual(limiter.concurrency.in_flight, 0)
+
+        # Without the controller, far more calls are rejected
+        unlimited = FakeJudge(capacity=4)
+        await self.evaluate_all(unlimited)
+        self.assertLess(judge.throttled * 2, unlimited.throttled)
+
+    async def test_only_judge_metrics_are_limited(self):
+        limiter = JudgeRateLimiter(concurrency=AIMDConcurrency(initial=1, maximum=4))
+        evaluator = Evaluator(
+            [judge_metric(FakeJudge(capacity=1)), StubMetric("local")], rate_limiter=limiter
+        )
+
+        result = await evaluator.evaluate(self.trajectories[0])
+
+        self.assertEqual([score.status for score in result.scores], ["success", "success"])
+        # One judge call succeeded; the local metric did not go through the limiter
+        self.assertEqual(limiter.concurrency.limit, 2)
+        self.assertEqual(limiter.concurrency.in_flight, 0)
+
+    async def test_judge_slot_is_taken_after_the_semaphores(self):
+        limiter = JudgeRateLimiter(concurrency=AIMDConcurrency(initial=8, maximum=8))
+        in_flight = []
+
+        class ObservedJudge(FakeJudge):
+            async def invoke(self) -> float:
+                in_flight.append(limiter.concurrency.in_flight)
+                return await super().invoke()
+
+        evaluator = Evaluator(
+            [judge_metric(ObservedJudge(capacity=8))],
+            metric_concurrency={"judge": 2},
+            rate_limiter=limiter,
+        )
+        results = [
+            result async for result in evaluator.evaluate_many(self.trajectories, concurrency=32)
+        ]
+
+        self.assertTrue(all(r.scores[0].status == "success" for r in results))
+        # Tasks waiting on the per-metric semaphore hold no judge slot
+        self.assertLessEqual(max(in_flight), 2)
+
+
+class TestAIMDConcurrency(IsolatedAsyncioTestCase):
+    async def test_one_burst_of_rejections_decreases_once(self):
+        controller = AIMDConcurrency(initial=8, maximum=8)
+        tickets = [await controller.acquire() for _ in range(8)]
+
+        for ticket in tickets:
+            await controller.release(ticket, succeeded=False, throttled=True)
+
+        self.assertEqual(controller.limit, 4)
+        self.assertEqual(controller.throttled, 8)
+
+    async def test_grows_by_about_one_per_round(self):
+        controller = AIMDConcurrency(initial=2, maximum=10)
+        for _ in range(2):
+            await controller.release(await controller.acquire())
+
+        self.assertAlmostEqual(controller.limit, 2 + 1 / 2 + 1 / 2.5)
+
+    async def test_failures_leave_limit_unchanged(self):
+        controller = AIMDConcurrency(initial=3)
+
+        await controller.release(await controller.acquire(), succeeded=False)
+
+        self.assertEqual(controller.limit, 3)
+
+    async def test_waits_for_free_slot(self):
+        controller = AIMDConcurrency(initial=1, maximum=1)
+        ticket = await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+
+        await controller.release(ticket)
+
+        await asyncio.wait_for(waiter, 1)
+        self.assertEqual(controller.in_flight, 1)
+
+
+class TestTokenBucket(IsolatedAsyncioTestCase):
+    async def test_paces_requests(self):
+        # 1200/min is 20/s; with a burst of one, 10 requests need about 0.45s
+        limiter = JudgeRateLimiter(requests_per_minute=1200, burst_seconds=0.05)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        for _ in range(10):
+            await limiter.release(await limiter.acquire())
+
+        self.assertGreater(loop.time() - started, 0.4)
+
+    async def test_paces_tokens_and_clamps_large_requests(self):
+        bucket = TokenBucket(rate_per_minute=60_000, capacity=100)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        await bucket.acquire(100)
+        await bucket.acquire(1_000_000)  # clamped to a full bucket, i.e. 0.1s
+
+        self.assertGreater(loop.time() - started, 0.09)
+        self.assertLess(loop.time() - started, 1)
+
+
+class TestThrottlingClassification(TestCase):
+    def test_throttling_errors(self):
+        class RateLimitError(Exception):
+            status_code = 429
+
+        class ClientError(Exception):
+            response = {"Error": {"Code": "ThrottlingException"}}
+
+        class APIStatusError(Exception):
+            status_code = 503
+
+        self.assertTrue(is_throttling_error(RateLimitError()))
+        self.assertTrue(is_throttling_error(ClientError()))
+        self.assertTrue(is_throttling_error(ThrottlingException()))
+        self.assertFalse(is_throttling_error(APIStatusError()))
+        self.assertFalse(is_throttling_error(ConnectionError()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Tests for stratified sampling with bootstrap confidence intervals.
+"""
+
+import random
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.evaluator import Evaluator
+from flotorch_eval.agent_eval.core.sampling import (
+    SamplingPlanner,
+    combine_strata,
+    framework_stratum,
+    latency_stratum,
+    stratified_bootstrap,
+    tool_set_stratum,
+)
+from flotorch_eval.agent_eval.core.schemas import Message, Trajectory
+from tests.agent_eval.span_factory import crewai_trace, strands_trace
+from tests.agent_eval.stub_metric import StubMetric
+
+
+def population(sizes, seed=0):
+    """Trajectories whose first message names their stratum and hidden score."""
+    rng = random.Random(seed)
+    trajectories = []
+    for stratum, (size, pass_rate) in sizes.items():
+        for i in range(size):
+            score = 1.0 if rng.random() < pass_rate else 0.0
+            trajectories.append(
+                Trajectory(
+                    trace_id=f"{stratum}-{i}",
+                    messages=[Message(role="user", content=f"{stratum}:{score}")],
+                    spans=[],
+                )
+            )
+    return trajectories
+
+
+def stratum_of(trajectory: Trajectory) -> str:
+    return trajectory.messages[0].content.split(":")[0]
+
+
+def hidden_score(trajectory: Trajectory) -> float:
+    return float(trajectory.messages[0].content.split(":")[1])
+
+
+class TestEvaluateSample(IsolatedAsyncioTestCase):
+    async def test_stops_at_target_width(self):
+        trajectories = population({"a": (4000, 0.9), "b": (1000, 0.3)})
+        true_mean = sum(hidden_score(t) for t in trajectories) / len(trajectories)
+        metric = StubMetric("judge", score=hidden_score)
+        planner = SamplingPlanner(
+            stratify=stratum_of, target_ci_width=0.1, batch_size=100, n_resamples=500, seed=7
+        )
+
+        report = await Evaluator([metric]).evaluate_sample(trajectories, planner)
+
+        estimate = report.estimates["judge"]
+        self.assertTrue(report.converged)
+        self.assertLessEqual(estimate.ci_width, 0.1)
+        self.assertLess(metric.calls, len(trajectories) // 4)
+        self.assertEqual(report.sample_size, metric.calls)
+        self.assertLess(abs(estimate.mean - true_mean), 0.1)
+        # Proportional allocation: about four times as many from the larger stratum
+        self.assertAlmostEqual(report.strata["a"].sampled / report.strata["b"].sampled, 4, 0)
+
+    async def test_max_samples_and_exhaustion(self):
+        trajectories = population({"a": (30, 0.5), "b": (3, 0.5)})
+        metric = StubMetric("judge", score=hidden_score)
+
+        capped = await Evaluator([metric]).evaluate_sample(
+            trajectories, SamplingPlanner(stratum_of, target_ci_width=0.01, max_samples=12, seed=1)
+        )
+        self.assertEqual(capped.sample_size, 12)
+        self.assertFalse(capped.converged)
+        self.assertGreaterEqual(capped.strata["b"].sampled, 2)
+
+        full = await Evaluator([metric]).evaluate_sample(
+            trajectories, SamplingPlanner(stratum_of, target_ci_width=0.01, batch_size=10, seed=1)
+        )
+        self.assertEqual(full.sample_size, 33)
+        self.assertEqual(len({r.trajectory_id for r in full.results}), 33)
+
+    async def test_more_strata_than_the_batch_holds(self):
+        trajectories = population({f"s{i}": (10, 1.0 if i < 10 else 0.0) for i in range(20)})
+        metric = StubMetric("judge", score=hidden_score)
+
+        plan = SamplingPlanner(stratum_of, batch_size=10, min_per_stratum=2, seed=1).plan(
+            trajectories
+        )
+        batch = plan.next_batch()
+        async for result in Evaluator([metric]).evaluate_many(batch):
+            plan.add(result)
+        partial = plan.report()
+        self.assertEqual(len({stratum_of(t) for t in batch}), 10)
+        self.assertEqual(partial.estimates["judge"].ci_width, 0)
+        self.assertAlmostEqual(partial.estimates["judge"].unscored_weight, 0.5)
+        self.assertFalse(partial.converged)
+
+        report = await Evaluator([metric]).evaluate_sample(
+            trajectories, SamplingPlanner(stratum_of, batch_size=20, min_per_stratum=2, seed=1)
+        )
+        self.assertTrue(report.converged)
+        self.assertAlmostEqual(report.estimates["judge"].mean, 0.5)
+        self.assertTrue(all(stratum.sampled >= 1 for stratum in report.strata.values()))
+
+
+class TestStratifiedBootstrap(TestCase):
+    def test_constant_scores_have_zero_width(self):
+        mean, low, high = stratified_bootstrap({"a": [1.0] * 10, "b": [0.0] * 5}, {"a": 0.75, "b": 0.25})
+
+        self.assertAlmostEqual(mean, 0.75)
+        self.assertAlmostEqual(low, 0.75)
+        self.assertAlmostEqual(high, 0.75)
+
+    def test_interval_covers_mean_and_ignores_empty_strata(self):
+        mean, low, high = stratified_bootstrap(
+            {"a": [0.0, 1.0] * 20, "b": []}, {"a": 0.5, "b": 0.5}, seed=3
+        )
+
+        self.assertAlmostEqual(mean, 0.5)
+        self.assertLess(low, 0.5)
+        self.assertGreater(high, 0.5)
+        self.assertLess(high - low, 0.4)
+
+    def test_rejects_empty_sample(self):
+        with self.assertRaises(ValueError):
+            stratified_bootstrap({"a": []}, {"a": 1.0})
+
+
+class TestStrata(TestCase):
+    def test_framework_tool_set_and_latency(self):
+        converter = TraceConverter()
+        crewai = converter.from_spans(crewai_trace(1))
+        strands = converter.from_spans(strands_trace(2, tool_calls=2))
+
+        self.assertEqual(framework_stratum()(crewai), "crewai")
+        self.assertEqual(framework_stratum()(strands), "strands")
+        self.assertEqual(tool_set_stratum(strands), "calculator")
+        self.assertEqual(latency_stratum([1, 1_000])(strands), "1-1000ms")
+        self.assertEqual(
+            combine_strata(framework_stratum(), tool_set_stratum)(strands), "strands/calculator"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Tests for the span tree index and the hierarchical latency breakdown.
+"""
+
+import asyncio
+from unittest import TestCase, main
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.schemas import Trajectory
+from flotorch_eval.agent_eval.core.span_tree import SpanTree
+from flotorch_eval.agent_eval.metrics.latency_metrics import LatencyMetric
+from flotorch_eval.common.latency_utils import (
+    critical_path,
+    extract_latency_from_trajectory,
+    merged_duration_ns,
+)
+from tests.agent_eval.span_factory import make_span, strands_trace
+
+
+def _nested_spans():
+    # root(1) -> agent(2) -> model(3), tool(4) -> http(5); orphan(7) has a missing parent
+    return [
+        make_span("root", 0x9, 1, 0, 100),
+        make_span("agent", 0x9, 2, 1, 90, parent_id=1),
+        make_span("model", 0x9, 3, 2, 40, parent_id=2),
+        make_span("tool", 0x9, 4, 41, 80, parent_id=2),
+        make_span("http", 0x9, 5, 42, 60, parent_id=4),
+        make_span("orphan", 0x9, 7, 50, 55, parent_id=6),
+    ]
+
+
+class TestSpanTree(TestCase):
+    def setUp(self):
+        self.trajectory = TraceConverter().from_spans(_nested_spans())
+        self.tree = self.trajectory.span_tree
+        self.ids = {span.name: span.span_id for span in self.trajectory.spans}
+
+    def test_structure(self):
+        self.assertEqual([s.name for s in self.tree.roots], ["root", "orphan"])
+        self.assertEqual([s.name for s in self.tree.children(self.ids["agent"])], ["model", "tool"])
+        self.assertEqual(self.tree.parent(self.ids["http"]).name, "tool")
+        self.assertIsNone(self.tree.parent(self.ids["orphan"]))
+        self.assertEqual(self.tree.depth(self.ids["http"]), 3)
+        self.assertEqual(
+            [s.name for s in self.tree.ancestors(self.ids["http"])], ["tool", "agent", "root"]
+        )
+
+    def test_subtree_queries(self):
+        self.assertEqual(
+            [s.name for s in self.tree.subtree(self.ids["agent"])],
+            ["agent", "model", "tool", "http"],
+        )
+        self.assertEqual(self.tree.subtree_size(self.ids["root"]), 5)
+        self.assertTrue(self.tree.is_ancestor(self.ids["root"], self.ids["http"]))
+        self.assertFalse(self.tree.is_ancestor(self.ids["model"], self.ids["http"]))
+        self.assertFalse(self.tree.is_ancestor(self.ids["root"], self.ids["root"]))
+
+    def test_built_lazily_for_hand_made_trajectories(self):
+        trajectory = Trajectory(
+            trace_id=self.trajectory.trace_id, messages=[], spans=self.trajectory.spans
+        )
+        self.assertIsNone(trajectory._span_tree)
+        self.assertEqual(len(trajectory.span_tree), 6)
+        self.assertIs(trajectory.span_tree, trajectory.span_tree)
+
+    def test_rebuilt_when_spans_change(self):
+        tree = self.trajectory.span_tree
+        self.trajectory.spans = self.trajectory.spans[:3]
+        self.assertEqual(len(self.trajectory.span_tree), 3)
+        self.trajectory.spans.append(tree.get(self.ids["http"]))
+        self.assertEqual(len(self.trajectory.span_tree), 4)
+        self.assertIs(self.trajectory.span_tree, self.trajectory.span_tree)
+
+    def test_parent_cycle_is_broken(self):
+        converter = TraceConverter()
+        spans = [
+            converter.convert_span(make_span("a", 0x9, 1, 0, 10, parent_id=2)),
+            converter.convert_span(make_span("b", 0x9, 2, 1, 5, parent_id=1)),
+        ]
+        tree = SpanTree(spans)
+        self.assertEqual(len(tree), 2)
+        self.assertEqual([s.name for s in tree.roots], ["a"])
+
+    def test_deep_tree(self):
+        depth = 5000
+        converter = TraceConverter()
+        spans = [
+            converter.convert_span(make_span("s", 0x9, i, i, 2 * depth - i, parent_id=i - 1))
+            for i in range(1, depth + 1)
+        ]
+        tree = SpanTree(spans)
+        self.assertEqual(tree.depth(spans[-1].span_id), depth - 1)
+        self.assertTrue(tree.is_ancestor(spans[0].span_id, spans[-1].span_id))
+
+
+class TestHierarchicalLatency(TestCase):
+    def test_nested_breakdown(self):
+        trajectory = TraceConverter().from_spans(_nested_spans())
+        summary = extract_latency_from_trajectory(trajectory).to_dict()
+
+        self.assertEqual(summary["total_latency_ms"], 105.0)
+        self.assertEqual(summary["average_step_latency_ms"], 52.5)
+        root, orphan = summary["latency_breakdown"]
+        self.assertEqual((root["step_name"], root["latency_ms"]), ("root", 100.0))
+        self.assertEqual((orphan["step_name"], orphan["children"]), ("orphan", []))
+        agent = root["children"][0]
+        self.assertEqual([c["step_name"] for c in agent["children"]], ["model", "tool"])
+        self.assertEqual(agent["children"][1]["children"][0]["latency_ms"], 18.0)
+
+    def test_strands_trace(self):
+        trajectory = TraceConverter().from_spans(strands_trace(0x1, tool_calls=2))
+        breakdown = extract_latency_from_trajectory(trajectory).latency_breakdown
+
+        self.assertEqual([item.step_name for item in breakdown], ["invoke_agent"])
+        self.assertEqual(len(breakdown[0].children), 5)
+
+    def test_metric_reports_nested_breakdown(self):
+        trajectory = TraceConverter().from_spans(_nested_spans())
+        result = asyncio.run(LatencyMetric().compute(trajectory))
+
+        root = result.details["latency_breakdown"][0]
+        self.assertEqual(root["children"][0]["step_name"], "agent")
+
+
+class TestLatencyAnalysis(TestCase):
+    def _concurrent_trajectory(self):
+        # root(0-100): plan(0-10), then search(10-60) and fetch(10-90) concurrently,
+        # with fetch calling parse(20-80); answer(90-100)
+        return TraceConverter().from_spans([
+            make_span("root", 0x8, 1, 0, 100),
+            make_span("plan", 0x8, 2, 0, 10, parent_id=1),
+            make_span("search", 0x8, 3, 10, 60, parent_id=1),
+            make_span("fetch", 0x8, 4, 10, 90, parent_id=1),
+            make_span("parse", 0x8, 5, 20, 80, parent_id=4),
+            make_span("answer", 0x8, 6, 90, 100, parent_id=1),
+        ])
+
+    def test_merged_duration(self):
+        self.assertEqual(merged_duration_ns([(0, 10), (5, 20), (30, 40), (40, 45), (7, 7)]), 35)
+        self.assertEqual(merged_duration_ns([]), 0)
+
+    def test_wall_clock_self_time_and_parallelism(self):
+        summary = extract_latency_from_trajectory(self._concurrent_trajectory())
+
+        self.assertEqual(summary.wall_clock_ms, 100.0)
+        root = summary.latency_breakdown[0]
+        self.assertEqual(root.self_time_ms, 0.0)
+        fetch = root.children[2]
+        self.assertEqual((fetch.step_name, fetch.self_time_ms), ("fetch", 20.0))
+        # Self times: plan 10, search 50, fetch 20, parse 60, answer 10
+        self.assertEqual(summary.parallelism_factor, 1.5)
+
+    def test_critical_path(self):
+        path = critical_path(self._concurrent_trajectory().span_tree)
+
+        self.assertEqual(
+            [(step.step_name, step.duration_ms) for step in path],
+            [("plan", 10.0), ("fetch", 10.0), ("parse", 60.0), ("fetch", 10.0), ("answer", 10.0)],
+        )
+        self.assertEqual(sum(step.duration_ms for step in path), 100.0)
+
+    def test_sequential_trace(self):
+        trajectory = TraceConverter().from_spans(strands_trace(0x1, tool_calls=2))
+        summary = extract_latency_from_trajectory(trajectory)
+
+        self.assertEqual(summary.wall_clock_ms, summary.total_latency_ms)
+        self.assertEqual(summary.parallelism_factor, 1.0)
+        self.assertEqual(
+            sum(step.duration_ms for step in summary.critical_path), summary.wall_clock_ms
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Tests for the streaming trace converter.
+"""
+
+from unittest import TestCase, main
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.streaming import StreamingTraceConverter
+
+from tests.agent_eval.span_factory import strands_trace
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStreamingTraceConverter(TestCase):
+    def test_interleaved_traces_match_batch_conversion(self):
+        first = strands_trace(0x1, question="first", tool_calls=2)
+        second = strands_trace(0x2, question="second", tool_calls=1)
+        streaming = StreamingTraceConverter()
+
+        completed = []
+        for a, b in zip(first, second):
+            completed.extend(streaming.add_span(a))
+            completed.extend(streaming.add_span(b))
+        completed.extend(streaming.add_spans(first[len(second):]))
+
+        self.assertEqual(len(streaming), 0)
+        by_id = {t.trace_id: t for t in completed}
+        self.assertEqual(set(by_id), {format(0x1, "032x"), format(0x2, "032x")})
+
+        expected = TraceConverter().from_spans(first)
+        actual = by_id[expected.trace_id]
+        self.assertEqual(
+            [(m.role, m.content) for m in actual.messages],
+            [(m.role, m.content) for m in expected.messages],
+        )
+        self.assertEqual(len(actual.spans), len(first))
+
+    def test_trace_emitted_when_root_closes(self):
+        spans = strands_trace(0x3)
+        streaming = StreamingTraceConverter()
+
+        self.assertEqual(streaming.add_spans(spans[:-1]), [])
+        self.assertEqual(streaming.open_traces, [format(0x3, "032x")])
+
+        completed = streaming.add_span(spans[-1])
+        self.assertEqual(len(completed), 1)
+        self.assertEqual(completed[0].messages[0].content, "What is 2 + 2?")
+
+    def test_idle_timeout_and_late_spans(self):
+        clock = FakeClock()
+        spans = strands_trace(0x4)
+        streaming = StreamingTraceConverter(idle_timeout=5.0, clock=clock)
+
+        streaming.add_spans(spans[:2])
+        clock.now = 4.0
+        self.assertEqual(streaming.expire(), [])
+        clock.now = 10.0
+        expired = streaming.expire()
+        self.assertEqual(len(expired), 1)
+        self.assertEqual(len(expired[0].spans), 2)
+
+        self.assertEqual(streaming.add_spans(spans[2:]), [])
+        self.assertEqual(streaming.late_spans, len(spans) - 2)
+
+    def test_max_open_traces_bounds_memory(self):
+        streaming = StreamingTraceConverter(max_open_traces=2)
+        completed = []
+        for trace_id in range(1, 6):
+            completed.extend(streaming.add_spans(strands_trace(trace_id)[:-1]))
+
+        self.assertEqual(len(streaming), 2)
+        self.assertEqual(len(completed), 3)
+        self.assertEqual(len(streaming.flush()), 2)
+
+
+if __name__ == "__main__":
+    main()
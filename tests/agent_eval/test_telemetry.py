@@ -0,0 +1,204 @@
+"""
+Tests for the optional self-instrumentation of the evaluation pipeline.
+"""
+
+import json
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.evaluator import Evaluator
+from flotorch_eval.agent_eval.core.schemas import MetricResult, Trajectory
+from flotorch_eval.agent_eval.core.streaming import StreamingTraceConverter
+from flotorch_eval.agent_eval.metrics.langchain_metrics import TrajectoryEvalWithLLMMetric
+from flotorch_eval.common import telemetry
+from tests.agent_eval.span_factory import make_span, strands_trace
+from tests.agent_eval.stub_metric import StubMetric
+
+
+class JudgeLikeMetric(StubMetric):
+    """Metric whose computation opens a judge span, like the LLM-backed metrics."""
+
+    def __init__(self, metric_name: str, tracer=None, error: str = ""):
+        self.tracer = tracer
+        super().__init__(metric_name, error=error)
+
+    async def compute(self, trajectory: Trajectory) -> MetricResult:
+        with telemetry.traced(telemetry.JUDGE_SPAN, telemetry.JUDGE_DURATION):
+            if self.tracer is not None:
+                # An instrumented model client would record its own span here
+                with self.tracer.start_as_current_span("chat gpt-4o"):
+                    pass
+            return await super().compute(trajectory)
+
+
+def metric_points(reader: InMemoryMetricReader):
+    points = {}
+    data = reader.get_metrics_data()
+    for resource_metrics in data.resource_metrics if data else []:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                points[metric.name] = list(metric.data.data_points)
+    return points
+
+
+class TestSelfInstrumentation(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        self.tracer_provider = TracerProvider()
+        self.tracer_provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        self.reader = InMemoryMetricReader()
+        self.meter_provider = MeterProvider(metric_readers=[self.reader])
+        self.agent_spans = strands_trace(0x1)
+
+    def tearDown(self):
+        telemetry.disable_instrumentation()
+
+    async def evaluate(self):
+        trajectory = TraceConverter().from_spans(self.agent_spans)
+        tracer = self.tracer_provider.get_tracer("judge-client")
+        evaluator = Evaluator(
+            [JudgeLikeMetric("ok", tracer), JudgeLikeMetric("broken", tracer, error="boom")]
+        )
+        return await evaluator.evaluate(trajectory)
+
+    async def test_disabled_by_default(self):
+        self.assertFalse(telemetry.instrumentation_enabled())
+        self.assertIsNone(telemetry.traced(telemetry.METRIC_SPAN).__enter__())
+
+        await self.evaluate()
+
+        names = {span.name for span in self.exporter.get_finished_spans()}
+        self.assertEqual(names, {"chat gpt-4o"})
+
+    async def test_spans_and_metrics(self):
+        telemetry.enable_instrumentation(self.tracer_provider, self.meter_provider)
+
+        result = await self.evaluate()
+
+        spans = self.exporter.get_finished_spans()
+        by_name = {}
+        for span in spans:
+            by_name.setdefault(span.name, []).append(span)
+        self.assertEqual(len(by_name[telemetry.CONVERT_SPAN]), 1)
+        self.assertEqual(len(by_name[telemetry.JUDGE_SPAN]), 2)
+        metric_spans = {s.attributes["metric"]: s for s in by_name[telemetry.METRIC_SPAN]}
+        self.assertEqual(metric_spans["broken"].attributes["status"], "failed")
+        self.assertTrue(all(s.attributes[telemetry.INTERNAL_SPAN_ATTRIBUTE] for s in metric_spans.values()))
+        self.assertEqual([s.status for s in result.scores], ["success", "failed"])
+
+        points = metric_points(self.reader)
+        self.assertEqual(sum(p.count for p in points[telemetry.METRIC_DURATION]), 2)
+        self.assertEqual(sum(p.count for p in points[telemetry.JUDGE_DURATION]), 2)
+        self.assertEqual(sum(p.count for p in points[telemetry.CONVERT_DURATION]), 1)
+        errors = points[telemetry.METRIC_ERRORS]
+        self.assertEqual([(p.attributes["metric"], p.value) for p in errors], [("broken", 1)])
+
+    async def test_judge_client_spans_nest_under_the_judge_span(self):
+        telemetry.enable_instrumentation(self.tracer_provider, self.meter_provider)
+        tracer = self.tracer_provider.get_tracer("judge-client")
+        metric = TrajectoryEvalWithLLMMetric(llm=FakeListChatModel(responses=["unused"]))
+
+        def judge(**kwargs):
+            # The synchronous client runs in an executor thread
+            with tracer.start_as_current_span("chat gpt-4o"):
+                return {"score": True, "comment": "fine"}
+
+        metric.evaluator = judge
+        result = await metric.compute(TraceConverter().from_spans(self.agent_spans))
+
+        spans = {span.name: span for span in self.exporter.get_finished_spans()}
+        self.assertEqual(result.score, 1.0)
+        self.assertEqual(
+            spans["chat gpt-4o"].parent.span_id, spans[telemetry.JUDGE_SPAN].context.span_id
+        )
+
+    async def test_in_flight_gauge_returns_to_zero(self):
+        telemetry.enable_instrumentation(self.tracer_provider, self.meter_provider)
+        trajectories = [TraceConverter().from_spans(strands_trace(i)) for i in (1, 2, 3)]
+
+        async for _ in Evaluator([JudgeLikeMetric("ok")]).evaluate_many(trajectories):
+            pass
+
+        points = metric_points(self.reader)[telemetry.EVALUATIONS_IN_FLIGHT]
+        self.assertEqual(sum(p.value for p in points), 0)
+
+    async def test_internal_spans_are_not_converted(self):
+        telemetry.enable_instrumentation(self.tracer_provider, self.meter_provider)
+        await self.evaluate()
+        own_spans = list(self.exporter.get_finished_spans())
+        self.assertTrue(own_spans)
+
+        converter = TraceConverter()
+        clean = converter.from_spans(self.agent_spans)
+        # Self-instrumentation spans land in their own traces, or inside the agent's
+        mixed = converter.from_spans_batch(own_spans + list(self.agent_spans), max_workers=1)
+
+        self.assertEqual(len(mixed), 1)
+        self.assertEqual(mixed[0].messages, clean.messages)
+        self.assertEqual(len(mixed[0].spans), len(clean.spans))
+
+        streaming = StreamingTraceConverter()
+        self.assertEqual(streaming.add_spans(own_spans) + streaming.flush(), [])
+
+
+class TestInternalSpanOrder(TestCase):
+    def setUp(self):
+        self.agent_spans = strands_trace(1)
+        root = self.agent_spans[-1]
+        judge = make_span(
+            telemetry.JUDGE_SPAN,
+            1,
+            1900,
+            30,
+            40,
+            parent_id=root.context.span_id,
+            attributes={telemetry.INTERNAL_SPAN_ATTRIBUTE: True},
+        )
+        # The judge's own model call starts with its parent and ends first
+        model = make_span(
+            "Model invoke",
+            1,
+            1901,
+            30,
+            39,
+            parent_id=1900,
+            attributes={
+                "gen_ai.prompt": json.dumps([{"role": "user", "content": [{"text": "Judge"}]}]),
+                "gen_ai.completion": json.dumps([{"text": "JUDGE SAYS YES"}]),
+            },
+        )
+        self.spans = self.agent_spans[:-1] + [model, judge, root]
+        self.clean = TraceConverter().from_spans(self.agent_spans)
+
+    def test_children_arriving_before_internal_parent_are_excluded(self):
+        streaming = StreamingTraceConverter()
+        trajectories = [t for span in self.spans for t in streaming.add_spans([span])]
+
+        self.assertEqual(len(trajectories), 1)
+        self.assertEqual(trajectories[0].messages, self.clean.messages)
+        self.assertEqual(len(trajectories[0].spans), len(self.clean.spans))
+
+    def test_excluded_when_sorting_leaves_child_first(self):
+        trajectory = TraceConverter().from_spans(self.spans)
+        self.assertEqual(trajectory.messages, self.clean.messages)
+
+    def test_spans_with_missing_parent_are_kept(self):
+        streaming = StreamingTraceConverter()
+        for span in self.agent_spans[:-1]:
+            self.assertEqual(streaming.add_spans([span]), [])
+        trajectories = streaming.flush()
+
+        self.assertEqual(len(trajectories), 1)
+        self.assertEqual(len(trajectories[0].spans), len(self.agent_spans) - 1)
+        self.assertEqual(trajectories[0].messages[-1].content, self.clean.messages[-1].content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Tests for the per-evaluation cache of derived trajectory views.
+"""
+
+from unittest import IsolatedAsyncioTestCase, TestCase, main
+
+from flotorch_eval.agent_eval.core.converter import TraceConverter
+from flotorch_eval.agent_eval.core.evaluator import Evaluator
+from flotorch_eval.agent_eval.core.schemas import Message, Trajectory
+from flotorch_eval.agent_eval.core.views import memoized_view, view_scope
+from flotorch_eval.agent_eval.metrics.langchain_metrics import TrajectoryEvalWithoutLLMMetric
+from flotorch_eval.common.latency_utils import extract_latency_from_trajectory
+from tests.agent_eval.span_factory import strands_trace
+from tests.agent_eval.stub_metric import StubMetric
+
+builds = []
+
+
+@memoized_view
+def message_count(trajectory: Trajectory) -> int:
+    builds.append(trajectory.trace_id)
+    return len(trajectory.messages)
+
+
+class TestViewsInEvaluator(IsolatedAsyncioTestCase):
+    def setUp(self):
+        builds.clear()
+        converter = TraceConverter()
+        self.trajectories = [converter.from_spans(strands_trace(i)) for i in (1, 2)]
+
+    async def test_view_built_once_per_trajectory(self):
+        evaluator = Evaluator([StubMetric(f"m{i}", score=message_count) for i in range(4)])
+
+        async for result in evaluator.evaluate_many(self.trajectories):
+            self.assertEqual(len({score.score for score in result.scores}), 1)
+
+        self.assertEqual(sorted(builds), sorted(t.trace_id for t in self.trajectories))
+
+    async def test_views_do_not_outlive_the_evaluation(self):
+        evaluator = Evaluator([StubMetric("m", score=message_count)])
+
+        await evaluator.evaluate(self.trajectories[0])
+        await evaluator.evaluate(self.trajectories[0])
+        message_count(self.trajectories[0])
+
+        self.assertEqual(len(builds), 3)
+
+
+class TestTrajectoryViews(TestCase):
+    def setUp(self):
+        builds.clear()
+        self.trajectory = TraceConverter().from_spans(strands_trace(1, tool_calls=2))
+
+    def test_rebuilt_after_mutation(self):
+        with view_scope() as views:
+            first = message_count(self.trajectory)
+            message_count(self.trajectory)
+            self.trajectory.messages.append(Message(role="user", content="And 3 + 3?"))
+            second = message_count(self.trajectory)
+            self.trajectory.messages[0].content = "What is 5 + 5?"
+            message_count(self.trajectory)
+
+        self.assertEqual(second, first + 1)
+        self.assertEqual(len(builds), 3)
+        self.assertEqual((views.hits, views.misses), (1, 3))
+
+    def test_rebuilt_after_tool_call_changes(self):
+        message = next(m for m in self.trajectory.messages if m.tool_calls)
+        with view_scope() as views:
+            message_count(self.trajectory)
+            message.tool_calls[0].output = "changed"
+            message_count(self.trajectory)
+            message.tool_calls[0].arguments["extra"] = "x"
+            message_count(self.trajectory)
+            message.tool_calls[0] = message.tool_calls[0].model_copy()
+            message_count(self.trajectory)
+            message_count(self.trajectory)
+
+        self.assertEqual((views.hits, views.misses), (1, 4))
+
+    def test_explicit_invalidation_and_nested_scopes(self):
+        with view_scope() as views:
+            message_count(self.trajectory)
+            with view_scope() as inner:
+                self.assertIs(inner, views)
+                message_count(self.trajectory)
+            views.invalidate(self.trajectory)
+            message_count(self.trajectory)
+
+        self.assertEqual(len(builds), 2)
+
+    def test_library_conversions_are_shared(self):
+        convert = TrajectoryEvalWithoutLLMMetric()._convert_to_standard_format
+        with view_scope():
+            self.assertIs(convert(self.trajectory), convert(self.trajectory))
+            self.assertIs(
+                extract_latency_from_trajectory(self.trajectory),
+                extract_latency_from_trajectory(self.trajectory),
+            )
+        self.assertIsNot(convert(self.trajectory), convert(self.trajectory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Tests for the SQLite-backed cache.
+"""
+
+import os
+import tempfile
+from unittest import TestCase, main
+
+from flotorch_eval.common.sqlite_cache import SQLiteCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSQLiteCache(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "nested", "cache.sqlite")
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_persists_across_instances(self):
+        cache = SQLiteCache(self.path)
+        cache.set("a", b"1")
+        cache.close()
+
+        cache = SQLiteCache(self.path)
+        self.assertEqual(cache.get("a"), b"1")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.size_bytes, 1)
+        cache.close()
+
+    def test_ttl(self):
+        cache = SQLiteCache(self.path, ttl=10, clock=self.clock)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+
+        self.clock.now += 11
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual((len(cache), cache.size_bytes), (0, 0))
+        cache.close()
+
+    def test_size_based_lru_eviction(self):
+        cache = SQLiteCache(self.path, max_size_bytes=30, clock=self.clock)
+        for key in "abc":
+            self.clock.now += 1
+            cache.set(key, b"x" * 10)
+
+        self.clock.now += 1
+        cache.get("a")
+        self.clock.now += 1
+        cache.set("d", b"x" * 10)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"x" * 10)
+        self.assertEqual(cache.size_bytes, 30)
+
+        cache.set("a", b"y" * 5)
+        self.assertEqual(cache.size_bytes, 25)
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()